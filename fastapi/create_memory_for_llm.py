@@ -1,4 +1,28 @@
-from langchain_community.document_loaders import PyPDFLoader, DirectoryLoader
+"""
+Build or update the FAISS vector store from the PDFs in data/.
+
+Only new or changed files are parsed and embedded: a manifest stored with
+each build maps every PDF to its content hash and the ids of its chunks, so
+removed or changed files are deleted from the index by id and the rest is
+left alone. PDFs are parsed in a process pool and chunks embedded in batches.
+
+Each build is written to its own directory under vectorstore/builds/ and
+vectorstore/db_faiss is a symlink to the current one, swapped atomically.
+The chat service notices the new index on its next request and loads it
+without a restart.
+
+    python create_memory_for_llm.py [--workers N] [--batch-size N] [--rebuild]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
@@ -7,42 +31,151 @@ from langchain_community.vectorstores import FAISS
 from dotenv import load_dotenv
 load_dotenv()
 
+DATA_PATH = "data/"
+DB_FAISS_PATH = "vectorstore/db_faiss"
+BUILDS_PATH = "vectorstore/builds"
+MANIFEST_NAME = "manifest.json"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+# Builds kept on disk: the current one and the one before it, which a
+# service still loading it may have open
+KEEP_BUILDS = 2
 
-# Step 1: Load raw PDF(s)
-DATA_PATH="data/"
-def load_pdf_files(data):
-    loader = DirectoryLoader(data,
-                             glob='*.pdf',
-                             loader_cls=PyPDFLoader)
-    
-    documents=loader.load()
-    return documents
 
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
-documents=load_pdf_files(data=DATA_PATH)
-#print("Length of PDF pages: ", len(documents))
 
+# Step 1: Load raw PDF(s) and create chunks; runs in worker processes
+def load_pdf_chunks(path):
+    documents = PyPDFLoader(path).load()
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE,
+                                                   chunk_overlap=CHUNK_OVERLAP)
+    return path, text_splitter.split_documents(documents)
 
-# Step 2: Create Chunks
-def create_chunks(extracted_data):
-    text_splitter=RecursiveCharacterTextSplitter(chunk_size=500,
-                                                 chunk_overlap=50)
-    text_chunks=text_splitter.split_documents(extracted_data)
-    return text_chunks
-
-text_chunks=create_chunks(extracted_data=documents)
-#print("Length of Text Chunks: ", len(text_chunks))
-
-# Step 3: Create Vector Embeddings 
 
 def get_embedding_model():
-    embedding_model=HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+    # Must match the model the chat service embeds questions with
+    embedding_model = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
     return embedding_model
 
-embedding_model=get_embedding_model()
 
-# Step 4: Store embeddings in FAISS
-DB_FAISS_PATH="vectorstore/db_faiss"
-db=FAISS.from_documents(text_chunks, embedding_model)
-db.save_local(DB_FAISS_PATH)
+def index_settings():
+    return {"embedding_model": EMBEDDING_MODEL, "chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP}
+
+
+def load_manifest(index_path):
+    try:
+        with open(os.path.join(index_path, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def scan_pdfs(data_path):
+    """{path: sha256} for the PDFs in data_path (not recursive, like before)."""
+    return {
+        os.path.join(data_path, name): file_hash(os.path.join(data_path, name))
+        for name in sorted(os.listdir(data_path))
+        if name.lower().endswith(".pdf")
+    }
+
+
+def plan_changes(manifest, hashes):
+    """Split the PDFs into (to_embed, to_delete) against the last build's manifest."""
+    known = manifest["files"] if manifest else {}
+    to_embed = [path for path, sha in hashes.items() if known.get(path, {}).get("sha256") != sha]
+    to_delete = [path for path, entry in known.items() if hashes.get(path) != entry["sha256"]]
+    return to_embed, to_delete
+
+
+# Step 2: Create Vector Embeddings in batches and add them to the index
+def embed_chunks(db, embedding_model, chunks, batch_size):
+    ids = []
+    for start in range(0, len(chunks), batch_size):
+        batch = chunks[start:start + batch_size]
+        texts = [chunk.page_content for chunk in batch]
+        vectors = embedding_model.embed_documents(texts)
+        batch_ids = [str(uuid.uuid4()) for _ in batch]
+        if db is None:
+            db = FAISS.from_embeddings(list(zip(texts, vectors)), embedding_model,
+                                       metadatas=[chunk.metadata for chunk in batch], ids=batch_ids)
+        else:
+            db.add_embeddings(list(zip(texts, vectors)), metadatas=[chunk.metadata for chunk in batch], ids=batch_ids)
+        ids.extend(batch_ids)
+    return db, ids
+
+
+# Step 3: Store the new build and point DB_FAISS_PATH at it
+def publish(db, manifest):
+    os.makedirs(BUILDS_PATH, exist_ok=True)
+    build_path = os.path.join(BUILDS_PATH, time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}")
+    db.save_local(build_path)
+    with open(os.path.join(build_path, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f)
+
+    if os.path.isdir(DB_FAISS_PATH) and not os.path.islink(DB_FAISS_PATH):
+        # Index from before builds were versioned: it is replaced, not reused
+        shutil.rmtree(DB_FAISS_PATH)
+
+    # A symlink can be replaced atomically, a directory can't
+    link_tmp = f"{DB_FAISS_PATH}.tmp-{os.getpid()}"
+    os.symlink(os.path.relpath(build_path, os.path.dirname(DB_FAISS_PATH)), link_tmp)
+    os.replace(link_tmp, DB_FAISS_PATH)
+
+    builds = sorted(os.listdir(BUILDS_PATH))
+    for old in builds[:-KEEP_BUILDS]:
+        shutil.rmtree(os.path.join(BUILDS_PATH, old), ignore_errors=True)
+    return build_path
+
+
+def build(data_path=DATA_PATH, workers=None, batch_size=256, rebuild=False):
+    embedding_model = get_embedding_model()
+    hashes = scan_pdfs(data_path)
+
+    manifest = None if rebuild else load_manifest(DB_FAISS_PATH)
+    if manifest and manifest.get("settings") != index_settings():
+        # Chunks or vectors from different settings can't be mixed
+        manifest = None
+    db = None
+    if manifest:
+        db = FAISS.load_local(DB_FAISS_PATH, embedding_model, allow_dangerous_deserialization=True)
+
+    to_embed, to_delete = plan_changes(manifest, hashes)
+    if manifest and not to_embed and not to_delete:
+        print("Vector store is up to date")
+        return None
+
+    files = dict(manifest["files"]) if manifest else {}
+    stale_ids = [chunk_id for path in to_delete for chunk_id in files.pop(path)["ids"]]
+    if stale_ids:
+        db.delete(stale_ids)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, chunks in pool.map(load_pdf_chunks, to_embed):
+            db, ids = embed_chunks(db, embedding_model, chunks, batch_size)
+            files[path] = {"sha256": hashes[path], "ids": ids}
+            print(f"Embedded {path}: {len(chunks)} chunks")
+
+    if db is None or not db.index_to_docstore_id:
+        raise SystemExit(f"No PDF content found in {data_path}")
+
+    build_path = publish(db, {"settings": index_settings(), "files": files})
+    print(f"Added {len(to_embed)} file(s), removed {len(to_delete) - len(set(to_delete) & set(to_embed))}, "
+          f"{len(db.index_to_docstore_id)} chunks in {build_path}")
+    return build_path
+
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or update the FAISS vector store incrementally.")
+    parser.add_argument("--data", default=DATA_PATH, help="Directory of PDFs")
+    parser.add_argument("--workers", type=int, default=None, help="PDF parsing processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=256, help="Chunks embedded per batch")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the manifest and embed every file")
+    args = parser.parse_args()
+    build(args.data, workers=args.workers, batch_size=args.batch_size, rebuild=args.rebuild)
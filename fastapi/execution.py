@@ -0,0 +1,107 @@
+"""
+Admission control for blocking chain calls.
+
+Chains (retrieval + Groq) are synchronous, so they run on a bounded thread
+pool instead of the event loop. At most CHAIN_MAX_CONCURRENCY run at once;
+up to CHAIN_MAX_QUEUE more wait for a slot, each for at most
+CHAIN_QUEUE_TIMEOUT seconds. Anything beyond that is refused straight away,
+so under load the service answers "busy" quickly instead of stalling.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+CHAIN_MAX_CONCURRENCY = int(os.environ.get("CHAIN_MAX_CONCURRENCY", 4))
+CHAIN_MAX_QUEUE = int(os.environ.get("CHAIN_MAX_QUEUE", 32))
+CHAIN_QUEUE_TIMEOUT = float(os.environ.get("CHAIN_QUEUE_TIMEOUT", 15))
+# Recent requests kept for latency percentiles
+LATENCY_WINDOW = 500
+
+
+class Overloaded(Exception):
+    """Raised when a call is refused or times out waiting for a slot."""
+
+    def __init__(self, reason, retry_after=1):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)], 4)
+
+
+class ChainExecutor:
+    def __init__(self, max_concurrency=CHAIN_MAX_CONCURRENCY, max_queue=CHAIN_MAX_QUEUE,
+                 queue_timeout=CHAIN_QUEUE_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="chain")
+        # Created on first use so it binds to the running event loop
+        self._slots = None
+        self.running = 0
+        self.waiting = 0
+        self.counters = {"completed": 0, "failed": 0, "rejected": 0, "timed_out": 0}
+        self._wait_times = deque(maxlen=LATENCY_WINDOW)
+        self._run_times = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on the pool once a slot is free; raises Overloaded."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+
+        # Counted before any await, so a burst can't slip past the limit
+        if self.running + self.waiting >= self.max_concurrency + self.max_queue:
+            self.counters["rejected"] += 1
+            raise Overloaded("Too many requests waiting")
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.counters["timed_out"] += 1
+            raise Overloaded("Timed out waiting for a free worker", retry_after=max(int(self.queue_timeout), 1))
+        finally:
+            self.waiting -= 1
+        self.running += 1
+
+        started = time.perf_counter()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+            self.counters["completed"] += 1
+            return result
+        except Exception:
+            self.counters["failed"] += 1
+            raise
+        finally:
+            self.running -= 1
+            self._slots.release()
+            with self._lock:
+                self._wait_times.append(started - queued_at)
+                self._run_times.append(time.perf_counter() - started)
+
+    def metrics(self):
+        with self._lock:
+            wait_times, run_times = list(self._wait_times), list(self._run_times)
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "running": self.running,
+            "waiting": self.waiting,
+            **self.counters,
+            "queue_wait_seconds": {"p50": _percentile(wait_times, 50), "p95": _percentile(wait_times, 95)},
+            "run_seconds": {"p50": _percentile(run_times, 50), "p95": _percentile(run_times, 95)},
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,8 +1,12 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
+import asyncio
+import json
 import os
+import threading
 import uuid
 
 from langchain_huggingface import HuggingFaceEmbeddings
@@ -11,6 +15,13 @@ from langchain.memory import ConversationBufferMemory
 from langchain_community.vectorstores import FAISS
 from langchain_core.prompts import PromptTemplate
 from langchain_groq import ChatGroq
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.callbacks import BaseCallbackHandler
+
+from session_store import ConversationState, create_session_store
+from execution import ChainExecutor, Overloaded
+from retrieval_cache import CachedEmbeddings, CachedRetriever, clear_caches, retrieval_cache
+from memory import budgeted_history
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -34,27 +45,94 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
+    # Rolling summary of the conversation so far, kept by the caller
+    summary: Optional[str] = None
 
 class ChatResponse(BaseModel):
     response: str
     session_id: str
     conversation_history: List[ChatMessage]
+    # Just this turn's messages, so callers persisting the conversation can
+    # append instead of rewriting it
+    new_messages: List[ChatMessage]
+
+class SummarizeRequest(BaseModel):
+    messages: List[ChatMessage]
+    previous_summary: Optional[str] = None
+
+class SummarizeResponse(BaseModel):
+    summary: str
 
 # Global variables
 DB_FAISS_PATH = "vectorstore/db_faiss"
 vectorstore = None
-conversation_sessions = {}  # Store conversation chains by session_id
+embeddings = None
+# (directory, mtime) of the loaded index, to notice when it is rebuilt on disk
+vectorstore_version = None
+vectorstore_lock = threading.Lock()
+llm = None
+# Conversation history by session_id; chains are rebuilt from it per request
+session_store = create_session_store()
+# Bounded pool the blocking chain calls run on, off the event loop
+chain_executor = ChainExecutor()
+# Streaming turns in flight; holds the tasks so they aren't garbage collected
+streaming_turns = set()
+
+def _index_version():
+    # create_memory_for_llm.py swaps DB_FAISS_PATH (a symlink) to each new
+    # build; resolving it once means one load never mixes two builds' files
+    path = os.path.realpath(DB_FAISS_PATH)
+    try:
+        return path, os.path.getmtime(os.path.join(path, "index.faiss"))
+    except OSError:
+        return path, None
 
 def load_vectorstore():
-    """Load the FAISS vectorstore"""
-    global vectorstore
-    if vectorstore is None:
-        embedding_model = HuggingFaceEmbeddings(model_name='sentence-transformers/all-MiniLM-L6-v2')
-        vectorstore = FAISS.load_local(DB_FAISS_PATH, embedding_model, allow_dangerous_deserialization=True)
+    """Load the FAISS vectorstore, again if the index on disk has changed"""
+    global vectorstore, embeddings, vectorstore_version
+    version = _index_version()
+    # A missing index (e.g. removed by hand) keeps serving the loaded one
+    if vectorstore is not None and (version == vectorstore_version or version[1] is None):
+        return vectorstore
+    with vectorstore_lock:
+        if vectorstore is None or version != vectorstore_version:
+            if embeddings is None:
+                embeddings = CachedEmbeddings(HuggingFaceEmbeddings(model_name='sentence-transformers/all-MiniLM-L6-v2'))
+            vectorstore = FAISS.load_local(version[0], embeddings, allow_dangerous_deserialization=True)
+            vectorstore_version = version
+            # Cached results came from the old index
+            clear_caches(embeddings)
     return vectorstore
 
-def create_conversational_chain():
-    """Create a new conversational chain"""
+def get_llm():
+    """Shared LLM client; chains are cheap wrappers around it"""
+    global llm
+    if llm is None:
+        llm = ChatGroq(
+            model_name="meta-llama/llama-4-maverick-17b-128e-instruct",
+            temperature=0.1,
+            groq_api_key=os.environ["GROQ_API_KEY"],
+        )
+    return llm
+
+class TokenCallback(BaseCallbackHandler):
+    """Hands each generated token to `on_token`"""
+
+    def __init__(self, on_token):
+        self.on_token = on_token
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        if token:
+            self.on_token(token)
+
+def create_conversational_chain(history=None, on_token=None, summary=""):
+    """
+    Create a conversational chain, its memory seeded with what fits the
+    memory budget of `history` and `summary`.
+    With `on_token`, the answer is streamed to it token by token; the
+    question-rephrasing step still uses the plain LLM so its output never
+    reaches the user.
+    """
     custom_template = """You are a helpful medical assistant chatbot. Use the following pieces of medical information and the conversation history to answer the user's question in a friendly, conversational way.
 
 If the user is referring to something from earlier in the conversation, use the chat history to understand what they're talking about.
@@ -86,14 +164,23 @@ Helpful Answer:"""
         return_messages=True,
         output_key="answer"
     )
+    recent, summary = budgeted_history(history or [], summary)
+    if summary:
+        memory.chat_memory.add_message(SystemMessage(content=f"Summary of the earlier conversation: {summary}"))
+    memory.chat_memory.add_messages([
+        HumanMessage(content=msg["content"]) if msg["role"] == "user" else AIMessage(content=msg["content"])
+        for msg in recent
+    ])
     
+    answer_llm = get_llm()
+    if on_token is not None:
+        # Shallow copy: shares the Groq client and its connection pool
+        answer_llm = answer_llm.model_copy(update={"streaming": True, "callbacks": [TokenCallback(on_token)]})
+
     chain = ConversationalRetrievalChain.from_llm(
-        llm=ChatGroq(
-            model_name="meta-llama/llama-4-maverick-17b-128e-instruct",
-            temperature=0.1,
-            groq_api_key=os.environ["GROQ_API_KEY"],
-        ),
-        retriever=vectorstore.as_retriever(search_kwargs={'k': 4}),
+        llm=answer_llm,
+        condense_question_llm=get_llm(),
+        retriever=CachedRetriever(vectorstore=load_vectorstore(), embeddings=embeddings, cache=retrieval_cache, k=4),
         memory=memory,
         return_source_documents=True,
         combine_docs_chain_kwargs={"prompt": prompt},
@@ -112,64 +199,167 @@ async def startup_event():
         print(f"❌ Failed to load vectorstore: {e}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    chain_executor.shutdown()
+
 @app.get("/")
 async def root():
     return {"message": "Medical Chatbot API is running!!!"}
 
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy", "vectorstore_loaded": vectorstore is not None}
+def health_check():
+    return {
+        "status": "healthy",
+        "vectorstore_loaded": vectorstore is not None,
+        "sessions": session_store.stats(),
+        "chain_executor": chain_executor.metrics(),
+        "caches": {
+            "embeddings": embeddings.cache.stats() if embeddings is not None else None,
+            "retrieval": retrieval_cache.stats(),
+        },
+    }
+
+def run_chat_turn(session_id: str, message: str, on_token=None, summary=None) -> ConversationState:
+    """One blocking chat turn; runs on chain_executor's pool"""
+    # Load this session's history (any worker may have written it) and
+    # rebuild the chain around it
+    state = session_store.get(session_id) or ConversationState(session_id=session_id)
+    if summary is not None:
+        state.summary = summary
+    chain = create_conversational_chain(state.messages, on_token, state.summary)
+
+    # Get response from chatbot
+    response = chain.invoke({'question': message})
+    state.add_turn(message, response['answer'])
+    session_store.save(state)
+    return state
+
+def build_chat_response(session_id: str, state: ConversationState) -> ChatResponse:
+    # Add disclaimer
+    disclaimer = "\n\nPlease remember: This information is for educational purposes only. Always consult with a healthcare professional for personal medical advice."
+    final_answer = state.messages[-1]["content"] + disclaimer
+
+    # Get conversation history
+    chat_history = [ChatMessage(**msg) for msg in state.messages]
+
+    return ChatResponse(
+        response=final_answer,
+        session_id=session_id,
+        conversation_history=chat_history,
+        new_messages=chat_history[-2:]
+    )
 
 @app.post("/chat/", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
     """Main chat endpoint"""
+    # Generate session_id if not provided
+    session_id = request.session_id or str(uuid.uuid4())
     try:
-        # Generate session_id if not provided
-        session_id = request.session_id or str(uuid.uuid4())
-        
-        # Get or create conversation chain for this session
-        if session_id not in conversation_sessions:
-            conversation_sessions[session_id] = create_conversational_chain()
-        
-        chain = conversation_sessions[session_id]
-        
-        # Get response from chatbot
-        response = chain.invoke({'question': request.message})
-        answer = response['answer']
-        
-        # Add disclaimer
-        disclaimer = "\n\nPlease remember: This information is for educational purposes only. Always consult with a healthcare professional for personal medical advice."
-        final_answer = answer + disclaimer
-        
-        # Get conversation history
-        chat_history = []
-        if hasattr(chain.memory, 'chat_memory') and hasattr(chain.memory.chat_memory, 'messages'):
-            for msg in chain.memory.chat_memory.messages:
-                role = "user" if msg.type == "human" else "assistant"
-                chat_history.append(ChatMessage(role=role, content=msg.content))
-        
-        return ChatResponse(
-            response=final_answer,
-            session_id=session_id,
-            conversation_history=chat_history
+        state = await chain_executor.run(run_chat_turn, session_id, request.message, None, request.summary)
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Chatbot is busy, please try again shortly ({e.reason})",
+            headers={"Retry-After": str(e.retry_after)},
         )
-        
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
 
+    return build_chat_response(session_id, state)
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/chat/stream/")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Same turn as /chat/, answered as server-sent events: a `token` event per
+    generated token, then `done` carrying the /chat/ response body, or
+    `error` with a status and detail.
+    """
+    session_id = request.session_id or str(uuid.uuid4())
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def on_token(token):
+        # Called on the chain's worker thread
+        loop.call_soon_threadsafe(events.put_nowait, ("token", {"token": token}))
+
+    async def run_turn():
+        try:
+            state = await chain_executor.run(run_chat_turn, session_id, request.message, on_token, request.summary)
+            await events.put(("done", build_chat_response(session_id, state).model_dump()))
+        except Overloaded as e:
+            await events.put(("error", {
+                "status": 503,
+                "detail": f"Chatbot is busy, please try again shortly ({e.reason})",
+                "retry_after": e.retry_after,
+            }))
+        except Exception as e:
+            await events.put(("error", {"status": 500, "detail": f"Error processing chat: {str(e)}"}))
+
+    # Keeps running if the client goes away, so the turn is still saved
+    turn = asyncio.create_task(run_turn())
+    streaming_turns.add(turn)
+    turn.add_done_callback(streaming_turns.discard)
+
+    async def stream():
+        while True:
+            event, data = await events.get()
+            yield sse_event(event, data)
+            if event != "token":
+                break
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        # Tell proxies (nginx) not to buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+SUMMARY_INSTRUCTION = (
+    "You are a summarizer. Produce a concise summary of the conversation that captures "
+    "the user's goals, key facts, and outstanding tasks, in 2-4 sentences. Use consistent "
+    "naming for people, dates and actions."
+)
+
+def summarize_messages(messages: List[ChatMessage], previous_summary: Optional[str]) -> str:
+    """Fold `messages` into `previous_summary`; one LLM call, no retrieval"""
+    conversation_text = "\n".join(f"{msg.role.capitalize()}: {msg.content}" for msg in messages)
+    prompt = SUMMARY_INSTRUCTION
+    if previous_summary:
+        prompt += f"\n\nSummary of the conversation so far:\n{previous_summary}"
+    prompt += f"\n\nConversation:\n{conversation_text}\n\nSummary:"
+    return get_llm().invoke(prompt).content.strip()
+
+@app.post("/summarize/", response_model=SummarizeResponse)
+async def summarize_endpoint(request: SummarizeRequest):
+    """Rolling conversation summary; stateless, so no session is touched"""
+    try:
+        summary = await chain_executor.run(summarize_messages, request.messages, request.previous_summary)
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Chatbot is busy, please try again shortly ({e.reason})",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error summarizing: {str(e)}")
+    return SummarizeResponse(summary=summary)
+
 @app.delete("/chat/{session_id}/")
-async def clear_conversation(session_id: str):
+def clear_conversation(session_id: str):
     """Clear conversation history for a session"""
-    if session_id in conversation_sessions:
-        del conversation_sessions[session_id]
+    if session_store.delete(session_id):
         return {"message": f"Conversation {session_id} cleared"}
     else:
         raise HTTPException(status_code=404, detail="Session not found")
 
 @app.get("/sessions")
-async def get_active_sessions():
+def get_active_sessions():
     """Get list of active session IDs"""
-    return {"active_sessions": list(conversation_sessions.keys())}
+    return {"active_sessions": session_store.session_ids()}
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,66 @@
+"""
+What the chain sees of a conversation.
+
+Resending the whole history every turn makes prompts (and latency, and
+cost) grow with the session. In "budgeted" mode the chain gets the last
+MEMORY_MAX_TURNS turns verbatim, newest first until MEMORY_TOKEN_BUDGET is
+spent, plus the rolling summary of the conversation (kept by the Django
+side) whenever older turns were left out. Until that summary exists the
+chain gets everything, as in "buffer" mode, so older turns are never
+dropped with nothing in their place.
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+MEMORY_MODE = os.environ.get("CHAT_MEMORY_MODE", "budgeted")
+MEMORY_MAX_TURNS = int(os.environ.get("MEMORY_MAX_TURNS", 6))
+MEMORY_TOKEN_BUDGET = int(os.environ.get("MEMORY_TOKEN_BUDGET", 1500))
+# Most of the budget the summary may take before it is cut
+SUMMARY_BUDGET_SHARE = 0.4
+# Llama-family tokenizers average roughly four characters per token of English
+CHARS_PER_TOKEN = 4
+
+
+def approx_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _turns(messages):
+    # Group into turns that each start at a user message
+    turns = []
+    for msg in messages:
+        if msg["role"] == "user" or not turns:
+            turns.append([])
+        turns[-1].append(msg)
+    return turns
+
+
+def budgeted_history(messages: List[Dict[str, str]], summary: str = "",
+                     max_turns: int = MEMORY_MAX_TURNS,
+                     token_budget: int = MEMORY_TOKEN_BUDGET) -> Tuple[List[Dict[str, str]], Optional[str]]:
+    """
+    Returns (recent messages, summary or None). The newest turn is always
+    kept, so the model can resolve "what about that?"-style follow-ups even
+    when it alone is over budget.
+    """
+    summary = (summary or "").strip()
+    if MEMORY_MODE == "buffer" or not summary:
+        return list(messages), None
+
+    max_chars = int(token_budget * SUMMARY_BUDGET_SHARE) * CHARS_PER_TOKEN
+    if len(summary) > max_chars:
+        summary = summary[:max_chars].rsplit(" ", 1)[0] + " ..."
+    remaining = token_budget - approx_tokens(summary)
+
+    kept = []
+    turns = _turns(messages)
+    for turn in reversed(turns[-max_turns:] if max_turns > 0 else []):
+        cost = sum(approx_tokens(msg["content"]) for msg in turn)
+        if kept and cost > remaining:
+            break
+        kept[:0] = turn
+        remaining -= cost
+
+    # The summary only adds anything when older turns were dropped
+    dropped = len(kept) < len(messages)
+    return kept, summary if dropped else None
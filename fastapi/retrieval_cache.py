@@ -0,0 +1,148 @@
+"""
+Caches in front of the embedding model and the FAISS search.
+
+Parents ask the same few questions in slightly different words, and every
+turn used to re-embed the question on CPU and search the index again.
+CachedEmbeddings remembers normalised question -> vector and
+CachedRetriever remembers (vector hash, k) -> documents. Both are LRUs
+bounded by an approximate byte budget and both are cleared whenever the
+vector store is reloaded.
+"""
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+EMBEDDING_CACHE_BYTES = int(os.environ.get("EMBEDDING_CACHE_BYTES", 16 * 1024 * 1024))
+RETRIEVAL_CACHE_BYTES = int(os.environ.get("RETRIEVAL_CACHE_BYTES", 32 * 1024 * 1024))
+
+
+def normalise_text(text: str) -> str:
+    # all-MiniLM-L6-v2 is uncased, so lower-casing doesn't change the vector
+    return " ".join(text.lower().split())
+
+
+class ByteLRU:
+    """Thread-safe LRU evicting by the total size reported for its values."""
+
+    def __init__(self, max_bytes, sizeof):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._data.pop(key)[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+
+def _vector_size(vector):
+    return sys.getsizeof(vector) + len(vector) * 24
+
+
+def _documents_size(documents):
+    return sum(len(doc.page_content) + len(str(doc.metadata)) + 100 for doc in documents)
+
+
+def vector_key(vector, k):
+    digest = hashlib.blake2b(repr(list(vector)).encode(), digest_size=16).hexdigest()
+    return f"{digest}:{k}"
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper caching query vectors; document embedding passes through."""
+
+    def __init__(self, inner: Embeddings, max_bytes=EMBEDDING_CACHE_BYTES):
+        self.inner = inner
+        self.cache = ByteLRU(max_bytes, _vector_size)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalise_text(text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = self.inner.embed_query(key)
+            self.cache.set(key, vector)
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.inner.embed_documents(texts)
+
+
+class CachedRetriever(BaseRetriever):
+    """
+    Similarity search over a FAISS store that embeds through CachedEmbeddings
+    and caches the documents found for each (vector, k).
+    """
+
+    vectorstore: object
+    embeddings: CachedEmbeddings
+    cache: ByteLRU
+    k: int = 4
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        vector = self.embeddings.embed_query(query)
+        key = vector_key(vector, self.k)
+        documents = self.cache.get(key)
+        if documents is None:
+            documents = self.vectorstore.similarity_search_by_vector(vector, k=self.k)
+            self.cache.set(key, documents)
+        # Chains may annotate what they get back; keep the cached copies clean
+        return [Document(page_content=doc.page_content, metadata=dict(doc.metadata)) for doc in documents]
+
+
+retrieval_cache = ByteLRU(RETRIEVAL_CACHE_BYTES, _documents_size)
+
+
+def clear_caches(embeddings: CachedEmbeddings = None):
+    """Drop everything cached; called whenever the vector store is (re)loaded."""
+    retrieval_cache.clear()
+    if embeddings is not None:
+        embeddings.cache.clear()
@@ -0,0 +1,199 @@
+"""
+Conversation session storage for the chatbot.
+
+Sessions hold only serialisable state (the message history), never chains,
+so any uvicorn worker can serve any session: the chain is rebuilt from the
+stored history per request. Two interchangeable stores:
+
+- LocalSessionStore: in-process, LRU + idle TTL + a total memory budget.
+  Fine for a single worker and for tests.
+- RedisSessionStore: shared by every worker/replica, idle TTL via key
+  expiry and LRU via a last-access sorted set.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", 60 * 60))
+MAX_SESSIONS = int(os.environ.get("MAX_SESSIONS", 1000))
+# Budget for all sessions together (local store) ...
+SESSION_MEMORY_BUDGET_BYTES = int(os.environ.get("SESSION_MEMORY_BUDGET_BYTES", 64 * 1024 * 1024))
+# ... and for any single session; older turns are dropped past it
+MAX_SESSION_BYTES = int(os.environ.get("MAX_SESSION_BYTES", 256 * 1024))
+
+
+@dataclass
+class ConversationState:
+    session_id: str
+    messages: List[Dict[str, str]] = field(default_factory=list)
+    # Rolling summary sent by the caller; stands in for turns outside the memory budget
+    summary: str = ""
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    def add_turn(self, question: str, answer: str):
+        self.messages.append({"role": "user", "content": question})
+        self.messages.append({"role": "assistant", "content": answer})
+        self.updated_at = time.time()
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw) -> "ConversationState":
+        return cls(**json.loads(raw))
+
+    def trim(self, max_bytes: int = MAX_SESSION_BYTES) -> str:
+        """Drop the oldest turns until the serialised state fits; returns it."""
+        raw = self.to_json()
+        while len(raw.encode()) > max_bytes and len(self.messages) > 2:
+            del self.messages[:2]
+            raw = self.to_json()
+        return raw
+
+
+class LocalSessionStore:
+    def __init__(self, ttl=SESSION_TTL_SECONDS, max_sessions=MAX_SESSIONS,
+                 memory_budget=SESSION_MEMORY_BUDGET_BYTES, max_session_bytes=MAX_SESSION_BYTES):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.memory_budget = memory_budget
+        self.max_session_bytes = max_session_bytes
+        # session_id -> (last_access, serialised state)
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _drop(self, session_id):
+        _, raw = self._data.pop(session_id)
+        self._bytes -= len(raw)
+
+    def _expire(self, now):
+        # Oldest access first, so stop at the first live entry
+        while self._data:
+            session_id, (accessed, _) = next(iter(self._data.items()))
+            if now - accessed <= self.ttl:
+                break
+            self._drop(session_id)
+            self.evictions += 1
+
+    def get(self, session_id: str) -> Optional[ConversationState]:
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            item = self._data.get(session_id)
+            if item is None:
+                return None
+            self._data[session_id] = (now, item[1])
+            self._data.move_to_end(session_id)
+            return ConversationState.from_json(item[1])
+
+    def save(self, state: ConversationState):
+        raw = state.trim(self.max_session_bytes).encode()
+        now = time.time()
+        with self._lock:
+            if state.session_id in self._data:
+                self._drop(state.session_id)
+            self._data[state.session_id] = (now, raw)
+            self._bytes += len(raw)
+            self._expire(now)
+            while len(self._data) > 1 and (len(self._data) > self.max_sessions or self._bytes > self.memory_budget):
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id not in self._data:
+                return False
+            self._drop(session_id)
+            return True
+
+    def session_ids(self) -> List[str]:
+        with self._lock:
+            self._expire(time.time())
+            return list(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "local",
+                "sessions": len(self._data),
+                "bytes": self._bytes,
+                "memory_budget": self.memory_budget,
+                "max_sessions": self.max_sessions,
+                "evictions": self.evictions,
+            }
+
+
+class RedisSessionStore:
+    def __init__(self, url, prefix="chatbot:session:", ttl=SESSION_TTL_SECONDS,
+                 max_sessions=MAX_SESSIONS, max_session_bytes=MAX_SESSION_BYTES):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.index_key = f"{prefix}index"
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_session_bytes = max_session_bytes
+
+    def _key(self, session_id):
+        return f"{self.prefix}{session_id}"
+
+    def get(self, session_id: str) -> Optional[ConversationState]:
+        pipe = self.client.pipeline()
+        pipe.get(self._key(session_id))
+        pipe.expire(self._key(session_id), self.ttl)
+        raw, _ = pipe.execute()
+        if raw is None:
+            self.client.zrem(self.index_key, session_id)
+            return None
+        self.client.zadd(self.index_key, {session_id: time.time()})
+        return ConversationState.from_json(raw)
+
+    def save(self, state: ConversationState):
+        raw = state.trim(self.max_session_bytes)
+        now = time.time()
+        pipe = self.client.pipeline()
+        pipe.set(self._key(state.session_id), raw, ex=self.ttl)
+        pipe.zadd(self.index_key, {state.session_id: now})
+        # Forget index entries whose keys have expired
+        pipe.zremrangebyscore(self.index_key, "-inf", now - self.ttl)
+        pipe.zcard(self.index_key)
+        count = pipe.execute()[-1]
+        if count > self.max_sessions:
+            # Least recently used first
+            for session_id, _ in self.client.zpopmin(self.index_key, count - self.max_sessions):
+                self.client.delete(self._key(session_id.decode()))
+
+    def delete(self, session_id: str) -> bool:
+        pipe = self.client.pipeline()
+        pipe.delete(self._key(session_id))
+        pipe.zrem(self.index_key, session_id)
+        deleted, _ = pipe.execute()
+        return bool(deleted)
+
+    def session_ids(self) -> List[str]:
+        self.client.zremrangebyscore(self.index_key, "-inf", time.time() - self.ttl)
+        return [session_id.decode() for session_id in self.client.zrange(self.index_key, 0, -1)]
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "sessions": self.client.zcard(self.index_key),
+            "max_sessions": self.max_sessions,
+            "max_session_bytes": self.max_session_bytes,
+        }
+
+
+def create_session_store():
+    """Redis when SESSION_STORE_URL (or REDIS_URL) is set, in-process otherwise."""
+    url = os.environ.get("SESSION_STORE_URL") or os.environ.get("REDIS_URL")
+    if url:
+        return RedisSessionStore(url)
+    return LocalSessionStore()
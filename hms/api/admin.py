@@ -9,7 +9,7 @@ from .models import (User, OTP, SystemLog, Report, RolePermissionModel, DoctorPr
                      Diagnosis, DiagnosisAttachment, Treatment,
                      Drug, DrugInteraction, DrugDispenseRecord, Prescription, PrescriptionItem, AdverseReaction, 
                      LabTest, ReferenceRange, LabRequest, LabRequestItem, LabResult, LabResultParameter,
-                     Bill, BillItem, Payment
+                     Bill, BillItem, Payment, ImportJob
 
 )
 add = admin.site.register
@@ -59,4 +59,5 @@ add(LabResult)
 add(LabResultParameter)
 add(Bill)
 add(BillItem)
-add(Payment)
\ No newline at end of file
+add(Payment)
+add(ImportJob)
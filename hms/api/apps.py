@@ -9,4 +9,5 @@ class ApiConfig(AppConfig):
         import api.emails
         import api.notifications
         import api.tasks
-        import api.scheduled_tasks
\ No newline at end of file
+        import api.scheduled_tasks
+        import api.caches
\ No newline at end of file
@@ -0,0 +1,4 @@
+from .shift_availability import *
+from .role_permissions import *
+from .reference_ranges import *
+from .chart_renders import *
@@ -0,0 +1,105 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseNotModified
+
+from ..models import Child, GrowthRecord, AdmissionVitalRecord, AdmissionVitalRecordHistory
+
+CHART_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Data each chart is drawn from; a write to either bumps that child's stamp
+GROWTH = "growth"
+VITALS = "vitals"
+
+
+def _version_key(child_id, source):
+    return f"chart_data_version:{source}:{child_id}"
+
+
+def get_chart_data_version(child_id, source):
+    """
+    Data version stamp for one child's charts. Seeded from the clock rather
+    than 1 so an evicted stamp never comes back as a value an older image
+    (or a client's ETag) was keyed on.
+    """
+    key = _version_key(child_id, source)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_chart_data_version(child_id, source):
+    key = _version_key(child_id, source)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), timeout=None)
+
+
+def cached_chart_response(request, child_id, chart, source, render):
+    """
+    Serve a rendered chart from the cache, keyed by child, chart and data
+    version. A matching If-None-Match gets a 304 without touching matplotlib.
+    `render()` must return an HttpResponse; only 200s are cached.
+
+    Version stamps only work if every worker sees the same ones, so without
+    a shared cache (settings.CACHE_IS_SHARED) charts are rendered every time
+    and carry no ETag.
+    """
+    if not getattr(settings, 'CACHE_IS_SHARED', False):
+        return render()
+
+    version = get_chart_data_version(child_id, source)
+    etag = f'"{chart}-{child_id}-{version}"'
+
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    key = f"chart_render:{chart}:{child_id}:{version}"
+    cached = cache.get(key)
+    if cached is not None:
+        content, content_type = cached
+        response = HttpResponse(content, content_type=content_type)
+    else:
+        response = render()
+        if response.status_code != 200:
+            return response
+        cache.set(key, (response.content, response['Content-Type']), timeout=CHART_CACHE_TIMEOUT)
+
+    response['ETag'] = etag
+    # Let dashboards keep the image but check back every time
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@receiver(post_save, sender=GrowthRecord)
+@receiver(post_delete, sender=GrowthRecord)
+def invalidate_growth_charts(sender, instance, **kwargs):
+    bump_chart_data_version(instance.child_id, GROWTH)
+
+
+@receiver(post_save, sender=AdmissionVitalRecordHistory)
+@receiver(post_delete, sender=AdmissionVitalRecordHistory)
+def invalidate_vitals_charts(sender, instance, **kwargs):
+    child_id = (
+        AdmissionVitalRecord.objects
+        .filter(pk=instance.admission_vital_record_id)
+        .values_list('admission__child_id', flat=True)
+        .first()
+    )
+    if child_id is not None:
+        bump_chart_data_version(child_id, VITALS)
+
+
+@receiver(post_save, sender=Child)
+@receiver(post_delete, sender=Child)
+def invalidate_child_vitals_chart(sender, instance, **kwargs):
+    # The vitals chart title carries the child's name
+    bump_chart_data_version(instance.pk, VITALS)
@@ -0,0 +1,166 @@
+import copy
+import logging
+import threading
+import time
+from bisect import bisect_right
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from ..models import ReferenceRange
+
+logger = logging.getLogger(__name__)
+
+INDEX_KEY = "reference_range_index"
+INDEX_VERSION_KEY = "reference_range_index:version"
+INDEX_CACHE_TIMEOUT = 60 * 60
+# How long a worker trusts its local copy before re-checking the shared version
+LOCAL_CHECK_INTERVAL = 5
+
+_lock = threading.Lock()
+_local = {'index': None, 'version': None, 'checked_at': 0.0}
+
+if not getattr(settings, 'CACHE_IS_SHARED', False):
+    logger.warning(
+        "CACHES is not shared between processes (set CACHE_URL); "
+        "reference ranges are looked up in the database instead of the index"
+    )
+
+
+def build_reference_range_index(queryset=None):
+    """
+    (lab_test_id, parameter_name, gender) -> (min_ages, ranges), both sorted by
+    min_age_months so an age lookup is a bisect. Loaded in a single query,
+    from every ReferenceRange unless `queryset` narrows it down.
+    """
+    if queryset is None:
+        queryset = ReferenceRange.objects.all()
+    grouped = {}
+    for ref in queryset.order_by('min_age_months', 'pk'):
+        grouped.setdefault((ref.lab_test_id, ref.parameter_name, ref.gender), []).append(ref)
+    return {
+        key: ([ref.min_age_months for ref in ranges], ranges)
+        for key, ranges in grouped.items()
+    }
+
+
+def _shared_version():
+    version = cache.get(INDEX_VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(INDEX_VERSION_KEY, version, timeout=None)
+    return version
+
+
+def get_reference_range_index():
+    """
+    Return the interval index, served from this worker's memory and refreshed
+    from the shared cache (or the database) only when the shared version moves.
+    Without a shared cache every call rebuilds it from the database, since an
+    edit couldn't reach the other workers' copies; the lookups below don't
+    use it in that case.
+    """
+    if not getattr(settings, 'CACHE_IS_SHARED', False):
+        return build_reference_range_index()
+
+    now = time.monotonic()
+    index = _local['index']
+    if index is not None and now - _local['checked_at'] < LOCAL_CHECK_INTERVAL:
+        return index
+
+    with _lock:
+        version = _shared_version()
+        if _local['index'] is None or _local['version'] != version:
+            key = f"{INDEX_KEY}:{version}"
+            index = cache.get(key)
+            if index is None:
+                index = build_reference_range_index()
+                cache.set(key, index, timeout=INDEX_CACHE_TIMEOUT)
+            _local['index'] = index
+            _local['version'] = version
+        _local['checked_at'] = now
+        return _local['index']
+
+
+def _lookup(index, lab_test_id, parameter_name, gender, age_months):
+    entry = index.get((lab_test_id, parameter_name, gender))
+    if entry is None:
+        return None
+    min_ages, ranges = entry
+    # Every range starting at or before the age is a candidate; walk back from
+    # the closest start and take the first one that still covers the age
+    for ref in reversed(ranges[:bisect_right(min_ages, age_months)]):
+        if ref.max_age_months >= age_months:
+            # Callers hold on to the instance, so don't hand out the shared one
+            return copy.copy(ref)
+    return None
+
+
+def _matching_ranges(lab_test_id, gender, age_months):
+    return ReferenceRange.objects.filter(
+        lab_test_id=lab_test_id,
+        min_age_months__lte=age_months,
+        max_age_months__gte=age_months,
+        gender__in={gender, 'ALL'},
+    )
+
+
+def _query_reference_range(lab_test_id, parameter_name, gender, age_months):
+    # The filtered queries used before the index, ordered so they pick the
+    # same range the index would
+    ranges = _matching_ranges(lab_test_id, gender, age_months).filter(parameter_name=parameter_name)
+    ref = None
+    if gender != 'ALL':
+        ref = ranges.filter(gender=gender).order_by('-min_age_months', '-pk').first()
+    return ref or ranges.filter(gender='ALL').order_by('-min_age_months', '-pk').first()
+
+
+def find_reference_range(lab_test_id, parameter_name, gender, age_months, index=None):
+    """
+    Reference range for a parameter at the given age, preferring the
+    gender-specific range and falling back to 'ALL'. No queries once the
+    index is loaded; without a shared cache, one or two filtered queries.
+    """
+    if index is None:
+        if not getattr(settings, 'CACHE_IS_SHARED', False):
+            return _query_reference_range(lab_test_id, parameter_name, gender, age_months)
+        index = get_reference_range_index()
+    ref = None
+    if gender != 'ALL':
+        ref = _lookup(index, lab_test_id, parameter_name, gender, age_months)
+    return ref or _lookup(index, lab_test_id, parameter_name, 'ALL', age_months)
+
+
+def find_reference_ranges(lab_test_id, parameter_names, gender, age_months):
+    """
+    Resolve a whole panel at once: {parameter_name: ReferenceRange or None}.
+    Without a shared cache the ranges the panel can match are loaded with
+    one query instead of the whole table.
+    """
+    if getattr(settings, 'CACHE_IS_SHARED', False):
+        index = get_reference_range_index()
+    else:
+        index = build_reference_range_index(
+            _matching_ranges(lab_test_id, gender, age_months).filter(parameter_name__in=list(parameter_names))
+        )
+    return {
+        name: find_reference_range(lab_test_id, name, gender, age_months, index=index)
+        for name in parameter_names
+    }
+
+
+def invalidate_reference_range_index():
+    try:
+        cache.incr(INDEX_VERSION_KEY)
+    except ValueError:
+        cache.set(INDEX_VERSION_KEY, 2, timeout=None)
+    with _lock:
+        _local['index'] = None
+
+
+@receiver(post_save, sender=ReferenceRange)
+@receiver(post_delete, sender=ReferenceRange)
+def invalidate_on_reference_range_change(sender, instance, **kwargs):
+    invalidate_reference_range_index()
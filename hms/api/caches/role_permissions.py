@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from ..models import RolePermissionModel
+
+logger = logging.getLogger(__name__)
+
+MATRIX_KEY = "role_permission_matrix"
+MATRIX_VERSION_KEY = "role_permission_matrix:version"
+MATRIX_CACHE_TIMEOUT = 60 * 60
+# How long a worker trusts its local copy before re-checking the shared version
+LOCAL_CHECK_INTERVAL = 5
+
+_lock = threading.Lock()
+_local = {'matrix': None, 'version': None, 'checked_at': 0.0}
+
+if not getattr(settings, 'CACHE_IS_SHARED', False):
+    # A per-process cache can't carry invalidations to the other workers; a
+    # revoked permission would keep granting access there
+    logger.warning(
+        "CACHES is not shared between processes (set CACHE_URL); "
+        "the role permission matrix is read from the database on every check"
+    )
+
+
+def build_role_permission_matrix():
+    """
+    (role, content_type_id) -> (can_create, can_read, can_update, can_delete),
+    loaded in a single query.
+    """
+    rows = RolePermissionModel.objects.values_list(
+        'role', 'content_type_id', 'can_create', 'can_read', 'can_update', 'can_delete'
+    )
+    return {(role, ct_id): flags for role, ct_id, *flags in rows}
+
+
+def _shared_version():
+    version = cache.get(MATRIX_VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(MATRIX_VERSION_KEY, version, timeout=None)
+    return version
+
+
+def get_role_permission_matrix():
+    """
+    Return the permission matrix, served from this worker's memory and refreshed
+    from the shared cache (or the database) only when the shared version moves.
+    Without a shared cache every call reads the database.
+    """
+    if not getattr(settings, 'CACHE_IS_SHARED', False):
+        return build_role_permission_matrix()
+
+    now = time.monotonic()
+    matrix = _local['matrix']
+    if matrix is not None and now - _local['checked_at'] < LOCAL_CHECK_INTERVAL:
+        return matrix
+
+    with _lock:
+        version = _shared_version()
+        if _local['matrix'] is None or _local['version'] != version:
+            key = f"{MATRIX_KEY}:{version}"
+            matrix = cache.get(key)
+            if matrix is None:
+                matrix = build_role_permission_matrix()
+                cache.set(key, matrix, timeout=MATRIX_CACHE_TIMEOUT)
+            _local['matrix'] = matrix
+            _local['version'] = version
+        _local['checked_at'] = now
+        return _local['matrix']
+
+
+def get_role_permission_flags(role, content_type_id):
+    """
+    Flags tuple for a role/content type pair, or None if no row exists.
+    """
+    return get_role_permission_matrix().get((role, content_type_id))
+
+
+def invalidate_role_permission_matrix():
+    try:
+        cache.incr(MATRIX_VERSION_KEY)
+    except ValueError:
+        cache.set(MATRIX_VERSION_KEY, 2, timeout=None)
+    with _lock:
+        _local['matrix'] = None
+
+
+@receiver(post_save, sender=RolePermissionModel)
+@receiver(post_delete, sender=RolePermissionModel)
+def invalidate_on_role_permission_change(sender, instance, **kwargs):
+    invalidate_role_permission_matrix()
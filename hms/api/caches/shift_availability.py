@@ -0,0 +1,133 @@
+import logging
+from bisect import bisect_right
+
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from ..models import Shift, DoctorShiftAssignment
+
+logger = logging.getLogger(__name__)
+
+AVAILABILITY_CACHE_TIMEOUT = 60 * 60 * 24
+GENERATION_KEY = "shift_availability:generation"
+
+
+def _generation():
+    """
+    Global generation stamp. Bumped whenever a Shift row changes, since a
+    single shift can be shared by any number of doctors.
+    """
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = 1
+        cache.add(GENERATION_KEY, generation, timeout=None)
+    return generation
+
+
+def _doctor_key(doctor_id):
+    return f"shift_availability:{_generation()}:doctor:{doctor_id}"
+
+
+def _merge_intervals(intervals):
+    """
+    Sort and merge overlapping (start_time, end_time) intervals so a single
+    bisect is enough to answer a lookup.
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def build_doctor_availability(doctor_id):
+    """
+    Build the availability index for one doctor: weekday -> sorted, merged
+    list of (start_time, end_time) intervals. One query for all assigned shifts.
+    """
+    rows = (
+        Shift.objects
+        .filter(doctor_assignments__doctor_id=doctor_id)
+        .values_list('day', 'start_time', 'end_time')
+        .distinct()
+    )
+    by_day = {}
+    for day, start, end in rows:
+        by_day.setdefault(day, []).append((start, end))
+    return {day: _merge_intervals(intervals) for day, intervals in by_day.items()}
+
+
+def get_doctor_availability(doctor_id):
+    """
+    Return the cached availability index for a doctor, building it on a miss.
+    """
+    key = _doctor_key(doctor_id)
+    availability = cache.get(key)
+    if availability is None:
+        availability = build_doctor_availability(doctor_id)
+        cache.set(key, availability, timeout=AVAILABILITY_CACHE_TIMEOUT)
+    return availability
+
+
+def doctor_has_shift_assignments(doctor_id):
+    return bool(get_doctor_availability(doctor_id))
+
+
+def is_doctor_available(doctor_id, appt_date, appt_time):
+    """
+    True if appt_time on appt_date's weekday falls inside one of the doctor's
+    shifts (inclusive of both ends, matching the original check).
+    """
+    intervals = get_doctor_availability(doctor_id).get(appt_date.strftime('%A'), [])
+    idx = bisect_right([start for start, _ in intervals], appt_time) - 1
+    return idx >= 0 and appt_time <= intervals[idx][1]
+
+
+def invalidate_doctor_availability(doctor_id):
+    cache.delete(_doctor_key(doctor_id))
+
+
+def invalidate_all_availability():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 2, timeout=None)
+
+
+@receiver(post_save, sender=Shift)
+@receiver(post_delete, sender=Shift)
+def invalidate_on_shift_change(sender, instance, **kwargs):
+    """
+    A shift's day or hours changed, so every index that might contain it is stale.
+    """
+    invalidate_all_availability()
+    logger.debug(f"Shift availability index invalidated by Shift {instance.pk}")
+
+
+@receiver(post_save, sender=DoctorShiftAssignment)
+def invalidate_on_doctor_assignment_save(sender, instance, created, **kwargs):
+    if created:
+        invalidate_doctor_availability(instance.doctor_id)
+    else:
+        # The assignment may have moved to another doctor; drop both sides.
+        invalidate_all_availability()
+
+
+@receiver(post_delete, sender=DoctorShiftAssignment)
+def invalidate_on_doctor_assignment_delete(sender, instance, **kwargs):
+    invalidate_doctor_availability(instance.doctor_id)
+
+
+@receiver(m2m_changed, sender=DoctorShiftAssignment.shifts.through)
+def invalidate_on_doctor_shifts_change(sender, instance, action, reverse, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        # Changed from the Shift side: the affected doctors are not at hand.
+        invalidate_all_availability()
+    else:
+        invalidate_doctor_availability(instance.doctor_id)
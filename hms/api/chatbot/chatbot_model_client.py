@@ -1,9 +1,13 @@
 import requests
 import json
 from django.conf import settings  # ✅ import Django settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Use environment variable instead of hard-coded URL
 FASTAPI_URL = getattr(settings, "MODEL_SERVICE_URL", "http://localhost:8005")
+# Connections kept open per worker process
+MODEL_SERVICE_POOL_SIZE = getattr(settings, "MODEL_SERVICE_POOL_SIZE", 10)
 
 
 def _headers():
@@ -11,67 +15,142 @@ def _headers():
     return {'Content-Type': 'application/json'}
 
 
-def post_chat(message: str, session_id: str | None = None, timeout: int = 120):
+def _url(path):
+    # Paths must match the service's routes exactly (trailing slash
+    # included); a mismatch costs an extra redirect round trip
+    return f"{FASTAPI_URL.rstrip('/')}/{path}"
+
+
+def _create_session():
     """
-    Call FastAPI /chat endpoint. Returns JSON response.
+    One keep-alive session per process. Connection failures are retried for
+    every method since nothing reached the service; 502/503/504 responses
+    only for GET/DELETE, so a chat turn is never run twice.
     """
-    url = f"{FASTAPI_URL.rstrip('/')}/chat"
-    payload = {'message': message}
-    if session_id:
-        payload['session_id'] = session_id
+    retry = Retry(
+        total=3,
+        connect=3,
+        read=0,
+        status=2,
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({'GET', 'DELETE'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MODEL_SERVICE_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(_headers())
+    return session
 
-    print(f"DEBUG: Attempting to connect to FastAPI at: {url}")
-    print(f"DEBUG: Payload: {payload}")
-    print(f"DEBUG: Headers: {_headers()}")
 
-    try:
-        # First, test if the FastAPI server is reachable
-        print(f"DEBUG: Testing connection to {FASTAPI_URL}")
-        health_resp = requests.get(f"{FASTAPI_URL.rstrip('/')}/health", timeout=10)
-        print(f"DEBUG: Health check status: {health_resp.status_code}")
-        print(f"DEBUG: Health check response: {health_resp.text}")
-    except Exception as health_e:
-        print(f"DEBUG: Health check failed: {health_e}")
-        print("DEBUG: FastAPI server may not be running or reachable")
+_session = _create_session()
+
 
+def _raise_for_status(resp):
     try:
-        resp = requests.post(url, json=payload, headers=_headers(), timeout=timeout)
-        print(f"DEBUG: POST response status: {resp.status_code}")
-        print(f"DEBUG: POST response headers: {dict(resp.headers)}")
-        print(f"DEBUG: POST response text: {resp.text}")
-        
-        if resp.status_code == 404:
-            print("DEBUG: 404 - Check if endpoint exists and FastAPI is running correctly")
-        elif resp.status_code == 502:
-            print("DEBUG: 502 - Bad Gateway, likely FastAPI server issue")
-        
         resp.raise_for_status()
-        return resp.json()
-    except requests.exceptions.ConnectionError as e:
-        print(f"DEBUG: Connection error - FastAPI server likely not running: {e}")
-        raise Exception(f"Cannot connect to FastAPI server at {FASTAPI_URL}. Is it running?")
-    except requests.exceptions.Timeout as e:
-        print(f"DEBUG: Timeout error: {e}")
-        raise Exception(f"Request to FastAPI timed out after {timeout} seconds")
     except requests.exceptions.HTTPError as e:
-        print(f"DEBUG: HTTP error: {e}")
-        print(f"DEBUG: Response content: {e.response.text if e.response else 'No response'}")
         raise Exception(f"FastAPI returned HTTP error: {e}")
+
+
+def _request(method, path, timeout, **kwargs):
+    try:
+        return _session.request(method, _url(path), timeout=timeout, **kwargs)
+    except requests.exceptions.ConnectionError:
+        raise Exception(f"Cannot connect to FastAPI server at {FASTAPI_URL}. Is it running?")
+    except requests.exceptions.Timeout:
+        raise Exception(f"Request to FastAPI timed out after {timeout} seconds")
     except requests.exceptions.RequestException as e:
-        print(f"DEBUG: Request exception: {e}")
         raise Exception(f"Request to FastAPI failed: {e}")
+
+
+def _chat_payload(message, session_id, summary):
+    payload = {'message': message}
+    if session_id:
+        payload['session_id'] = session_id
+    if summary:
+        payload['summary'] = summary
+    return payload
+
+
+def post_chat(message: str, session_id: str | None = None, timeout: int = 120, summary: str | None = None):
+    """
+    Call FastAPI /chat endpoint. Returns JSON response.
+    `summary` is the conversation's rolling summary, used by the model
+    service in place of turns that don't fit its memory budget.
+    """
+    resp = _request('POST', 'chat/', timeout, json=_chat_payload(message, session_id, summary))
+    _raise_for_status(resp)
+    try:
+        return resp.json()
     except json.JSONDecodeError as e:
-        print(f"DEBUG: JSON decode error: {e}")
-        print(f"DEBUG: Raw response: {resp.text}")
         raise Exception(f"Invalid JSON response from FastAPI: {e}")
 
 
+def _parse_sse(lines):
+    """Yield (event, data) from server-sent event lines; data is JSON-decoded."""
+    event, data = 'message', []
+    for line in lines:
+        if not line:
+            if data:
+                yield event, json.loads('\n'.join(data))
+            event, data = 'message', []
+        elif line.startswith(':'):
+            continue
+        elif line.startswith('event:'):
+            event = line[len('event:'):].strip()
+        elif line.startswith('data:'):
+            data.append(line[len('data:'):].lstrip())
+    if data:
+        yield event, json.loads('\n'.join(data))
+
+
+def stream_chat(message: str, session_id: str | None = None, timeout: int = 120, summary: str | None = None):
+    """
+    Call FastAPI /chat/stream and yield (event, data) as they arrive:
+    ('token', {'token': ...}) while the answer is generated, then one
+    ('done', <same body as post_chat>) or ('error', {'status', 'detail'}).
+    `timeout` bounds the wait for each chunk, not the whole answer.
+    """
+    resp = _request(
+        'POST', 'chat/stream/', timeout,
+        json=_chat_payload(message, session_id, summary),
+        headers={'Accept': 'text/event-stream'},
+        stream=True,
+    )
+    with resp:
+        _raise_for_status(resp)
+        # SSE is UTF-8 by definition; don't let requests guess
+        resp.encoding = 'utf-8'
+        try:
+            yield from _parse_sse(resp.iter_lines(decode_unicode=True))
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Stream from FastAPI interrupted: {e}")
+        except json.JSONDecodeError as e:
+            raise Exception(f"Invalid event from FastAPI: {e}")
+
+
+def summarize(messages, previous_summary: str | None = None, timeout: int = 120):
+    """
+    Fold `messages` ([{role, content}]) into `previous_summary` via FastAPI
+    /summarize. Returns the new summary text.
+    """
+    payload = {'messages': messages}
+    if previous_summary:
+        payload['previous_summary'] = previous_summary
+    resp = _request('POST', 'summarize/', timeout, json=payload)
+    _raise_for_status(resp)
+    return resp.json()['summary']
+
+
 def delete_session(session_id: str, timeout: int = 30):
     """
     Delete a conversation session in FastAPI
     """
-    url = f"{FASTAPI_URL.rstrip('/')}/chat/{session_id}"
-    resp = requests.delete(url, headers=_headers(), timeout=timeout)
+    resp = _request('DELETE', f'chat/{session_id}/', timeout)
     if resp.status_code == 404:
         return None
     resp.raise_for_status()
@@ -82,7 +161,6 @@ def get_sessions(timeout: int = 30):
     """
     List active sessions from FastAPI
     """
-    url = f"{FASTAPI_URL.rstrip('/')}/sessions"
-    resp = requests.get(url, headers=_headers(), timeout=timeout)
+    resp = _request('GET', 'sessions', timeout)
     resp.raise_for_status()
     return resp.json()
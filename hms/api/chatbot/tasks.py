@@ -2,49 +2,48 @@
 from celery import shared_task
 from django.utils import timezone
 from ..models import Conversation
-from .chatbot_model_client import *
+from .chatbot_model_client import summarize
+
+# Messages folded into the summary per run at most; a long backlog (e.g. an
+# old conversation summarised for the first time) is covered by its tail
+MAX_SUMMARY_MESSAGES = 50
+
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=30)
 def summarize_conversation(self, conversation_id):
     """
     Create/update a rolling summary for the conversation.
-    We call the model service with a summarization instruction that asks for a short
-    bullet/paragraph summary that captures key facts and intent.
+    Only the messages newer than the current summary are sent, together with
+    that summary, so each refresh costs the same however long the
+    conversation is. The model service uses the summary in place of turns
+    that fall outside its memory budget.
     """
     try:
         convo = Conversation.objects.get(pk=conversation_id)
     except Conversation.DoesNotExist:
         return {"error": "conversation not found"}
 
-    # load recent messages (we can adjust how many we include in the summarization prompt)
-    recent_msgs = list(convo.messages.order_by('id').values('role', 'content')[-50:])  # last 50 messages approx
-
-    # Build summarization prompt. Adapt to your model-service API.
-    summarization_instruction = (
-        "You are a summarizer. Produce a concise summary of the conversation that captures "
-        "the user's goals, key facts, and outstanding tasks, in 2-4 sentences. Use consistent "
-        "naming for people, dates and actions."
+    upto = convo.message_count
+    start = max(convo.summary_upto, upto - MAX_SUMMARY_MESSAGES)
+    new_msgs = list(
+        convo.messages.filter(sequence__gte=start, sequence__lt=upto).order_by('sequence').values('role', 'content')
     )
-
-    # Build a single text blob for the model; if your model client supports a dedicated summary endpoint use that
-    conversation_text = "\n".join([f"{m['role'].capitalize()}: {m['content']}" for m in recent_msgs])
-    prompt = f"{summarization_instruction}\n\nConversation:\n{conversation_text}\n\nSummary:"
+    if not new_msgs:
+        return {"convo_id": conversation_id, "summary_len": len(convo.summary)}
 
     try:
-        # This assumes chatbot_model_client.post_chat can accept a 'message' and optional session id.
-        # If you have a specialized summarization endpoint, call that instead.
-        resp = post_chat(prompt, convo.session_id)
+        summary_text = summarize(new_msgs, convo.summary)
     except Exception as e:
         # optional: retry logic
         raise self.retry(exc=e)
 
-    # Extract model output (this depends on model_resp shape)
-    summary_text = resp.get('response') or (resp.get('conversation_history') and resp['conversation_history'][-1].get('content'))
     if not summary_text:
         return {"error": "no summary text returned"}
 
-    convo.summary = summary_text.strip()
-    convo.last_summary_at = timezone.now()
-    convo.save(update_fields=['summary', 'last_summary_at'])
-
-    return {"convo_id": conversation_id, "summary_len": len(convo.summary)}
+    # Only move forward: a concurrent run that already covered more wins
+    updated = Conversation.objects.filter(pk=conversation_id, summary_upto__lt=upto).update(
+        summary=summary_text.strip(),
+        summary_upto=upto,
+        last_summary_at=timezone.now(),
+    )
+    return {"convo_id": conversation_id, "summary_len": len(summary_text.strip()), "updated": bool(updated)}
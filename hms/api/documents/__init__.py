@@ -1,4 +1,4 @@
-from .profile_documents import DoctorProfileDocument
+from .profile_documents import DoctorProfileDocument, NurseProfileDocument, PharmacistProfileDocument, LabTechProfileDocument
 from .admission_documents import AdmissionDocument
 from .user_documents import UserDocument
 from .child_documents import ChildDocument
@@ -7,4 +7,5 @@ from .diagnosis_documents import DiagnosisDocument
 from .drug_documents import DrugDocument, DrugInteractionDocument
 from .prescription_documents import PrescriptionItemDocument
 from .vaccination_documents import VaccinationRecordDocument
-from .lab_documents import LabRequestItemDocument, LabResultParameterDocument
\ No newline at end of file
+from .lab_documents import LabRequestItemDocument, LabResultParameterDocument
+from .utils import sync_search_index
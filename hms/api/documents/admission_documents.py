@@ -1,6 +1,7 @@
 from django_elasticsearch_dsl import Document, fields
 from django_elasticsearch_dsl.registries import registry
-from ..models import AdmissionRecord
+from ..models import AdmissionRecord, Child
+from .utils import guardian_ids
 
 @registry.register_document
 class AdmissionDocument(Document):
@@ -8,6 +9,7 @@ class AdmissionDocument(Document):
     child_last_name = fields.TextField(attr="child.last_name")
     doctor_first_name = fields.TextField(attr="attending_doctor.first_name")
     doctor_last_name = fields.TextField(attr="attending_doctor.last_name")
+    guardian_ids = fields.IntegerField(multi=True)
 
     class Index: 
         name = "admissions"
@@ -21,4 +23,13 @@ class AdmissionDocument(Document):
         fields = [
             "id", "admission_reason", "initial_diagnosis", "admission_date", "discharge_date",
         ]
+        related_models = [Child]
+
+    def prepare_guardian_ids(self, instance):
+        return guardian_ids(instance.child)
+
+    def get_instances_from_related(self, related_instance):
+        # The permission fields come from the child's guardians; re-index
+        # its records whenever the child is saved
+        return AdmissionRecord.objects.filter(child=related_instance)
         
@@ -8,6 +8,8 @@ class AppointmentDocument(Document):
     child_last_name = fields.TextField(attr="child.last_name")
     doctor_first_name = fields.TextField(attr="doctor.first_name")
     doctor_last_name = fields.TextField(attr="doctor.last_name")
+    doctor_id = fields.IntegerField(attr="doctor_id")
+    parent_id = fields.IntegerField(attr="parent_id")
 
     class Index:
         name = "appointments"
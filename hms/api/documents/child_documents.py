@@ -1,12 +1,13 @@
 from django_elasticsearch_dsl import Document, fields
 from django_elasticsearch_dsl.registries import registry
 from ..models import Child
+from .utils import guardian_ids
 
 @registry.register_document
 class ChildDocument(Document):
-    primary_guardian_name = fields.TextField(attr="get_primary_guardian_name")
-    secondary_guardian_name = fields.TextField(attr="get_secondary_guardian_name")
-    
+    primary_guardian_name = fields.TextField()
+    secondary_guardian_name = fields.TextField()
+    guardian_ids = fields.IntegerField(multi=True)
 
     class Index:
         name = "childs"  # Elasticsearch index name
@@ -23,10 +24,13 @@ class ChildDocument(Document):
             "age",
         ]
 
-    def get_primary_guardian_name(self, obj):
+    def prepare_primary_guardian_name(self, obj):
         """Return primary guardian name or empty string if None."""
-        return obj.primary_guardian.parentprofile.first_name if obj.primary_guardian else ""
+        return obj.primary_guardian.first_name if obj.primary_guardian else ""
 
-    def get_secondary_guardian_name(self, obj):
+    def prepare_secondary_guardian_name(self, obj):
         """Return secondary guardian name or empty string if None."""
-        return obj.secondary_guardian.parentprofile.first_name if obj.secondary_guardian else ""
+        return obj.secondary_guardian.first_name if obj.secondary_guardian else ""
+
+    def prepare_guardian_ids(self, obj):
+        return guardian_ids(obj)
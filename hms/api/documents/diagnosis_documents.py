@@ -1,6 +1,6 @@
 from django_elasticsearch_dsl import Document, fields
 from django_elasticsearch_dsl.registries import registry
-from ..models import Diagnosis
+from ..models import Child, Diagnosis
 
 @registry.register_document
 class DiagnosisDocument(Document):
@@ -8,6 +8,8 @@ class DiagnosisDocument(Document):
     child_last_name = fields.TextField(attr="child.last_name")
     doctor_first_name = fields.TextField(attr="doctor.first_name")
     doctor_last_name = fields.TextField(attr="doctor.last_name")
+    doctor_id = fields.IntegerField(attr="doctor_id")
+    primary_guardian_id = fields.IntegerField(attr="child.primary_guardian_id")
     
     class Index:
         name = "diagnoses"
@@ -21,4 +23,10 @@ class DiagnosisDocument(Document):
         fields = [
 "id", "icd_code", "title", "description", "status", "severity", "onset_date", 
 "date_diagnosed", "resolution_date", "is_chronic", "is_congenital", "clinical_findings", "notes"
-        ]
\ No newline at end of file
+        ]
+        related_models = [Child]
+
+    def get_instances_from_related(self, related_instance):
+        # The permission fields come from the child's guardians; re-index
+        # its records whenever the child is saved
+        return Diagnosis.objects.filter(child=related_instance)
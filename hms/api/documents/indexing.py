@@ -0,0 +1,148 @@
+import logging
+import threading
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django_elasticsearch_dsl.registries import registry
+
+logger = logging.getLogger(__name__)
+
+INDEX = 'index'
+DELETE = 'delete'
+INDEX_CHUNK_SIZE = 500
+
+# Indexed only so searches can check permissions inside the query
+PERMISSION_FIELDS = ["guardian_ids", "primary_guardian_id", "doctor_id", "parent_id"]
+
+
+class ElasticsearchIndexBackend:
+    """
+    Sends actions through the elasticsearch bulk helper, one request per
+    chunk_size actions.
+    """
+
+    def __init__(self, chunk_size=INDEX_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+
+    def bulk(self, actions):
+        from elasticsearch.helpers import bulk
+        from elasticsearch_dsl.connections import connections
+
+        success, errors = bulk(
+            connections.get_connection(), actions,
+            chunk_size=self.chunk_size, raise_on_error=False, stats_only=False,
+        )
+        # Deleting a document that was never indexed is not a failure
+        failed = [e for e in errors if e.get('delete', {}).get('status') != 404]
+        for error in failed[:5]:
+            logger.error(f"Search index bulk error: {error}")
+        return success, len(failed)
+
+
+class InMemoryIndexBackend:
+    """
+    Local stand-in that keeps documents in dicts, for tests and dry runs of
+    the indexing pipeline without an Elasticsearch cluster.
+    """
+
+    def __init__(self):
+        self.indices = defaultdict(dict)
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def bulk(self, actions):
+        count = 0
+        with self._lock:
+            self.requests += 1
+            for action in actions:
+                index = self.indices[action['_index']]
+                if action.get('_op_type', INDEX) == DELETE:
+                    index.pop(str(action['_id']), None)
+                else:
+                    index[str(action['_id'])] = action['_source']
+                count += 1
+        return count, 0
+
+    def clear(self):
+        with self._lock:
+            self.indices.clear()
+            self.requests = 0
+
+
+_memory_backend = InMemoryIndexBackend()
+
+
+def get_index_backend(name=None, chunk_size=INDEX_CHUNK_SIZE):
+    """
+    Backend named by `name` or settings.SEARCH_INDEX_BACKEND: 'elasticsearch'
+    (default), 'postgres' or 'memory'. The memory backend is one shared
+    instance per process so what was indexed can be inspected afterwards.
+    """
+    name = name or getattr(settings, 'SEARCH_INDEX_BACKEND', 'elasticsearch')
+    if name == 'memory':
+        return _memory_backend
+    if name == 'postgres':
+        from .postgres_search import PostgresIndexBackend
+
+        return PostgresIndexBackend(chunk_size=chunk_size)
+    return ElasticsearchIndexBackend(chunk_size=chunk_size)
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def document_actions(document_class, ids):
+    """
+    Bulk actions bringing `ids` of the document's model up to date: an index
+    action for every row that exists, a delete for every id that doesn't.
+    """
+    document = document_class()
+    index_name = document_class._index._name
+    found = set()
+    queryset = document.get_queryset().filter(pk__in=ids)
+    for instance in queryset.iterator(chunk_size=INDEX_CHUNK_SIZE):
+        found.add(instance.pk)
+        yield {
+            '_op_type': INDEX,
+            '_index': index_name,
+            '_id': document_class.generate_id(instance),
+            '_source': document.prepare(instance),
+        }
+    for pk in set(ids) - found:
+        yield {'_op_type': DELETE, '_index': index_name, '_id': pk}
+
+
+def _indexed_documents(model):
+    return [
+        document for document in registry.get_documents(models=[model])
+        if not getattr(document.django, 'ignore_signals', False)
+    ]
+
+
+def apply_index_changes(changes, backend=None):
+    """
+    Apply queued [model_label, pk, op] changes with one bulk call per
+    document. Repeats are coalesced first. The database decides the action:
+    rows that exist are (re)indexed and missing ones deleted, so a stale
+    'index' for a deleted row, or a 'delete' from a rolled-back transaction,
+    still leaves the index right. Returns (indexed, failed).
+    """
+    backend = backend or get_index_backend()
+    by_model = defaultdict(dict)
+    for label, pk, op in changes:
+        by_model[label][pk] = op
+
+    indexed = failed = 0
+    for label, ops in by_model.items():
+        try:
+            model = apps.get_model(label)
+        except LookupError:
+            logger.error(f"Skipping search index changes for unknown model {label}")
+            continue
+        for document_class in _indexed_documents(model):
+            ok, errors = backend.bulk(document_actions(document_class, list(ops)))
+            indexed += ok
+            failed += errors
+    return indexed, failed
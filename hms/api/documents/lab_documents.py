@@ -1,17 +1,21 @@
 from django_elasticsearch_dsl import Document, fields
 from django_elasticsearch_dsl.registries import registry
-from ..models import LabRequestItem, LabResultParameter
+from ..models import Child, LabRequestItem, LabResultParameter
+from .utils import guardian_ids
 
 @registry.register_document
 class LabRequestItemDocument(Document):
-    child_first_nmame = fields.TextField(attr="lab_request.child.first_name")
+    child_first_name = fields.TextField(attr="lab_request.child.first_name")
     child_last_name = fields.TextField(attr="lab_request.child.last_name")
     
     doctor_first_name = fields.TextField(attr="lab_request.requested_by.first_name")
     doctor_last_name = fields.TextField(attr="lab_request.requested_by.last_name")
     
-    lab_test_code = fields.TextField(attr="lab_request.lab_test.code")
-    lab_test_name = fields.TextField(attr="lab_request.lab_test.name")
+    lab_test_code = fields.TextField(attr="lab_test.code")
+    lab_test_name = fields.TextField(attr="lab_test.name")
+
+    doctor_id = fields.IntegerField(attr="lab_request.requested_by_id")
+    guardian_ids = fields.IntegerField(multi=True)
     
     
     class Index:
@@ -24,11 +28,20 @@ class LabRequestItemDocument(Document):
     class Django:
         model = LabRequestItem
         fields = ["id", "notes"]
+        related_models = [Child]
+
+    def prepare_guardian_ids(self, instance):
+        return guardian_ids(instance.lab_request.child)
+
+    def get_instances_from_related(self, related_instance):
+        # The permission fields come from the child's guardians; re-index
+        # its records whenever the child is saved
+        return LabRequestItem.objects.filter(lab_request__child=related_instance)
 
 
 @registry.register_document
 class LabResultParameterDocument(Document):
-    child_first_nmame = fields.TextField(attr="lab_result.lab_request_item.lab_request.child.first_name")
+    child_first_name = fields.TextField(attr="lab_result.lab_request_item.lab_request.child.first_name")
     child_last_name = fields.TextField(attr="lab_result.lab_request_item.lab_request.child.last_name")
     
     doctor_first_name = fields.TextField(attr="lab_result.lab_request_item.lab_request.requested_by.first_name")
@@ -37,6 +50,9 @@ class LabResultParameterDocument(Document):
     lab_test_code = fields.TextField(attr="lab_result.lab_request_item.lab_test.code")
     lab_test_name = fields.TextField(attr="lab_result.lab_request_item.lab_test.name")
 
+    doctor_id = fields.IntegerField(attr="lab_result.lab_request_item.lab_request.requested_by_id")
+    guardian_ids = fields.IntegerField(multi=True)
+
 
     class Index: 
         name = "lab-result-parameters"
@@ -48,4 +64,13 @@ class LabResultParameterDocument(Document):
     class Django:
         model = LabResultParameter
         fields = ["id", "parameter_name", "value", "unit", "status", "notes"]
+        related_models = [Child]
+
+    def prepare_guardian_ids(self, instance):
+        return guardian_ids(instance.lab_result.lab_request_item.lab_request.child)
+
+    def get_instances_from_related(self, related_instance):
+        # The permission fields come from the child's guardians; re-index
+        # its records whenever the child is saved
+        return LabResultParameter.objects.filter(lab_result__lab_request_item__lab_request__child=related_instance)
         
\ No newline at end of file
@@ -0,0 +1,169 @@
+import re
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import transaction
+from django.db.models import F, Q, Value
+from django.db.models.fields.json import KeyTextTransform
+
+from ..models import SearchEntry
+from .indexing import DELETE, INDEX, INDEX_CHUNK_SIZE, PERMISSION_FIELDS
+
+# No stemming or stop words, like the standard analyzer's tokens
+SEARCH_CONFIG = 'simple'
+TOKEN_RE = re.compile(r'\w+')
+# pg_trgm can't use the index for shorter patterns
+MIN_TRIGRAM_QUERY = 3
+HIGHLIGHT_FRAGMENT_SIZE = 150
+
+
+def document_text(source):
+    """Searchable text of a prepared document: its string values."""
+    return ' '.join(
+        value for key, value in source.items()
+        if key not in PERMISSION_FIELDS and isinstance(value, str) and value
+    )
+
+
+class PostgresIndexBackend:
+    """
+    Index backend that keeps documents in SearchEntry rows. Each chunk is
+    one upsert, one tsvector UPDATE and one DELETE.
+    """
+
+    def __init__(self, chunk_size=INDEX_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+
+    def bulk(self, actions):
+        written, batch = 0, []
+        for action in actions:
+            batch.append(action)
+            if len(batch) >= self.chunk_size:
+                written += self._write(batch)
+                batch = []
+        if batch:
+            written += self._write(batch)
+        return written, 0
+
+    def _write(self, actions):
+        upserts, deletes = {}, defaultdict(set)
+        for action in actions:
+            index, object_id = action['_index'], str(action['_id'])
+            if action.get('_op_type', INDEX) == DELETE:
+                upserts.pop((index, object_id), None)
+                deletes[index].add(object_id)
+            else:
+                deletes[index].discard(object_id)
+                upserts[(index, object_id)] = action['_source']
+
+        with transaction.atomic():
+            for index, object_ids in deletes.items():
+                if object_ids:
+                    SearchEntry.objects.filter(index=index, object_id__in=object_ids).delete()
+            if upserts:
+                SearchEntry.objects.bulk_create(
+                    [
+                        SearchEntry(index=index, object_id=object_id, source=source, search_text=document_text(source))
+                        for (index, object_id), source in upserts.items()
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['index', 'object_id'],
+                    update_fields=['source', 'search_text', 'updated_at'],
+                )
+                by_index = defaultdict(list)
+                for index, object_id in upserts:
+                    by_index[index].append(object_id)
+                for index, object_ids in by_index.items():
+                    SearchEntry.objects.filter(index=index, object_id__in=object_ids).update(
+                        search_vector=SearchVector('search_text', config=SEARCH_CONFIG)
+                    )
+        return len(actions)
+
+
+def phrase_prefix_query(text):
+    """
+    The tsquery equivalent of a phrase_prefix match: every term in order,
+    the last one as a prefix ("amox cap" -> 'amox <-> cap:*').
+    """
+    tokens = TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return None
+    return SearchQuery(' <-> '.join(tokens[:-1] + [f'{tokens[-1]}:*']), search_type='raw', config=SEARCH_CONFIG)
+
+
+def _terms_condition(clause):
+    # terms_filter() clauses: {"terms": {field: [values]}}. Permission fields
+    # may hold a scalar or a list, so match either shape.
+    field, values = next(iter(clause.to_dict()['terms'].items()))
+    if not values:
+        return Q(pk__in=[])
+    return reduce(or_, [Q(source__contains={field: value}) | Q(source__contains={field: [value]}) for value in values])
+
+
+def _highlight(source, search_fields, pattern):
+    highlights = {}
+    for field in search_fields:
+        value = source.get(field)
+        if not isinstance(value, str):
+            continue
+        match = pattern.search(value)
+        if not match:
+            continue
+        start = max(match.start() - HIGHLIGHT_FRAGMENT_SIZE // 3, 0)
+        fragment = value[start:start + HIGHLIGHT_FRAGMENT_SIZE]
+        highlights[field] = [pattern.sub(lambda m: f'<em>{m.group(0)}</em>', fragment)]
+    return highlights
+
+
+def search_entries(index, query, search_fields, filters=(), source_fields=None, offset=0, size=10):
+    """
+    Phrase-prefix search over one index's SearchEntry rows, restricted to
+    `search_fields`. The GIN indexes narrow the candidates (tsvector for
+    whole terms and prefixes, trigram for substrings like ICD codes) and the
+    per-field checks run on those rows only. Returns (total, hits) shaped
+    like elastic_search() hits.
+    """
+    tsquery = phrase_prefix_query(query)
+    queryset = SearchEntry.objects.filter(index=index)
+
+    match = Q(pk__in=[])
+    if tsquery is not None:
+        queryset = queryset.annotate(
+            field_vector=SearchVector(*[KeyTextTransform(field, 'source') for field in search_fields], config=SEARCH_CONFIG)
+        )
+        match |= Q(search_vector=tsquery) & Q(field_vector=tsquery)
+    text = query.strip()
+    if len(text) >= MIN_TRIGRAM_QUERY:
+        match |= Q(search_text__icontains=text) & reduce(
+            or_, [Q(**{f'source__{field}__icontains': text}) for field in search_fields]
+        )
+    queryset = queryset.filter(match)
+    for clause in filters:
+        queryset = queryset.filter(_terms_condition(clause))
+
+    rank = TrigramWordSimilarity(Value(text), 'search_text')
+    if tsquery is not None:
+        rank = SearchRank(F('field_vector'), tsquery) + rank
+    queryset = queryset.annotate(score=rank)
+
+    total = queryset.count()
+    page = queryset.order_by('-score', 'id').values('object_id', 'source', 'score')[offset:offset + size]
+
+    tokens = TOKEN_RE.findall(query.lower())
+    pattern = re.compile(r'\b(?:' + '|'.join(re.escape(token) for token in tokens) + r')\w*', re.IGNORECASE) if tokens else None
+
+    hits = []
+    for entry in page:
+        source = entry['source']
+        if source_fields:
+            row = {key: value for key, value in source.items() if key in source_fields}
+        else:
+            row = {key: value for key, value in source.items() if key not in PERMISSION_FIELDS}
+        object_id = entry['object_id']
+        row.setdefault('id', int(object_id) if object_id.isdigit() else object_id)
+        row['score'] = entry['score']
+        row['highlight'] = _highlight(source, search_fields, pattern) if pattern else {}
+        hits.append(row)
+    return total, hits
@@ -1,6 +1,6 @@
 from django_elasticsearch_dsl import Document, fields
 from django_elasticsearch_dsl.registries import registry
-from ..models import PrescriptionItem
+from ..models import Child, PrescriptionItem
 
 @registry.register_document
 class PrescriptionItemDocument(Document):
@@ -13,6 +13,8 @@ class PrescriptionItemDocument(Document):
     drug_brand_name = fields.TextField(attr="drug.brand_name")
     drug_generic_name = fields.TextField(attr="drug.generic_name")
     drug_category = fields.TextField(attr="drug.category")
+    doctor_id = fields.IntegerField(attr="prescription.doctor_id")
+    primary_guardian_id = fields.IntegerField(attr="prescription.child.primary_guardian_id")
     
     class Index:
         name = "prescription-items"
@@ -26,4 +28,10 @@ class PrescriptionItemDocument(Document):
         fields = [
 "id","dosage", "frequency", "duration_value", "duration_unit", "max_refills", "refills_used", "instructions", "is_weight_based", "dose_per_kg", "min_dose", "max_dose"
         ]
+        related_models = [Child]
+
+    def get_instances_from_related(self, related_instance):
+        # The permission fields come from the child's guardians; re-index
+        # its records whenever the child is saved
+        return PrescriptionItem.objects.filter(prescription__child=related_instance)
     
\ No newline at end of file
@@ -0,0 +1,152 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django_elasticsearch_dsl.apps import DEDConfig
+from django_elasticsearch_dsl.registries import registry
+from django_elasticsearch_dsl.signals import BaseSignalProcessor
+from django.db.models import signals
+
+from .indexing import INDEX, DELETE, model_label
+
+logger = logging.getLogger(__name__)
+
+# Changes per Celery task; a bulk import of 10k rows becomes 20 tasks
+QUEUE_BATCH_SIZE = 500
+
+
+class SearchIndexQueue:
+    """
+    Collects (model, pk, op) changes made during a transaction and hands them
+    to Celery once it commits. A row saved several times in one transaction
+    is sent once, with its last op.
+
+    Callers add() every change first and then schedule() once, so a bulk
+    change outside a transaction is still sent in batches rather than one
+    task per row.
+    """
+
+    def __init__(self, batch_size=QUEUE_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._local = threading.local()
+
+    @property
+    def pending(self):
+        if not hasattr(self._local, 'pending'):
+            self._local.pending = {}
+        return self._local.pending
+
+    def add(self, model, pk, op):
+        """Record a change; it is sent by the next schedule()."""
+        self.pending[(model_label(model), pk)] = op
+
+    def schedule(self):
+        """
+        Send the pending changes now when outside a transaction, otherwise
+        once the current one commits (one callback per transaction).
+        """
+        if not self.pending:
+            return
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            self.dispatch()
+        elif not self._scheduled(connection):
+            transaction.on_commit(self.dispatch)
+
+    def _scheduled(self, connection):
+        # Looked up rather than remembered: a rollback discards the callback
+        # with its transaction, and the changes it leaves behind then go out
+        # with the next commit, where the task checks them against the
+        # database.
+        return any(entry[1] == self.dispatch for entry in connection.run_on_commit)
+
+    def drain(self):
+        """Take this thread's pending changes as [model_label, pk, op] lists."""
+        changes = [[label, pk, op] for (label, pk), op in self.pending.items()]
+        self._local.pending = {}
+        return changes
+
+    def dispatch(self):
+        changes = self.drain()
+        if not changes:
+            return
+        from ..tasks import apply_search_index_changes_task
+
+        for start in range(0, len(changes), self.batch_size):
+            batch = changes[start:start + self.batch_size]
+            try:
+                apply_search_index_changes_task.delay(batch)
+            except Exception as e:
+                logger.error(f"Could not queue {len(batch)} search index changes: {e}")
+
+
+search_index_queue = SearchIndexQueue(getattr(settings, 'SEARCH_INDEX_QUEUE_BATCH_SIZE', QUEUE_BATCH_SIZE))
+
+
+def queue_search_index(model, ids, op=INDEX):
+    for pk in ids:
+        search_index_queue.add(model, pk, op)
+    search_index_queue.schedule()
+
+
+class QueuedSignalProcessor(BaseSignalProcessor):
+    """
+    Signal processor that never talks to Elasticsearch inside a request:
+    saves and deletes are queued (see SearchIndexQueue) and written by the
+    apply_search_index_changes_task with the bulk helper.
+
+    Enable with ELASTICSEARCH_DSL_SIGNAL_PROCESSOR.
+    """
+
+    def setup(self):
+        signals.post_save.connect(self.handle_save)
+        signals.post_delete.connect(self.handle_delete)
+        signals.m2m_changed.connect(self.handle_m2m_changed)
+        signals.pre_delete.connect(self.handle_pre_delete)
+
+    def teardown(self):
+        signals.post_save.disconnect(self.handle_save)
+        signals.post_delete.disconnect(self.handle_delete)
+        signals.m2m_changed.disconnect(self.handle_m2m_changed)
+        signals.pre_delete.disconnect(self.handle_pre_delete)
+
+    def _queue_related(self, instance):
+        # Documents that embed this model through Django.related_models
+        for document in registry.get_documents():
+            if instance.__class__ not in getattr(document.django, 'related_models', []):
+                continue
+            related = document().get_instances_from_related(instance)
+            if related is None:
+                continue
+            if isinstance(related, document.django.model):
+                pks = [related.pk]
+            else:
+                # Only the keys are queued, so don't load every related row
+                pks = related.values_list('pk', flat=True) if hasattr(related, 'values_list') else [obj.pk for obj in related]
+            for pk in pks:
+                search_index_queue.add(document.django.model, pk, INDEX)
+
+    def handle_save(self, sender, instance, **kwargs):
+        if not DEDConfig.autosync_enabled():
+            return
+        if instance.__class__ in registry.get_models():
+            search_index_queue.add(instance.__class__, instance.pk, INDEX)
+        self._queue_related(instance)
+        search_index_queue.schedule()
+
+    def handle_pre_delete(self, sender, instance, **kwargs):
+        if DEDConfig.autosync_enabled():
+            self._queue_related(instance)
+            search_index_queue.schedule()
+
+    def handle_delete(self, sender, instance, **kwargs):
+        if DEDConfig.autosync_enabled() and instance.__class__ in registry.get_models():
+            search_index_queue.add(instance.__class__, instance.pk, DELETE)
+            search_index_queue.schedule()
+
+    def handle_m2m_changed(self, sender, instance, action, **kwargs):
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            self.handle_save(sender, instance)
+        elif action in ('pre_remove', 'pre_clear'):
+            self.handle_pre_delete(sender, instance)
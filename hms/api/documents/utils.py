@@ -0,0 +1,34 @@
+import logging
+
+from django_elasticsearch_dsl.registries import registry
+
+from .signals import queue_search_index
+
+logger = logging.getLogger(__name__)
+
+
+def sync_search_index(model, ids):
+    """
+    Re-index rows changed with queryset.update() or bulk_create(), which
+    bypass the save signals the Elasticsearch registry normally listens to.
+    The ids go through the same commit-time queue as signal changes, so the
+    index is written in bulk by a Celery task.
+    """
+    if not ids:
+        return
+    if not registry.get_documents(models=[model]):
+        return
+    try:
+        queue_search_index(model, ids)
+    except Exception as e:
+        logger.error(f"Failed to queue re-index of {len(ids)} {model.__name__} rows: {e}")
+
+
+def guardian_ids(child):
+    """
+    ParentProfile ids allowed to see `child`'s records, for the guardian_ids
+    permission field searches filter on.
+    """
+    if child is None:
+        return []
+    return [pk for pk in (child.primary_guardian_id, child.secondary_guardian_id) if pk is not None]
@@ -4,6 +4,18 @@ from django.dispatch import receiver
 from ..tasks import send_email_task
 import sys
 
+def child_added_email(child):
+    """(subject, message) telling the primary guardian `child` was added."""
+    subject = "Your Child Has Been Added to the System"
+    message = (
+        f"Dear {child.primary_guardian.user.username},\n\n"
+        f"We are pleased to inform you that your child, {child.first_name} {child.last_name}, has been successfully added to the hospital system.\n\n"
+        "You can now access their medical records and updates through the portal.\n\n"
+        "Best regards,\nHospital Admin"
+    )
+    return subject, message
+
+
 @receiver(post_save, sender=Child)
 def send_child_added_email(sender, instance, created, **kwargs):
     # Avoid sending emails during migrations
@@ -11,14 +23,8 @@ def send_child_added_email(sender, instance, created, **kwargs):
         return
 
     if created and instance.primary_guardian:
-        subject = "Your Child Has Been Added to the System"
-        message = (
-            f"Dear {instance.primary_guardian.user.username},\n\n"
-            f"We are pleased to inform you that your child, {instance.first_name} {instance.last_name}, has been successfully added to the hospital system.\n\n"
-            "You can now access their medical records and updates through the portal.\n\n"
-            "Best regards,\nHospital Admin"
-        )
-        
+        subject, message = child_added_email(instance)
+
         # Send email to primary guardian
         send_email_task.delay(subject, message, [instance.primary_guardian.user.email])
         
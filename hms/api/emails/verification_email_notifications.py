@@ -1,5 +1,5 @@
 from ..models import User, OTP, Child
-from ..tasks import send_email_task, create_system_log_task
+from ..tasks import send_email_task, log_system_event
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.core.signing import Signer
@@ -33,7 +33,7 @@ def send_welcome_email(sender, instance, created, **kwargs):
                 "Best regards,\nHospital Admin"
             )
             send_email_task.delay(subject, message, [instance.email])
-            create_system_log_task.delay(
+            log_system_event(
                 level='INFO',
                 message=f"OTP generated and welcome email sent to {instance.email}.",
                 user_id=instance.id
@@ -85,7 +85,7 @@ def verify_medical_professional_by_admin(sender, instance, created, **kwargs):
                     message=message,
                     recipient_list=admin_emails
                 )
-                create_system_log_task.delay(
+                log_system_event(
                 level='INFO',
                 message=f"A verification email for {instance.role} {instance.email} was sent to admins.",
                 user_id=instance.id
@@ -0,0 +1,264 @@
+import bisect
+import csv
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+ICD_TOKEN_URL    = "https://icdaccessmanagement.who.int/connect/token"
+ICD_SEARCH_URL   = "https://id.who.int/icd/release/11/2023-01/mms/search"
+
+# Refresh this many seconds before the token actually expires
+TOKEN_REFRESH_MARGIN = 60
+REQUEST_TIMEOUT = 10
+# The release is pinned in ICD_SEARCH_URL, so results don't go stale quickly
+RESULT_CACHE_SIZE = getattr(settings, "ICD_RESULT_CACHE_SIZE", 2048)
+RESULT_CACHE_TTL = getattr(settings, "ICD_RESULT_CACHE_TTL", 24 * 60 * 60)
+OFFLINE_RESULT_LIMIT = 25
+
+
+def _build_session():
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=("GET", "POST"))
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=10, max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+
+# One pooled session per process: keep-alive connections to both WHO hosts
+session = _build_session()
+
+
+class ICDTokenManager:
+    """
+    Holds the client_credentials token and only asks for a new one shortly
+    before the current one expires (or after the API rejects it).
+    """
+
+    def __init__(self, http):
+        self.http = http
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_token(self):
+        if self._token and time.monotonic() < self._expires_at:
+            return self._token
+        with self._lock:
+            # Another thread may have refreshed it while we waited
+            if self._token and time.monotonic() < self._expires_at:
+                return self._token
+            resp = self.http.post(ICD_TOKEN_URL, data={
+                'client_id': settings.ICD_CLIENT_ID,
+                'client_secret': settings.ICD_CLIENT_SECRET,
+                'grant_type': 'client_credentials',
+                'scope': 'icdapi_access'
+            }, timeout=REQUEST_TIMEOUT)
+            resp.raise_for_status()
+            payload = resp.json()
+            self._token = payload['access_token']
+            lifetime = int(payload.get('expires_in', 3600))
+            self._expires_at = time.monotonic() + max(lifetime - TOKEN_REFRESH_MARGIN, 0)
+            return self._token
+
+    def invalidate(self):
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalise_query(query):
+    return " ".join(query.lower().split())
+
+
+class ICDCodeIndex:
+    """
+    Local code/title index answering prefix searches without the WHO API.
+
+    Loaded from a JSON list of {"code", "title"} objects, or from a CSV/TSV
+    with Code and Title columns such as the WHO SimpleTabulation export.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self._codes = sorted((entry['code'].lower(), i) for i, entry in enumerate(entries))
+        self._words = sorted(
+            {(word, i) for i, entry in enumerate(entries) for word in _WORD_RE.findall(entry['title'].lower())}
+        )
+
+    @classmethod
+    def load(cls, path):
+        if path.endswith('.json'):
+            with open(path, encoding='utf-8') as f:
+                rows = json.load(f)
+        else:
+            delimiter = ',' if path.endswith('.csv') else '\t'
+            with open(path, encoding='utf-8-sig', newline='') as f:
+                rows = [{key.lower(): value for key, value in row.items() if key} for row in csv.DictReader(f, delimiter=delimiter)]
+        entries = []
+        for row in rows:
+            code = (row.get('code') or '').strip()
+            if not code:
+                continue
+            # Tabulation titles are indented with "- " per level
+            title = (row.get('title') or '').lstrip('- ').strip()
+            entries.append({'code': code, 'title': title})
+        return cls(entries)
+
+    @staticmethod
+    def _prefix_range(keys, prefix):
+        start = bisect.bisect_left(keys, (prefix,))
+        end = bisect.bisect_left(keys, (prefix + '\uffff',))
+        return {i for _, i in keys[start:end]}
+
+    def search(self, query, limit=OFFLINE_RESULT_LIMIT):
+        query = normalise_query(query)
+        if not query:
+            return []
+        by_code = self._prefix_range(self._codes, query)
+
+        tokens = _WORD_RE.findall(query)
+        by_title = set()
+        if tokens:
+            by_title = self._prefix_range(self._words, tokens[0])
+            for token in tokens[1:]:
+                by_title &= self._prefix_range(self._words, token)
+
+        ordered = sorted(by_code, key=lambda i: self.entries[i]['code'])
+        ordered += sorted(by_title - by_code, key=lambda i: self.entries[i]['code'])
+        return [self.entries[i] for i in ordered[:limit]]
+
+
+_offline_index = None
+_offline_index_lock = threading.Lock()
+
+
+def get_offline_index():
+    """The index at settings.ICD_OFFLINE_INDEX, loaded once; None if not configured."""
+    global _offline_index
+    path = getattr(settings, 'ICD_OFFLINE_INDEX', None)
+    if not path:
+        return None
+    if _offline_index is None:
+        with _offline_index_lock:
+            if _offline_index is None:
+                if not os.path.exists(path):
+                    logger.error(f"ICD offline index {path} not found")
+                    return None
+                _offline_index = ICDCodeIndex.load(path)
+                logger.info(f"Loaded {len(_offline_index.entries)} ICD codes from {path}")
+    return _offline_index
+
+
+def _offline_response(entries):
+    # Same top-level shape as the WHO search response
+    return {
+        'error': False,
+        'source': 'offline',
+        'destinationEntities': [
+            {'theCode': entry['code'], 'title': entry['title']} for entry in entries
+        ],
+    }
+
+
+token_manager = ICDTokenManager(session)
+result_cache = TTLCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+
+
+def _remote_search(query):
+    def call():
+        return session.get(ICD_SEARCH_URL, headers={
+            'Authorization': f'Bearer {token_manager.get_token()}',
+            'Accept': 'application/json',
+            'API-Version': 'v2',
+            'Accept-Language': 'en'
+        }, params={'q': query}, timeout=REQUEST_TIMEOUT)
+
+    resp = call()
+    if resp.status_code == 401:
+        # Revoked or expired early: one retry with a fresh token
+        token_manager.invalidate()
+        resp = call()
+    resp.raise_for_status()
+    return resp.json()
+
+
+def search_icd(query):
+    """
+    ICD-11 search for `query`: from the result cache, else the offline index
+    (when configured and it has matches), else the WHO API. If the API is
+    unreachable the offline index answers whatever it can.
+    """
+    key = normalise_query(query)
+    cached = result_cache.get(key)
+    if cached is not None:
+        return cached
+
+    index = get_offline_index()
+    if index is not None:
+        entries = index.search(key)
+        if entries:
+            result = _offline_response(entries)
+            result_cache.set(key, result)
+            return result
+
+    try:
+        result = _remote_search(key)
+    except requests.exceptions.RequestException:
+        if index is None:
+            raise
+        logger.warning(f"ICD API unavailable, answering '{key}' from the offline index")
+        return _offline_response([])
+    result_cache.set(key, result)
+    return result
@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ...models import AdmissionRecord, VaccinationRecord, PrescriptionItem, DrugDispenseRecord, LabResultParameter
+from ...reports.data import iter_report_rows, REPORT_CHUNK_SIZE, REPORT_VALUES
+from ...reports.utils import ReportTypeEnum
+
+
+def _base_querysets():
+    return {
+        ReportTypeEnum.ADMISSION: AdmissionRecord.objects.all(),
+        ReportTypeEnum.DISCHARGE: AdmissionRecord.objects.filter(discharge_date__isnull=False),
+        ReportTypeEnum.ALL_VACCINATION_RECORDS: VaccinationRecord.objects.all(),
+        ReportTypeEnum.PRESCRIPTION_RECORDS: PrescriptionItem.objects.all(),
+        ReportTypeEnum.DRUG_DISPENSE_RECORDS: DrugDispenseRecord.objects.all(),
+        ReportTypeEnum.LAB_REPORT: LabResultParameter.objects.all(),
+    }
+
+
+class Command(BaseCommand):
+    help = "Measure report row building throughput (rows/sec and queries) for each report type."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', action='append', dest='types',
+                            choices=[t.name for t in REPORT_VALUES],
+                            help="Report type to benchmark; repeat for several (default: all)")
+        parser.add_argument('--limit', type=int, default=None,
+                            help="Only build the first N rows of each report")
+        parser.add_argument('--chunk-size', type=int, default=REPORT_CHUNK_SIZE)
+        parser.add_argument('--repeat', type=int, default=3,
+                            help="Runs per report type; the best run is reported")
+
+    def handle(self, *args, **options):
+        querysets = _base_querysets()
+        types = [ReportTypeEnum[name] for name in options['types']] if options['types'] else list(REPORT_VALUES)
+
+        self.stdout.write(f"{'report':<26}{'rows':>10}{'queries':>10}{'seconds':>10}{'rows/sec':>12}")
+        for report_type in types:
+            records = querysets[report_type].order_by('pk')
+            if options['limit']:
+                records = records[:options['limit']]
+
+            best = None
+            for _ in range(max(options['repeat'], 1)):
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    rows = sum(1 for _ in iter_report_rows(records, report_type, options['chunk_size']))
+                    elapsed = time.perf_counter() - started
+                if best is None or elapsed < best[2]:
+                    best = (rows, len(ctx.captured_queries), elapsed)
+
+            rows, queries, elapsed = best
+            rate = rows / elapsed if elapsed else 0
+            self.stdout.write(f"{report_type.name:<26}{rows:>10}{queries:>10}{elapsed:>10.3f}{rate:>12.0f}")
@@ -0,0 +1,73 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django_elasticsearch_dsl.registries import registry
+
+from ...models import SearchEntry
+from ...documents.indexing import INDEX_CHUNK_SIZE, document_actions, get_index_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild search indexes in parallel, chunk by chunk, through the bulk helper."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--document', action='append', dest='documents',
+                            help="Document class to reindex, e.g. ChildDocument; repeat for several (default: all)")
+        parser.add_argument('--chunk-size', type=int, default=INDEX_CHUNK_SIZE,
+                            help="Rows per bulk request")
+        parser.add_argument('--workers', type=int, default=4,
+                            help="Chunks indexed concurrently")
+        parser.add_argument('--backend', choices=['elasticsearch', 'postgres', 'memory'], default=None,
+                            help="Override settings.SEARCH_INDEX_BACKEND; 'memory' is a dry run")
+        parser.add_argument('--recreate', action='store_true',
+                            help="Drop each index (or its SearchEntry rows) before indexing")
+
+    def handle(self, *args, **options):
+        documents = list(registry.get_documents())
+        if options['documents']:
+            by_name = {document.__name__: document for document in documents}
+            unknown = set(options['documents']) - set(by_name)
+            if unknown:
+                raise CommandError(f"Unknown documents: {', '.join(sorted(unknown))}")
+            documents = [by_name[name] for name in options['documents']]
+
+        chunk_size = max(options['chunk_size'], 1)
+        backend_name = options['backend'] or getattr(settings, 'SEARCH_INDEX_BACKEND', 'elasticsearch')
+        backend = get_index_backend(backend_name, chunk_size=chunk_size)
+
+        self.stdout.write(f"{'document':<32}{'rows':>10}{'failed':>10}{'seconds':>10}{'rows/sec':>12}")
+        for document in documents:
+            if options['recreate'] and backend_name == 'elasticsearch':
+                index = document._index
+                index.delete(ignore_unavailable=True)
+                index.create()
+            elif options['recreate'] and backend_name == 'postgres':
+                SearchEntry.objects.filter(index=document._index._name).delete()
+
+            started = time.perf_counter()
+            indexed, failed = self._reindex(document, backend, chunk_size, max(options['workers'], 1))
+            elapsed = time.perf_counter() - started
+            rate = indexed / elapsed if elapsed else 0
+            self.stdout.write(f"{document.__name__:<32}{indexed:>10}{failed:>10}{elapsed:>10.3f}{rate:>12.0f}")
+
+    def _reindex(self, document, backend, chunk_size, workers):
+        ids = list(document().get_queryset().order_by('pk').values_list('pk', flat=True))
+        chunks = [ids[start:start + chunk_size] for start in range(0, len(ids), chunk_size)]
+
+        def index_chunk(chunk):
+            try:
+                return backend.bulk(document_actions(document, chunk))
+            finally:
+                # Each worker thread opens its own DB connection
+                connections.close_all()
+
+        indexed = failed = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed(pool.submit(index_chunk, chunk) for chunk in chunks):
+                ok, errors = future.result()
+                indexed += ok
+                failed += errors
+        return indexed, failed
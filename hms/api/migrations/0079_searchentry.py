@@ -0,0 +1,40 @@
+# Generated by Django 5.1.7 on 2026-10-17 12:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.core.serializers.json
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0078_importjob'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.CharField(max_length=64)),
+                ('object_id', models.CharField(max_length=64)),
+                ('source', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('search_text', models.TextField(blank=True, default='')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [
+                    django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='search_entry_vector_gin'),
+                    django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='search_entry_text_trgm', opclasses=['gin_trgm_ops']),
+                    django.contrib.postgres.indexes.GinIndex(fields=['source'], name='search_entry_source_gin', opclasses=['jsonb_path_ops']),
+                ],
+                'constraints': [
+                    models.UniqueConstraint(fields=('index', 'object_id'), name='unique_search_entry'),
+                ],
+            },
+        ),
+    ]
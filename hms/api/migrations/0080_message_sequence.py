@@ -0,0 +1,43 @@
+# Generated by Django 5.1.7 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+def number_messages(apps, schema_editor):
+    Conversation = apps.get_model('api', 'Conversation')
+    Message = apps.get_model('api', 'Message')
+    for conversation_id in Conversation.objects.values_list('pk', flat=True).iterator():
+        messages = list(Message.objects.filter(conversation_id=conversation_id).order_by('created_at', 'pk').only('pk'))
+        for sequence, message in enumerate(messages):
+            message.sequence = sequence
+        Message.objects.bulk_update(messages, ['sequence'], batch_size=500)
+        Conversation.objects.filter(pk=conversation_id).update(message_count=len(messages))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0079_searchentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='message_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='sequence',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(number_messages, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name='message',
+            options={'ordering': ('sequence',)},
+        ),
+        migrations.AddConstraint(
+            model_name='message',
+            constraint=models.UniqueConstraint(fields=('conversation', 'sequence'), name='unique_message_sequence'),
+        ),
+    ]
@@ -20,4 +20,6 @@ from .lab_models import LabTest, ReferenceRange
 from .lab_request_models import LabRequest, LabRequestItem
 from .lab_result_models import LabResult, LabResultParameter
 from .billing_models import Bill, BillItem
-from .payment_models import Payment
\ No newline at end of file
+from .payment_models import Payment
+from .import_models import ImportJob
+from .search_models import SearchEntry
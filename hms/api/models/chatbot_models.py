@@ -13,6 +13,10 @@ class Conversation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     metadata = models.JSONField(default=dict, blank=True)  # store any model-side metadata if needed
+    message_count = models.PositiveIntegerField(default=0)  # next Message.sequence
+    summary = models.TextField(blank=True, default='')  # rolling summary, see chatbot.tasks
+    summary_upto = models.PositiveIntegerField(default=0)  # messages (by sequence) the summary covers
+    last_summary_at = models.DateTimeField(blank=True, null=True)
 
     def __str__(self):
         return f"Conversation {self.session_id} ({self.user})"
@@ -25,10 +29,15 @@ class Message(models.Model):
     conversation = models.ForeignKey(Conversation, related_name='messages', on_delete=models.CASCADE)
     role = models.CharField(max_length=32)  # 'user' | 'assistant'
     content = models.TextField()
+    sequence = models.PositiveIntegerField(default=0)  # position within the conversation, from 0
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ('created_at',)  # messages are returned chronologically
+        ordering = ('sequence',)  # messages are returned chronologically
+        constraints = [
+            # Also the index messages are read in order through
+            models.UniqueConstraint(fields=['conversation', 'sequence'], name='unique_message_sequence'),
+        ]
 
     def __str__(self):
         return f"{self.role}: {self.content[:50]}"
@@ -134,6 +134,12 @@ class Child(models.Model):
             except Child.DoesNotExist:
                 pass 
         """Override save method to calculate age, BMI, and BMI interpretation"""
+        self.compute_derived_fields()
+        
+        super().save(*args, **kwargs)
+
+    def compute_derived_fields(self):
+        """Age, BMI and BMI interpretation; also used by bulk imports, which skip save()"""
         if self.date_of_birth:
             today = date.today()
             self.age = today.year - self.date_of_birth.year - (
@@ -142,8 +148,6 @@ class Child(models.Model):
         
         self.current_bmi = self.calculate_bmi()
         self.current_bmi_interpretation = self.interpret_bmi()
-        
-        super().save(*args, **kwargs)
 
     def get_growth_history(self):
         """Retrieve and format all growth records for this child."""
@@ -0,0 +1,47 @@
+from django.db import models
+from .auth_models import User
+
+
+class ImportJob(models.Model):
+    """Background bulk import of an uploaded spreadsheet"""
+    CHILD = 'child'
+    DRUG = 'drug'
+    LAB_TEST = 'lab_test'
+    REFERENCE_RANGE = 'reference_range'
+    KIND_CHOICES = [
+        (CHILD, 'Children'),
+        (DRUG, 'Drugs'),
+        (LAB_TEST, 'Lab Tests'),
+        (REFERENCE_RANGE, 'Reference Ranges'),
+    ]
+
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    COMPLETED = 'COMPLETED'
+    FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (COMPLETED, 'Completed'),
+        (FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    file = models.FileField(upload_to='imports/')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    # Per-row errors, capped so a bad 50k-row file doesn't bloat the row
+    errors = models.JSONField(default=list, blank=True)
+    detail = models.TextField(blank=True, null=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='import_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} import #{self.pk} ({self.status})"
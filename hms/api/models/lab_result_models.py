@@ -52,6 +52,15 @@ class LabResult(models.Model):
             return 'F'
         else:
             return 'ALL'  # Fallback to unisex ranges
+
+    def get_child_demographics(self):
+        """
+        (age_in_months, gender) for reference-range lookups, worked out once per
+        instance so every parameter of a panel shares the same walk to the child.
+        """
+        if getattr(self, '_child_demographics', None) is None:
+            self._child_demographics = (self.get_child_age_in_months(), self.get_child_gender())
+        return self._child_demographics
     
     def __str__(self):
         return f"Result for {self.lab_request_item}"
@@ -79,7 +88,7 @@ class LabResultParameter(models.Model):
             return f"{self.parameter_name}: {self.value} {self.unit}"
         return f"{self.parameter_name}: {self.value}"
     
-    def find_appropriate_reference_range(self):
+    def find_appropriate_reference_range(self, reference_ranges=None):
         """
         Find the most appropriate reference range for this parameter based on:
         1. Lab test type
@@ -89,43 +98,33 @@ class LabResultParameter(models.Model):
         
         This method prioritizes gender-specific ranges but falls back to 
         general ranges if gender-specific ones aren't available.
+
+        `reference_ranges` is a {parameter_name: range} map already resolved
+        for the whole panel by find_reference_ranges.
         """
-        from .lab_models import ReferenceRange
+        from ..caches.reference_ranges import find_reference_range
+
+        if reference_ranges is not None:
+            return reference_ranges.get(self.parameter_name)
         
         # Get child's demographics
-        child_age_months = self.lab_result.get_child_age_in_months()
-        child_gender = self.lab_result.get_child_gender()
+        child_age_months, child_gender = self.lab_result.get_child_demographics()
         
-        # Get the lab test
-        lab_test = self.lab_result.lab_request_item.lab_test
-        
-        # Try to find gender-specific reference range first
-        reference_range = ReferenceRange.objects.filter(
-            lab_test=lab_test,
-            parameter_name=self.parameter_name,
-            min_age_months__lte=child_age_months,
-            max_age_months__gte=child_age_months,
-            gender=child_gender
-        ).first()
-        
-        # If no gender-specific range found, try general ranges
-        if not reference_range:
-            reference_range = ReferenceRange.objects.filter(
-                lab_test=lab_test,
-                parameter_name=self.parameter_name,
-                min_age_months__lte=child_age_months,
-                max_age_months__gte=child_age_months,
-                gender='ALL'
-            ).first()
-        
-        return reference_range
+        # Gender-specific range first, then the general one, both served from
+        # the in-memory reference range index
+        return find_reference_range(
+            self.lab_result.lab_request_item.lab_test_id,
+            self.parameter_name,
+            child_gender,
+            child_age_months,
+        )
     
-    def auto_assign_unit_from_reference_range(self):
+    def auto_assign_unit_from_reference_range(self, reference_ranges=None):
         """
         Automatically assign the unit from the appropriate reference range.
         This should be called before determining status to ensure unit consistency.
         """
-        ref_range = self.find_appropriate_reference_range()
+        ref_range = self.find_appropriate_reference_range(reference_ranges)
         
         if ref_range and ref_range.unit:
             self.unit = ref_range.unit
@@ -135,7 +134,7 @@ class LabResultParameter(models.Model):
             # Clear unit if no reference range found or reference range has no unit
             self.unit = None
             self.reference_range = None
-    def determine_status(self):
+    def determine_status(self, reference_ranges=None):
         """
         Determine the status of this lab result parameter by comparing
         the measured value against age and gender-appropriate reference ranges.
@@ -146,6 +145,8 @@ class LabResultParameter(models.Model):
         3. Determine if result is normal, abnormal, or critical
         4. Handle qualitative tests (textual references)
         
+        `reference_ranges` is passed on to find_appropriate_reference_range.
+
         Returns the determined status as a string.
         """
         # If no value is provided, mark as inconclusive
@@ -153,16 +154,17 @@ class LabResultParameter(models.Model):
             return 'INCONCLUSIVE'
         
         # Auto-assign unit from reference range first
-        self.auto_assign_unit_from_reference_range()
+        self.auto_assign_unit_from_reference_range(reference_ranges)
         
         # Use the reference range that was set during unit assignment
         ref_range = self.reference_range
         
         if not ref_range:
             # No reference range found - cannot determine status
+            child_age_months, child_gender = self.lab_result.get_child_demographics()
             self.notes = f"No reference range found for {self.parameter_name} " \
-                        f"(age: {self.lab_result.get_child_age_in_months()} months, " \
-                        f"gender: {self.lab_result.get_child_gender()})"
+                        f"(age: {child_age_months} months, " \
+                        f"gender: {child_gender})"
             return 'INCONCLUSIVE'
         
         # Handle qualitative tests (those with textual references)
@@ -0,0 +1,31 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class SearchEntry(models.Model):
+    """
+    One indexed search document, for the Postgres search backend. Mirrors
+    what Elasticsearch would hold: the prepared document source plus a
+    tsvector and a trigram-indexed copy of its text.
+    """
+    index = models.CharField(max_length=64)
+    object_id = models.CharField(max_length=64)
+    source = models.JSONField(encoder=DjangoJSONEncoder)
+    search_text = models.TextField(blank=True, default='')
+    search_vector = SearchVectorField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['index', 'object_id'], name='unique_search_entry'),
+        ]
+        indexes = [
+            GinIndex(fields=['search_vector'], name='search_entry_vector_gin'),
+            GinIndex(fields=['search_text'], opclasses=['gin_trgm_ops'], name='search_entry_text_trgm'),
+            GinIndex(fields=['source'], opclasses=['jsonb_path_ops'], name='search_entry_source_gin'),
+        ]
+
+    def __str__(self):
+        return f"{self.index}/{self.object_id}"
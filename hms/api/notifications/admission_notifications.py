@@ -2,14 +2,14 @@ from django.utils.timezone import now
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from ..models import AdmissionRecord, AdmissionVitalRecordHistory
-from ..tasks import create_notification_task  # Import the Celery task
+from ..tasks import create_notification_task, create_notifications_task  # Import the Celery tasks
 
 def notify_parent(child, message):
     """Helper function to send notifications asynchronously via Celery."""
     guardians = [child.primary_guardian, child.secondary_guardian]
-    for guardian in guardians:
-        if guardian and guardian.user:
-            create_notification_task.delay(guardian.user.id, message)  # Asynchronous task
+    notifications = [(guardian.user_id, message) for guardian in guardians if guardian and guardian.user_id]
+    if notifications:
+        create_notifications_task.delay(notifications)  # One asynchronous task for all guardians
 
 @receiver(post_save, sender=AdmissionRecord)
 def admission_record_saved(sender, instance, created, **kwargs):
@@ -5,14 +5,13 @@ from django.dispatch import receiver
 from django.db.models.signals import post_save
 
 from ..models import LabRequest, Shift, LabTechShiftAssignment
-from ..tasks import create_notification_task  # Async task for sending notifications
+from ..tasks import create_notifications_task  # Async task for sending notifications
 
 
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils import timezone
 from ..models import LabRequest, LabRequestItem, LabTechShiftAssignment, Shift, User
-from ..tasks import create_notification_task
 
 
 @receiver(post_save, sender=LabRequest)
@@ -41,14 +40,11 @@ def notify_labtech_on_request(sender, instance, created, **kwargs):
         active_lab_tech_ids = User.objects.filter(role='lab_tech').values_list('id', flat=True)
 
     # Step 4: Send notifications
-    for lab_tech_user_id in active_lab_tech_ids:
-        create_notification_task.delay(
-            user_id=lab_tech_user_id,
-            message=(
-                f"A new lab request (ID: {instance.id}) has been made for {instance.child.first_name} {instance.child.last_name}.\n"
-                f"Requested by Dr. {instance.requested_by.first_name} {instance.requested_by.last_name}"
-            )
-        )
+    message = (
+        f"A new lab request (ID: {instance.id}) has been made for {instance.child.first_name} {instance.child.last_name}.\n"
+        f"Requested by Dr. {instance.requested_by.first_name} {instance.requested_by.last_name}"
+    )
+    create_notifications_task.delay([(lab_tech_user_id, message) for lab_tech_user_id in active_lab_tech_ids])
 
 @receiver(post_save, sender=LabRequestItem)
 def notify_labtech_on_request_item(sender, instance, created, **kwargs):
@@ -76,13 +72,9 @@ def notify_labtech_on_request_item(sender, instance, created, **kwargs):
         active_lab_tech_ids = User.objects.filter(role='lab_tech').values_list('id', flat=True)
 
     # Step 4: Send notifications
-    for lab_tech_user_id in active_lab_tech_ids:
-        create_notification_task.delay(
-            user_id=lab_tech_user_id,
-            message=(
-                f"{instance.lab_test.name} {(instance.lab_test.code)} lab request has been made for {instance.lab_request.child.first_name} {instance.lab_request.child.last_name}.\n"
-                f"by Dr. {instance.lab_request.requested_by.first_name} {instance.lab_request.requested_by.last_name}\n"
-               f"Scheduled for {instance.lab_request.scheduled_date}"
-
-            )
-        )
+    message = (
+        f"{instance.lab_test.name} {(instance.lab_test.code)} lab request has been made for {instance.lab_request.child.first_name} {instance.lab_request.child.last_name}.\n"
+        f"by Dr. {instance.lab_request.requested_by.first_name} {instance.lab_request.requested_by.last_name}\n"
+        f"Scheduled for {instance.lab_request.scheduled_date}"
+    )
+    create_notifications_task.delay([(lab_tech_user_id, message) for lab_tech_user_id in active_lab_tech_ids])
@@ -1,6 +1,6 @@
 from django.db.models.signals import post_save
 from ..models import LabResult, LabResultParameter
-from ..tasks import create_notification_task
+from ..tasks import create_notifications_task
 from django.dispatch import receiver
 
 @receiver(post_save, sender=LabResult)
@@ -12,18 +12,13 @@ def notify_doctor_on_lab_result(sender, instance, created, **kwargs):
     child = instance.lab_request_item.lab_request.child
     primary_guardian = getattr(instance.lab_request_item.lab_request.child.primary_guardian, 'user', None)
     
-    if doctor:
-        message = (
-            f"Lab result complete for {child.first_name} {child.last_name}\n"
-            "wait for specific results..."
-        )
-        create_notification_task.delay(doctor.id, message)
-    if primary_guardian:
-        message = (
-            f"Lab result complete for {child.first_name} {child.last_name}\n"
-            "wait for specific results..."
-        )
-        create_notification_task.delay(primary_guardian.id, message)
+    message = (
+        f"Lab result complete for {child.first_name} {child.last_name}\n"
+        "wait for specific results..."
+    )
+    recipients = [user for user in (doctor, primary_guardian) if user]
+    if recipients:
+        create_notifications_task.delay([(user.id, message) for user in recipients])
 
 
 @receiver(post_save, sender=LabResultParameter)
@@ -35,15 +30,33 @@ def notify_doctor_on_lab_result_parameter(sender, instance, created, **kwargs):
     primary_guardian = getattr(instance.lab_result.lab_request_item.lab_request.child.primary_guardian, 'user', None)
     
     
-    if doctor:
-        message = (
-            f"Lab result complete for {child.first_name} {child.last_name}\n"
-            f"{instance.parameter_name} count of {instance.value} {instance.unit} is {instance.status}"
-        )
-        create_notification_task.delay(doctor.id, message)
-    if primary_guardian:
-        message = (
-            f"Lab result complete for {child.first_name} {child.last_name}\n"
-           f"{instance.parameter_name} count of {instance.value} {instance.unit} is {instance.status}"
-        )
-        create_notification_task.delay(primary_guardian.id, message)
\ No newline at end of file
+    message = (
+        f"Lab result complete for {child.first_name} {child.last_name}\n"
+        f"{instance.parameter_name} count of {instance.value} {instance.unit} is {instance.status}"
+    )
+    recipients = [user for user in (doctor, primary_guardian) if user]
+    if recipients:
+        create_notifications_task.delay([(user.id, message) for user in recipients])
+
+
+def notify_lab_panel_results(lab_result, parameters):
+    """
+    One notification per recipient for a whole panel entered at once,
+    instead of one per parameter.
+    """
+    lab_request = lab_result.lab_request_item.lab_request
+    doctor = getattr(lab_request.requested_by, 'user', None)
+    child = lab_request.child
+    primary_guardian = getattr(child.primary_guardian, 'user', None)
+
+    lines = [
+        f"{p.parameter_name} count of {p.value} {p.unit} is {p.status}"
+        for p in parameters
+    ]
+    message = (
+        f"Lab result complete for {child.first_name} {child.last_name}\n"
+        + "\n".join(lines)
+    )
+    recipients = [user for user in (doctor, primary_guardian) if user]
+    if recipients:
+        create_notifications_task.delay([(user.id, message) for user in recipients])
@@ -1,7 +1,7 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from ..models import Prescription, PrescriptionItem
-from ..tasks import create_notification_task
+from ..tasks import create_notifications_task
 
 @receiver(post_save, sender=Prescription)
 def notify_guardian_on_prescription(sender, instance, created, **kwargs):
@@ -27,10 +27,9 @@ def notify_guardian_on_prescription(sender, instance, created, **kwargs):
             f"A new prescription has been created for {child.first_name} {child.last_name}\n "
             f"By: Dr. {doctor.first_name} {doctor.last_name}."
         )
-        if primary_guardian:
-            create_notification_task.delay(primary_guardian.id, message)
-        if secondary_guardian:
-            create_notification_task.delay(secondary_guardian.id, message)
+        create_notifications_task.delay([
+            (guardian.id, message) for guardian in (primary_guardian, secondary_guardian) if guardian
+        ])
 
 @receiver(post_save, sender=PrescriptionItem)
 def notify_on_drug_prescription(sender, instance, created, **kwargs):
@@ -54,9 +53,8 @@ def notify_on_drug_prescription(sender, instance, created, **kwargs):
             f"New drug prescribed by Dr. {doctor.first_name} {doctor.last_name}!\n"
             f"{drug_name} to be taken {drug_frequency} for {drug_duration_value} {drug_duration_unit}"
         )
-        if primary_guardian:
-            create_notification_task.delay(primary_guardian.id, message)
-        if secondary_guardian:
-            create_notification_task.delay(secondary_guardian.id, message)
+        create_notifications_task.delay([
+            (guardian.id, message) for guardian in (primary_guardian, secondary_guardian) if guardian
+        ])
     
     
\ No newline at end of file
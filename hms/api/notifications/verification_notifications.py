@@ -5,7 +5,7 @@ import urllib.parse
 import sys
 
 from ..models import User
-from ..tasks import create_notification_task
+from ..tasks import create_notification_task, create_notifications_task
 
 @receiver(post_save, sender=User)
 def send_welcome_notification(sender, instance, created, **kwargs):
@@ -55,6 +55,5 @@ def notify_admin_for_verification(sender, instance, created, **kwargs):
             message += "No license document was provided.\n"
 
         # Notify all admins
-        admin_users = User.objects.filter(role=User.ADMIN)
-        for admin_user in admin_users:
-            create_notification_task.delay(admin_user.id, message)
+        admin_ids = User.objects.filter(role=User.ADMIN).values_list('id', flat=True)
+        create_notifications_task.delay([(admin_id, message) for admin_id in admin_ids])
@@ -1,6 +1,6 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
-from ..models import RolePermissionModel
 from django.contrib.contenttypes.models import ContentType
+from ..caches import get_role_permission_flags
 
 class DynamicRolePermission(BasePermission):
     def has_permission(self, request, view):
@@ -12,20 +12,22 @@ class DynamicRolePermission(BasePermission):
         if not model:
             return False
 
-        try:
-            content_type = ContentType.objects.get_for_model(model)
-            role_permission = RolePermissionModel.objects.get(role=user.role, content_type=content_type)
-        except RolePermissionModel.DoesNotExist:
+        # get_for_model is memoised by ContentType's manager; the flags come
+        # from the cached role-permission matrix, so no query per request
+        content_type = ContentType.objects.get_for_model(model)
+        flags = get_role_permission_flags(user.role, content_type.id)
+        if flags is None:
             return False
 
+        can_create, can_read, can_update, can_delete = flags
         if request.method in SAFE_METHODS:
-            return role_permission.can_read
+            return can_read
         if request.method == 'POST':
-            return role_permission.can_create
+            return can_create
         if request.method in ['PUT', 'PATCH']:
-            return role_permission.can_update
+            return can_update
         if request.method == 'DELETE':
-            return role_permission.can_delete
+            return can_delete
 
         return False
 
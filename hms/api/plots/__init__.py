@@ -1,2 +1,3 @@
 from .visualizations import (ChildGrowthPlot, generate_growth_forecast_chart, generate_growth_percentile_chart, generate_growth_velocity_chart)
-from .admission_vitals_history import child_vitals_plot
\ No newline at end of file
+from .admission_vitals_history import child_vitals_plot
+from .growth_analytics import child_growth_series, cohort_growth_summary
@@ -0,0 +1,214 @@
+import numpy as np
+from datetime import date
+
+from ..models import GrowthRecord
+
+METRICS = ("weight", "height", "bmi")
+# Same year length the velocity chart uses
+DAYS_PER_YEAR = 365
+# How far ahead the quadratic trend is projected, in years
+FORECAST_HORIZON_YEARS = 0.5
+
+
+def load_growth_arrays(children):
+    """
+    Every growth record of `children` (a Child queryset or list of ids) as
+    NumPy arrays sorted by child then date, from a single query. BMI is
+    recomputed from weight and height, so rows saved without one still count.
+    """
+    rows = list(
+        GrowthRecord.objects
+        .filter(child__in=children)
+        .order_by("child_id", "date_recorded", "id")
+        .values_list("child_id", "date_recorded", "weight", "height")
+    )
+    if not rows:
+        empty = np.array([], dtype=float)
+        return {"child_id": np.array([], dtype=np.int64), "day": empty,
+                "t": empty, "weight": empty, "height": empty, "bmi": empty}
+
+    child_id, recorded, weight, height = zip(*rows)
+    day = np.fromiter((d.toordinal() for d in recorded), dtype=float, count=len(rows))
+    weight = np.asarray(weight, dtype=float)
+    height = np.asarray(height, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bmi = np.where(height > 0, weight / (height / 100) ** 2, np.nan)
+    return {
+        "child_id": np.asarray(child_id, dtype=np.int64),
+        "day": day,
+        "t": day / DAYS_PER_YEAR,
+        "weight": weight,
+        "height": height,
+        "bmi": bmi,
+    }
+
+
+def _finite_or_none(values):
+    return [None if not np.isfinite(v) else round(float(v), 4) for v in values]
+
+
+def _quadratic_trends(x, values, starts, counts):
+    """
+    Least-squares y = c0 + c1*x + c2*x^2 for every child at once, from the
+    normal equations built with per-group sums. Children with fewer than three
+    distinct dates get NaN.
+    """
+    n = len(starts)
+    coefficients = np.full((n, 3), np.nan)
+    if not n:
+        return coefficients
+
+    powers = np.stack([x ** k for k in range(5)])
+    s = np.add.reduceat(powers, starts, axis=1)                 # sum x^k, k=0..4
+    t = np.add.reduceat(powers[:3] * values, starts, axis=1)    # sum y*x^k, k=0..2
+    a = np.stack([
+        np.stack([s[0], s[1], s[2]], axis=-1),
+        np.stack([s[1], s[2], s[3]], axis=-1),
+        np.stack([s[2], s[3], s[4]], axis=-1),
+    ], axis=1)
+    b = t.T
+
+    # Repeated dates don't add a point; three distinct ones are needed
+    distinct = np.ones(len(x), dtype=bool)
+    distinct[1:] = x[1:] != x[:-1]
+    distinct[starts] = True
+    solvable = np.add.reduceat(distinct.astype(int), starts) >= 3
+    solvable &= np.isfinite(a).all(axis=(1, 2)) & np.isfinite(b).all(axis=1)
+    if solvable.any():
+        coefficients[solvable] = np.linalg.solve(a[solvable], b[solvable][..., None])[..., 0]
+    return coefficients
+
+
+def compute_cohort_growth(arrays):
+    """
+    Per-child growth analytics for a whole cohort, vectorised over children:
+    latest measurements, latest velocity (per year), percentile position of
+    the latest value within the cohort, and a quadratic trend with a short
+    forecast.
+    """
+    child_ids, starts, counts = np.unique(arrays["child_id"], return_index=True, return_counts=True)
+    n = len(child_ids)
+    last = starts + counts - 1
+    has_previous = counts >= 2
+    prev = np.where(has_previous, last - 1, last)
+
+    t = arrays["t"]
+    x = t - np.repeat(t[starts], counts)  # years since each child's first record
+    dt = t[last] - t[prev]
+
+    result = {
+        "child_id": child_ids,
+        "records": counts,
+        "latest_day": arrays["day"][last] if n else np.array([]),
+    }
+    for metric in METRICS:
+        values = arrays[metric]
+        latest = values[last]
+
+        velocity = np.full(n, np.nan)
+        moving = has_previous & (dt > 0)
+        velocity[moving] = (latest[moving] - values[prev][moving]) / dt[moving]
+
+        # Share of the cohort at or below each child's latest value
+        finite = np.isfinite(latest)
+        position = np.full(n, np.nan)
+        if finite.any():
+            ranked = np.sort(latest[finite])
+            position[finite] = 100.0 * np.searchsorted(ranked, latest[finite], side="right") / len(ranked)
+
+        coefficients = _quadratic_trends(x, values, starts, counts)
+        horizon = x[last] + FORECAST_HORIZON_YEARS if n else np.array([])
+        forecast = coefficients[:, 0] + coefficients[:, 1] * horizon + coefficients[:, 2] * horizon ** 2
+
+        result[metric] = {
+            "latest": latest,
+            "velocity": velocity,
+            "percentile_position": position,
+            "trend": coefficients,
+            "forecast": forecast,
+        }
+    return result
+
+
+def cohort_growth_summary(children):
+    """
+    JSON-ready cohort analytics for a Child queryset.
+    """
+    metrics = compute_cohort_growth(load_growth_arrays(children))
+    n = len(metrics["child_id"])
+
+    columns = {}
+    for metric in METRICS:
+        m = metrics[metric]
+        columns[metric] = {
+            "latest": _finite_or_none(m["latest"]),
+            "velocity": _finite_or_none(m["velocity"]),
+            "percentile_position": _finite_or_none(m["percentile_position"]),
+            "forecast": _finite_or_none(m["forecast"]),
+            "trend": [_finite_or_none(row) if np.isfinite(row).all() else None for row in m["trend"]],
+        }
+
+    results = []
+    for i in range(n):
+        entry = {
+            "child_id": int(metrics["child_id"][i]),
+            "records": int(metrics["records"][i]),
+            "latest_date": date.fromordinal(int(metrics["latest_day"][i])).isoformat(),
+        }
+        for metric in METRICS:
+            entry[metric] = {key: column[i] for key, column in columns[metric].items()}
+        results.append(entry)
+
+    distribution = {}
+    for metric in METRICS:
+        latest = metrics[metric]["latest"]
+        latest = latest[np.isfinite(latest)]
+        distribution[metric] = (
+            dict(zip(("p25", "p50", "p75"), _finite_or_none(np.percentile(latest, [25, 50, 75]))))
+            if len(latest) else None
+        )
+
+    return {
+        "count": n,
+        "forecast_horizon_years": FORECAST_HORIZON_YEARS,
+        "distribution": distribution,
+        "children": results,
+    }
+
+
+def child_growth_series(child):
+    """
+    The series behind the growth, percentile, velocity and forecast charts
+    for one child, as JSON-ready lists.
+    """
+    arrays = load_growth_arrays([child.pk])
+    dates = [date.fromordinal(int(d)).isoformat() for d in arrays["day"]]
+    t = arrays["t"]
+    x = t - t[0] if len(t) else t
+    dt = np.diff(t)
+
+    series = {"child_id": child.pk, "dates": dates}
+    for metric in METRICS:
+        values = arrays[metric]
+        entry = {"values": _finite_or_none(values)}
+
+        finite = values[np.isfinite(values)]
+        entry["percentiles"] = (
+            dict(zip(("p25", "p50", "p75"), _finite_or_none(np.percentile(finite, [25, 50, 75]))))
+            if len(finite) else None
+        )
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            velocity = np.where(dt > 0, np.diff(values) / dt, np.nan)
+        entry["velocity"] = {"dates": dates[1:], "values": _finite_or_none(velocity)}
+
+        coefficients = _quadratic_trends(x, values, np.array([0]), np.array([len(values)]))[0] if len(values) else None
+        if coefficients is not None and np.isfinite(coefficients).all():
+            entry["trend"] = {
+                "coefficients": _finite_or_none(coefficients),
+                "values": _finite_or_none(coefficients[0] + coefficients[1] * x + coefficients[2] * x ** 2),
+            }
+        else:
+            entry["trend"] = None
+        series[metric] = entry
+    return series
@@ -1,14 +1,78 @@
 # api/reports/data.py
+import csv
 from django.db.models import QuerySet
 from .utils import FileFormat, logger, ReportTypeEnum, get_day_with_suffix
 from pathlib import Path
-import pandas as pd
+from openpyxl import Workbook
 from .pdf import generate_pdf
-from typing import List, Dict, Any, Optional, Tuple
+from ..models import PrescriptionItem, ReferenceRange
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator
 
-def build_report_data(records: QuerySet, report_type: ReportTypeEnum) -> List[Dict[str, Any]]:
+# Rows fetched per round trip when streaming a report
+REPORT_CHUNK_SIZE = 2000
+
+# Flat column projection per report type: exactly what each row builder
+# prints, fetched with the joins in a single query instead of walking
+# foreign keys row by row.
+_ADMISSION_VALUES = (
+    'child__first_name', 'child__last_name',
+    'admission_reason', 'initial_diagnosis',
+    'bed_id', 'bed__bed_number', 'bed__ward__name',
+    'attending_doctor_id', 'attending_doctor__first_name', 'attending_doctor__last_name',
+    'admission_date', 'discharge_date',
+)
+
+REPORT_VALUES = {
+    ReportTypeEnum.ADMISSION: _ADMISSION_VALUES,
+    ReportTypeEnum.DISCHARGE: _ADMISSION_VALUES,
+    ReportTypeEnum.ALL_VACCINATION_RECORDS: (
+        'child__first_name', 'child__last_name', 'vaccine__name', 'dose_number',
+        'scheduled_date', 'administered_date', 'status', 'batch_number', 'notes',
+    ),
+    ReportTypeEnum.PRESCRIPTION_RECORDS: (
+        'prescription__child__first_name', 'prescription__child__last_name',
+        'drug__name', 'drug__strength', 'dosage', 'frequency', 'duration_value', 'duration_unit',
+        'prescription__doctor__first_name', 'prescription__doctor__last_name',
+    ),
+    ReportTypeEnum.DRUG_DISPENSE_RECORDS: (
+        'date_dispensed', 'quantity_dispensed',
+        'prescription_item__prescription__child__first_name',
+        'prescription_item__prescription__child__last_name',
+        'prescription_item__prescription__doctor__first_name',
+        'prescription_item__prescription__doctor__last_name',
+        'pharmacist_id', 'pharmacist__first_name', 'pharmacist__last_name',
+        'prescription_item__drug__name', 'prescription_item__drug__strength',
+        'prescription_item__dosage', 'prescription_item__frequency',
+    ),
+    ReportTypeEnum.LAB_REPORT: (
+        'lab_result__date_performed',
+        'lab_result__lab_request_item__lab_request__request_id',
+        'lab_result__lab_request_item__lab_request__child__first_name',
+        'lab_result__lab_request_item__lab_request__child__last_name',
+        'lab_result__lab_request_item__lab_request__requested_by__first_name',
+        'lab_result__lab_request_item__lab_request__requested_by__last_name',
+        'lab_result__performed_by_id',
+        'lab_result__performed_by__first_name', 'lab_result__performed_by__last_name',
+        'lab_result__lab_request_item__lab_test__name',
+        'parameter_name', 'value', 'unit', 'status',
+        'reference_range_id',
+        'reference_range__parameter_name',
+        'reference_range__min_age_months', 'reference_range__max_age_months',
+        'reference_range__gender',
+        'reference_range__min_value', 'reference_range__max_value',
+        'reference_range__unit', 'reference_range__textual_reference',
+    ),
+}
+
+_FREQUENCY_LABELS = dict(PrescriptionItem.FREQUENCY_CHOICES)
+_GENDER_LABELS = dict(ReferenceRange.GENDER_CHOICES)
+
+
+def iter_report_rows(records: QuerySet, report_type: ReportTypeEnum,
+                     chunk_size: int = REPORT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
     """
-    Single entry point: dispatch to the right builder based on report_type.
+    Yield report rows one at a time. `records` is narrowed to the report's
+    REPORT_VALUES projection and read in chunks of `chunk_size`.
     """
     dispatch = {
         ReportTypeEnum.ADMISSION: _build_admission_data,
@@ -23,133 +87,128 @@ def build_report_data(records: QuerySet, report_type: ReportTypeEnum) -> List[Di
         builder = dispatch[report_type]
     except KeyError:
         raise ValueError(f"Unsupported report type: {report_type}")
-    return builder(records)
+    rows = records.values(*REPORT_VALUES[report_type]).iterator(chunk_size=chunk_size)
+    return builder(rows)
+
+
+def build_report_data(records: QuerySet, report_type: ReportTypeEnum) -> List[Dict[str, Any]]:
+    """
+    Single entry point: dispatch to the right builder based on report_type.
+    Materialises every row; use iter_report_rows/stream_report_file for CSV and XLSX.
+    """
+    return list(iter_report_rows(records, report_type))
 
 
-def _build_admission_data(records: QuerySet) -> List[Dict[str, Any]]:
-    data: List[Dict[str, Any]] = []
+def _full_name(first, last, prefix=''):
+    return f"{prefix}{first} {last}"
+
+
+def _format_timestamp(value):
+    return value.strftime(f"{get_day_with_suffix(value.day)} %B, %Y %I:%M %p")
+
+
+def _format_reference_range(r: Dict[str, Any]) -> str:
+    # Same text as ReferenceRange.__str__, built from the projected columns
+    if r['reference_range_id'] is None:
+        return "N/A"
+    min_value, max_value = r['reference_range__min_value'], r['reference_range__max_value']
+    if min_value is not None and max_value is not None:
+        range_text = f"{min_value} - {max_value} {r['reference_range__unit']}"
+    else:
+        range_text = r['reference_range__textual_reference'] or "No range specified"
+    age_range = f"{r['reference_range__min_age_months']}-{r['reference_range__max_age_months']} months"
+    gender = _GENDER_LABELS.get(r['reference_range__gender'], r['reference_range__gender'])
+    return f"{r['reference_range__parameter_name']} ({age_range}, {gender}): {range_text}"
+
+
+def _build_admission_data(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
     for r in records:
-        row = {
-            'Patient': f"{r.child.first_name} {r.child.last_name}",
-            'Reason': r.admission_reason,
-            'Diagnosis': r.initial_diagnosis,
-            'Location': f"{r.bed.bed_number} in {r.bed.ward.name}" if r.bed else 'N/A',
-            
-           
-            'Doctor': f"{r.attending_doctor.first_name} {r.attending_doctor.last_name}"
-                      if r.attending_doctor else 'N/A',
-            'Admitted On': r.admission_date.strftime('%Y-%m-%d %H:%M'),
-            'Discharged On': (r.discharge_date.strftime('%Y-%m-%d %H:%M')
-                               if r.discharge_date else 'Still Admitted'),
+        yield {
+            'Patient': _full_name(r['child__first_name'], r['child__last_name']),
+            'Reason': r['admission_reason'],
+            'Diagnosis': r['initial_diagnosis'],
+            'Location': (f"{r['bed__bed_number']} in {r['bed__ward__name']}"
+                         if r['bed_id'] else 'N/A'),
+            'Doctor': (_full_name(r['attending_doctor__first_name'], r['attending_doctor__last_name'])
+                       if r['attending_doctor_id'] else 'N/A'),
+            'Admitted On': r['admission_date'].strftime('%Y-%m-%d %H:%M'),
+            'Discharged On': (r['discharge_date'].strftime('%Y-%m-%d %H:%M')
+                              if r['discharge_date'] else 'Still Admitted'),
         }
-        data.append(row)
-    return data
 
 
-def _build_discharge_data(records: QuerySet) -> List[Dict[str, Any]]:
-    # you could share code with _build_admission_data if desired
-    data = _build_admission_data(records)
-    # but if discharge report only needs subset, you can remap:
-    for row in data:
-        # keep only child, discharge date, diagnosis, doctor…
-        row_keys = ['Child Name','Diagnosis','Doctor','Discharge Date']
-        for k in list(row):
-            if k not in row_keys:
-                row.pop(k)
-    return data
+def _build_discharge_data(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    # Discharge report only needs a subset of the admission columns
+    row_keys = ['Patient', 'Diagnosis', 'Doctor', 'Discharged On']
+    for row in _build_admission_data(records):
+        yield {k: row[k] for k in row_keys}
 
 
-def _build_vaccination_data(records: QuerySet) -> List[Dict[str, Any]]:
-    data: List[Dict[str, Any]] = []
+def _build_vaccination_data(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
     for r in records:
-        data.append({
-            'Child Name': f"{r.child.first_name} {r.child.last_name}",
-            'Vaccine': r.vaccine.name,
-            'Dose #': r.dose_number,
-            'Scheduled': r.scheduled_date.strftime('%Y-%m-%d'),
-            'Administered': (r.administered_date.strftime('%Y-%m-%d')
-                             if r.administered_date else 'Pending'),
-            'Status': r.status,
-            'Batch #': r.batch_number or 'N/A',
-            'Notes': r.notes or ''
-        })
-    return data
-
-def _build_prescription_data(records: QuerySet) -> List[Dict[str, Any]]:
-    data: List[Dict[str, Any]] = []
-    for r in records:
-        data.append({
-            'Child Name': f"{r.prescription.child.first_name} {r.prescription.child.last_name}",
-            'Drug': f"{r.drug.name} ({r.drug.strength})",
-            
-            'Dosage': r.dosage,
-            'Frequency': r.frequency,
-            'Duration': f"{r.duration_value} {r.duration_unit}",
-            'Prescribed By': f"Dr. {r.prescription.doctor.first_name} {r.prescription.doctor.last_name}",
-            
-            
-            
-        })
-    return data
-
-def _build_drug_dispense_data(records: QuerySet) -> List[Dict[str, Any]]:
-    data: List[Dict[str, Any]] = []
+        yield {
+            'Child Name': _full_name(r['child__first_name'], r['child__last_name']),
+            'Vaccine': r['vaccine__name'],
+            'Dose #': r['dose_number'],
+            'Scheduled': r['scheduled_date'].strftime('%Y-%m-%d'),
+            'Administered': (r['administered_date'].strftime('%Y-%m-%d')
+                             if r['administered_date'] else 'Pending'),
+            'Status': r['status'],
+            'Batch #': r['batch_number'] or 'N/A',
+            'Notes': r['notes'] or ''
+        }
+
+
+def _build_prescription_data(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
     for r in records:
-        date_obj = r.date_dispensed
-        day_with_suffix = get_day_with_suffix(date_obj.day)
-        date_dispensed = date_obj.strftime(f"{day_with_suffix} %B, %Y %I:%M %p")
-
-        data.append({
-            'Date Dispensed': date_dispensed,
-            'Dispensed To': f"{r.prescription_item.prescription.child.first_name} {r.prescription_item.prescription.child.last_name}",
-            'Prescribed By': f"Dr. {r.prescription_item.prescription.doctor.first_name} {r.prescription_item.prescription.doctor.last_name}",
-            'Dispensed By': f"Dr. {r.pharmacist.first_name} {r.pharmacist.last_name}",
-            'Drug Dispensed': f"{r.prescription_item.drug.name} ({r.prescription_item.drug.strength})",
-            'Dosage': r.prescription_item.dosage,
-            'Frequency': r.prescription_item.get_frequency_display(),
-            'Quantity Dispensed': r.quantity_dispensed,
-        })
-    return data
-
-
-def _build_lab_report_data(records: QuerySet) -> List[Dict[str, Any]]:
-    data: List[Dict[str, Any]] = []
-    
+        yield {
+            'Child Name': _full_name(r['prescription__child__first_name'], r['prescription__child__last_name']),
+            'Drug': f"{r['drug__name']} ({r['drug__strength']})",
+            'Dosage': r['dosage'],
+            'Frequency': r['frequency'],
+            'Duration': f"{r['duration_value']} {r['duration_unit']}",
+            'Prescribed By': _full_name(r['prescription__doctor__first_name'],
+                                        r['prescription__doctor__last_name'], prefix='Dr. '),
+        }
+
+
+def _build_drug_dispense_data(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
     for r in records:
-        date_obj = r.lab_result.date_performed
-        day_with_suffix = get_day_with_suffix(date_obj.day)
-        date_performed = date_obj.strftime(f"{day_with_suffix} %B, %Y %I:%M %p")
-
-        request_id = r.lab_result.lab_request_item.lab_request.request_id
-        patient = r.lab_result.lab_request_item.lab_request.child
-        doctor = r.lab_result.lab_request_item.lab_request.requested_by
-        lab_tech = r.lab_result.performed_by
-        lab_test = r.lab_result.lab_request_item.lab_test
-        reference_range = str(r.reference_range) if r.reference_range else "N/A"
-        parameter_name = r.parameter_name
-        value = r.value
-        unit = r.unit
-        status = r.status
-
-        data.append({
-            "Date Performed": date_performed,
-            "Request ID": request_id,
-            "Patient": f"{patient.first_name} {patient.last_name}",
-            "Requested By": f"Dr. {doctor.first_name} {doctor.last_name}",
-            "Performed By": f"{lab_tech.first_name} {lab_tech.last_name}" if lab_tech else "N/A",
-            "Test": lab_test.name if hasattr(lab_test, "name") else str(lab_test),
-            "Parameter Name": parameter_name,
-            "Value": value,
-            "Unit": unit,
-            "Reference Range": reference_range,
-            "Status": status,
-        })
-
-    return data
+        frequency = r['prescription_item__frequency']
+        yield {
+            'Date Dispensed': _format_timestamp(r['date_dispensed']),
+            'Dispensed To': _full_name(r['prescription_item__prescription__child__first_name'],
+                                       r['prescription_item__prescription__child__last_name']),
+            'Prescribed By': _full_name(r['prescription_item__prescription__doctor__first_name'],
+                                        r['prescription_item__prescription__doctor__last_name'], prefix='Dr. '),
+            'Dispensed By': (_full_name(r['pharmacist__first_name'], r['pharmacist__last_name'], prefix='Dr. ')
+                             if r['pharmacist_id'] else 'N/A'),
+            'Drug Dispensed': f"{r['prescription_item__drug__name']} ({r['prescription_item__drug__strength']})",
+            'Dosage': r['prescription_item__dosage'],
+            'Frequency': _FREQUENCY_LABELS.get(frequency, frequency),
+            'Quantity Dispensed': r['quantity_dispensed'],
+        }
 
 
-        
-        
+def _build_lab_report_data(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    request = 'lab_result__lab_request_item__lab_request__'
+    for r in records:
+        yield {
+            "Date Performed": _format_timestamp(r['lab_result__date_performed']),
+            "Request ID": r[request + 'request_id'],
+            "Patient": _full_name(r[request + 'child__first_name'], r[request + 'child__last_name']),
+            "Requested By": _full_name(r[request + 'requested_by__first_name'],
+                                       r[request + 'requested_by__last_name'], prefix='Dr. '),
+            "Performed By": (_full_name(r['lab_result__performed_by__first_name'],
+                                        r['lab_result__performed_by__last_name'])
+                             if r['lab_result__performed_by_id'] else "N/A"),
+            "Test": r['lab_result__lab_request_item__lab_test__name'],
+            "Parameter Name": r['parameter_name'],
+            "Value": r['value'],
+            "Unit": r['unit'],
+            "Reference Range": _format_reference_range(r),
+            "Status": r['status'],
+        }
 
 
 def write_report_file(report_data: List[Dict[str, Any]], filepath: Path, file_format: str) -> Path:
@@ -167,23 +226,62 @@ def write_report_file(report_data: List[Dict[str, Any]], filepath: Path, file_fo
     if not report_data:
         raise ValueError("No data provided for report")
 
+    if file_format != FileFormat.PDF.value:
+        stream_report_file(report_data, filepath, file_format)
+        return filepath
+
     try:
-        if file_format == FileFormat.PDF.value:
-            generate_pdf(report_data, filepath)
-        else:
-            # For non-PDF formats, use pandas
-            df = pd.DataFrame(report_data)
-            
-            if file_format == FileFormat.CSV.value:
-                df.to_csv(filepath, index=False)
-            elif file_format == FileFormat.XLSX.value:
-                df.to_excel(filepath, index=False)
-            else:
-                raise ValueError(f"Unsupported file format: {file_format}")
-        
+        generate_pdf(report_data, filepath)
         logger.info(f"Report saved to {filepath}")
         return filepath
 
     except Exception as e:
         logger.error(f"Failed to write report: {str(e)}")
         raise
+
+
+def stream_report_file(rows: Iterable[Dict[str, Any]], filepath: Path, file_format: str) -> int:
+    """
+    Write CSV/XLSX rows as they arrive so memory stays flat however large
+    the report is. Columns come from the first row.
+
+    Returns:
+        Number of rows written
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        raise ValueError("No data provided for report")
+    header = list(first)
+    count = 0
+
+    try:
+        if file_format == FileFormat.CSV.value:
+            with open(filepath, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=header)
+                writer.writeheader()
+                writer.writerow(first)
+                count = 1
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+        elif file_format == FileFormat.XLSX.value:
+            # write_only workbooks flush each appended row to a temp file
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet()
+            ws.append(header)
+            ws.append([first[k] for k in header])
+            count = 1
+            for row in rows:
+                ws.append([row.get(k) for k in header])
+                count += 1
+            wb.save(filepath)
+        else:
+            raise ValueError(f"Unsupported file format: {file_format}")
+
+        logger.info(f"Report saved to {filepath} ({count} rows)")
+        return count
+
+    except Exception as e:
+        logger.error(f"Failed to write report: {str(e)}")
+        raise
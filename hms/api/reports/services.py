@@ -1,6 +1,6 @@
 # api/reports/services.py
 from .utils import ReportTypeEnum, FileFormat, get_default_recipients, get_default_users, generate_filename
-from .data import build_report_data, write_report_file
+from .data import build_report_data, write_report_file, iter_report_rows, stream_report_file
 import os
 import logging
 from django.utils import timezone
@@ -203,9 +203,16 @@ def generate_report(
         return None
 
     try:
-        report_data = build_report_data(records, report_type)
         filepath = generate_filename(prefix, file_format)
-        write_report_file(report_data, filepath, file_format)
+        if file_format == FileFormat.PDF.value:
+            # reportlab lays the table out in one go, so PDF still needs the full list
+            report_data = build_report_data(records, report_type)
+            write_report_file(report_data, filepath, file_format)
+            record_count = len(report_data)
+        else:
+            record_count = stream_report_file(
+                iter_report_rows(records, report_type), filepath, file_format
+            )
 
         report_title = f"{report_name} - {current_date.strftime('%Y-%m-%d')}"
         report_obj = save_report_to_db(
@@ -213,7 +220,7 @@ def generate_report(
             report_type=db_report_type,
             file_format=file_format,
             title=report_title,
-            record_count=len(report_data),
+            record_count=record_count,
             users=users_with_access  # pass actual user instances here
         )
 
@@ -3,7 +3,7 @@ import logging
 from api.reports.services import generate_report
 from api.reports.utils import ReportTypeEnum, FileFormat, get_doctor_and_nurse_recipients
 from typing import List, Optional
-from ..tasks import create_notification_task
+from ..tasks import create_notifications_task
 
 logger = logging.getLogger(__name__)
 @shared_task
@@ -29,8 +29,7 @@ def generate_admission_report(
             logger.info(f"ADMISSION report generated: {path} (DB id={report_obj.id})")
 
             message = f"New admission report (ID: {report_obj.id}) has been generated and is available."
-            for user in users:
-                create_notification_task.delay(user.id, message)
+            create_notifications_task.delay([(user.id, message) for user in users])
         else:
             logger.info("NO ADMISSION REPORT TO GENERATE")
     except Exception:
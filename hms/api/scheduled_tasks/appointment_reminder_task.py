@@ -1,8 +1,13 @@
+from django.db.models import Count, Q
 from ..models import Appointment, DoctorProfile
-from ..tasks import create_notification_task
+from ..tasks import create_notifications_task
 from celery import shared_task
+from django.conf import settings
 from django.utils.timezone import now, timedelta
 
+# Reminder sweeps may overlap or be re-run; don't repeat a reminder
+SWEEP_DEDUPE_WINDOW = getattr(settings, 'NOTIFICATION_SWEEP_DEDUPE_WINDOW', 0)
+
 @shared_task
 def send_appointment_reminder():
     """
@@ -15,23 +20,28 @@ def send_appointment_reminder():
     
     # For testing - get ALL confirmed appointments instead of just tomorrow's
     appointments = Appointment.objects.filter(
-        status="CONFIRMED"
+        status="CONFIRMED", parent__isnull=False
+    ).values_list(
+        'parent__user_id', 'doctor__user__username', 'appointment_date', 'appointment_time'
     )
-    
-    if not appointments.exists():
+
+    notifications = [
+        (
+            parent_user_id,
+            f"TEST REMINDER: Your appointment with Dr. {doctor_username} is scheduled for {appt_date} at {appt_time}."
+        )
+        for parent_user_id, doctor_username, appt_date, appt_time in appointments
+    ]
+
+    if not notifications:
         print("No confirmed appointments found in the database")
         return
-    
-    print(f"Found {appointments.count()} confirmed appointments")
-    
-    for appointment in appointments:
-        parent = appointment.parent.user
-        message = f"TEST REMINDER: Your appointment with Dr. {appointment.doctor.user.username} is scheduled for {appointment.appointment_date} at {appointment.appointment_time}."
 
-        # Send notification to the parent
-        create_notification_task.delay(parent.id, message)
+    print(f"Found {len(notifications)} confirmed appointments")
 
-        print(f"Test reminder notification sent to parent {parent.username} for appointment on {appointment.appointment_date}")
+    # One fan-out task for every parent instead of one task per appointment
+    create_notifications_task.delay(notifications, dedupe_window=SWEEP_DEDUPE_WINDOW)
+    print(f"Queued {len(notifications)} appointment reminder notifications")
 
 
 @shared_task()
@@ -44,38 +54,32 @@ def send_doctor_appointment_reminder_summary():
     current_time = now()
     print(f"Running doctor summary task at {current_time}")
 
-    # Get all doctors with scheduled appointments
-    doctors = DoctorProfile.objects.filter(appointments__status__in=["CONFIRMED", "PENDING"]).distinct()
-
-    if not doctors.exists():
-        print("No doctors found with scheduled appointments.")
-        return
-
-    for doctor in doctors:
-        # Get today's appointments (CONFIRMED and PENDING) for this doctor
-        appointments_today = Appointment.objects.filter(
-            doctor=doctor,
-            appointment_date=current_time.date(),
-            status__in=["CONFIRMED", "PENDING"]
+    # Per-doctor counts of today's CONFIRMED and PENDING appointments, in one query
+    summaries = (
+        Appointment.objects
+        .filter(appointment_date=current_time.date(), status__in=["CONFIRMED", "PENDING"])
+        .values('doctor__user_id')
+        .annotate(
+            confirmed_count=Count('id', filter=Q(status="CONFIRMED")),
+            pending_count=Count('id', filter=Q(status="PENDING")),
         )
+    )
 
-        if not appointments_today.exists():
-            print(f"No appointments found for Dr. {doctor.user.username} today.")
-            continue
-
-        # Count CONFIRMED and PENDING appointments
-        confirmed_count = appointments_today.filter(status="CONFIRMED").count()
-        pending_count = appointments_today.filter(status="PENDING").count()
-
-        # Create summary message
-        message = (
+    notifications = [
+        (
+            summary['doctor__user_id'],
             # f"Hello Dr. {doctor.user.username},\n"
-            f"You have {confirmed_count} confirmed and {pending_count} pending appointments for today."
+            f"You have {summary['confirmed_count']} confirmed and {summary['pending_count']} pending appointments for today."
         )
+        for summary in summaries
+    ]
+
+    if not notifications:
+        print("No doctors found with scheduled appointments.")
+        return
 
-        # Send notification to the doctor
-        create_notification_task.delay(doctor.user.id, message)
-        print(f"Doctor summary sent to {doctor.user.username}")
+    create_notifications_task.delay(notifications, dedupe_window=SWEEP_DEDUPE_WINDOW)
+    print(f"Doctor summaries queued for {len(notifications)} doctors")
 
     print("=== DOCTOR APPOINTMENT SUMMARY TASK COMPLETED ===")
 
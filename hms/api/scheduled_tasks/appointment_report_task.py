@@ -164,36 +164,52 @@ def generate_and_send_appointment_report():
     logger.info(f"Sent appointment report to admins: {admin_emails}")
 
 from django.utils import timezone
-from datetime import datetime
-from ..notifications import create_notification_task
+from django.db import transaction
+from django.db.models import Q
+from ..tasks import create_notifications_task
+from ..documents import sync_search_index
 @shared_task
 def auto_complete_appointments():
     """
     Find every CONFIRMED appointment whose date+time is now in the past,
     mark it COMPLETED, and (optionally) notify parent & doctor.
     Returns list of IDs that were updated.
+
+    The date+time comparison is done in the database (date before today, or
+    today with a time that has passed), and the status change is a single
+    UPDATE, so the cost follows the number of due appointments rather than
+    the size of the table and no per-row save signals fire.
     """
-    now = timezone.now()
-    updated_ids = []
-    qs = Appointment.objects.filter(status="CONFIRMED")
-    for appt in qs:
-        # combine date + time into a timezone‑aware datetime
-        appt_dt = datetime.combine(appt.appointment_date, appt.appointment_time)
-        appt_dt = timezone.make_aware(appt_dt, timezone.get_current_timezone())
-
-        if appt_dt <= now:
-            appt.status = "COMPLETED"
-            appt.save()
-            updated_ids.append(appt.id)
-
-            # notify parent
-            if appt.parent:
-                msg = f"Your appointment on {appt.appointment_date} at {appt.appointment_time} is now completed."
-                create_notification_task.delay(appt.parent.user.id, msg)
-
-            # notify doctor
-            doc_user = appt.doctor.user
-            create_notification_task.delay(doc_user.id,
-                f"Appointment {appt.id} has been auto‑completed.")
+    local_now = timezone.localtime()
+    due = Q(appointment_date__lt=local_now.date()) | Q(
+        appointment_date=local_now.date(), appointment_time__lte=local_now.time()
+    )
 
+    with transaction.atomic():
+        rows = list(
+            Appointment.objects
+            .select_for_update(of=('self',))
+            .filter(due, status="CONFIRMED")
+            .values_list('id', 'parent__user_id', 'doctor__user_id', 'appointment_date', 'appointment_time')
+        )
+        updated_ids = [row[0] for row in rows]
+        if not updated_ids:
+            return []
+        Appointment.objects.filter(id__in=updated_ids).update(
+            status="COMPLETED", updated_at=timezone.now()
+        )
+
+    notifications = []
+    for appt_id, parent_user_id, doctor_user_id, appt_date, appt_time in rows:
+        # notify parent
+        if parent_user_id:
+            msg = f"Your appointment on {appt_date} at {appt_time} is now completed."
+            notifications.append((parent_user_id, msg))
+
+        # notify doctor
+        notifications.append((doctor_user_id,
+            f"Appointment {appt_id} has been auto‑completed."))
+
+    create_notifications_task.delay(notifications)
+    sync_search_index(Appointment, updated_ids)
     return updated_ids
\ No newline at end of file
@@ -3,7 +3,8 @@ import logging
 from api.reports.services import generate_report
 from api.reports.utils import ReportTypeEnum, FileFormat, get_parent, get_default_recipients
 from typing import List, Optional
-from ..tasks import create_notification_task
+from ..models import User
+from ..tasks import create_notifications_task
 
 logger = logging.getLogger(__name__)
 
@@ -52,8 +53,9 @@ def generate_bill_by_bill_number(bill_number: str, file_format: str = FileFormat
             logger.info(f"Bill generated successfully: {path} (DB ID: {report_obj.id})")
             message = f"New Bill (NUMBER: {report_obj.id}) has been generated and is available"
             if final_recipients:
-                for email in final_recipients:
-                    create_notification_task.delay(email, message)
+                # Recipients are emails; resolve them to users in one query
+                recipient_ids = User.objects.filter(email__in=final_recipients).values_list('id', flat=True)
+                create_notifications_task.delay([(user_id, message) for user_id in recipient_ids])
         else: 
             logger.info(f"No bill items found for the bill with bill_number: {bill_number}")
     except Exception:
@@ -3,7 +3,8 @@ import logging
 from api.reports.services import generate_report
 from api.reports.utils import ReportTypeEnum, FileFormat, get_labtech_recipients, get_requested_by_user_for_request, get_requested_by_email_for_request
 from typing import List, Optional
-from ..tasks import create_notification_task
+from ..models import User
+from ..tasks import create_notifications_task
 
 logger = logging.getLogger(__name__)
 
@@ -53,8 +54,9 @@ def generate_lab_report(request_id: str, file_format: str = FileFormat.PDF.value
             message = f"New lab report (ID: {report_obj.id}) has been generated and is available."
             # In this case, we assume we only have one recipient (the requested_by user).
             if final_recipients:
-                for email in final_recipients:
-                    create_notification_task.delay(email, message)
+                # Recipients are emails; resolve them to users in one query
+                recipient_ids = User.objects.filter(email__in=final_recipients).values_list('id', flat=True)
+                create_notifications_task.delay([(user_id, message) for user_id in recipient_ids])
 
         else:
             logger.info(f"No lab results found for request_id: {request_id}")
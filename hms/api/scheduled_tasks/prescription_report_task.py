@@ -7,8 +7,9 @@ from ..reports.services import generate_report
 
 
 from django.utils import timezone
+from django.db import transaction
 from ..models import Prescription
-from ..tasks import create_notification_task
+from ..tasks import create_notifications_task
 
 logger = logging.getLogger(__name__)
 @shared_task
@@ -60,51 +61,55 @@ def generate_prescription_spreadsheet(
     logger.info("PRESCRIPTION SPREADHSHEET GENERATED!")
 
 
+def _sweep_prescriptions(from_status, to_status, parent_message, doctor_message):
+    """
+    Move every `from_status` prescription whose valid_until has passed to
+    `to_status` with one UPDATE, then notify the affected parents and doctors
+    in a single fan-out. Returns the ids that changed.
+    """
+    today = timezone.localdate()
+    with transaction.atomic():
+        rows = list(
+            Prescription.objects
+            .select_for_update(of=('self',))
+            .filter(status=from_status, valid_until__lte=today)
+            .values_list(
+                'id', 'doctor__user_id', 'child__primary_guardian__user_id',
+                'child__first_name', 'child__last_name',
+            )
+        )
+        ids = [row[0] for row in rows]
+        if not ids:
+            return []
+        # update() skips Prescription.save(), which would otherwise force
+        # every past-dated prescription to EXPIRED
+        Prescription.objects.filter(id__in=ids).update(status=to_status)
+
+    notifications = []
+    for _, doctor_user_id, parent_user_id, child_first_name, child_last_name in rows:
+        if parent_user_id:
+            notifications.append((parent_user_id, parent_message))
+        if doctor_user_id:
+            notifications.append((
+                doctor_user_id, f"Your prescription for {child_first_name} {child_last_name} {doctor_message}"
+            ))
+    if notifications:
+        create_notifications_task.delay(notifications)
+    return ids
+
+
 @shared_task
 def auto_expire_prescriptions():
-    now = timezone.now().date() 
-    expired_prescriptions = []
-    pending_prescriptions = Prescription.objects.filter(status="PENDING")
-    for prescription in pending_prescriptions:
-        prescription_valid_until = prescription.valid_until
-        if prescription_valid_until <= now:
-            prescription.status = "EXPIRED"
-            prescription.save()
-            expired_prescriptions.append(prescription.id)
-            doctor = prescription.doctor.user
-            parent = prescription.child.primary_guardian.user
-            if parent:
-                message = f"Your pending prescription has expired"
-                create_notification_task.delay(
-                    parent.id, message
-                )
-            create_notification_task.delay(
-                doctor.id, f"Your prescription for {prescription.child.first_name} {prescription.child.last_name} has expired"
-                
-            )
-    return expired_prescriptions
+    return _sweep_prescriptions(
+        "PENDING", "EXPIRED",
+        parent_message="Your pending prescription has expired",
+        doctor_message="has expired",
+    )
 
 @shared_task
 def auto_complete_prescriptions():
-    now = timezone.now().date()
-    completed_prescriptions = []
-    active_prescriptions = Prescription.objects.filter(status="ACTIVE")
-    for prescription in active_prescriptions:
-        prescription_valid_until = prescription.valid_until
-        if prescription_valid_until <= now:
-            prescription.status = "COMPLETED"
-            prescription.save()
-            completed_prescriptions.append(prescription.id)
-            doctor = prescription.doctor.user
-            parent = prescription.child.primary_guardian.user
-            if parent:
-                message = f"Your active prescription is now complete"
-                create_notification_task.delay(
-                    parent.id, message
-                )
-            create_notification_task.delay(
-                doctor.id, f"Your prescription for {prescription.child.first_name} {prescription.child.last_name} is complete"
-                
-            )
-    return completed_prescriptions
-            
\ No newline at end of file
+    return _sweep_prescriptions(
+        "ACTIVE", "COMPLETED",
+        parent_message="Your active prescription is now complete",
+        doctor_message="is complete",
+    )
@@ -1,8 +1,12 @@
 from ..models import VaccinationRecord, User
-from ..tasks import create_notification_task
+from ..tasks import create_notifications_task
 from celery import shared_task
+from django.conf import settings
 from django.utils.timezone import now, timedelta
 
+# Reminder sweeps may overlap or be re-run; don't repeat a reminder
+SWEEP_DEDUPE_WINDOW = getattr(settings, 'NOTIFICATION_SWEEP_DEDUPE_WINDOW', 0)
+
 # vaccination_reminder_task.py
 
 
@@ -24,7 +28,7 @@ def send_vaccination_reminder():
     # Find vaccination records scheduled for tomorrow
     vaccinations = VaccinationRecord.objects.filter(
         scheduled_date=tomorrow, status="SCHEDULED"
-    )
+    ).select_related('child__primary_guardian__user', 'vaccine')
     
     if not vaccinations.exists():
         print("No scheduled vaccinations found for tomorrow.")
@@ -32,6 +36,7 @@ def send_vaccination_reminder():
     
     print(f"Found {vaccinations.count()} scheduled vaccinations.")
     
+    notifications = []
     for vaccination in vaccinations:
         child = vaccination.child
         parent = getattr(child.primary_guardian, 'user', None)
@@ -48,9 +53,12 @@ def send_vaccination_reminder():
             f"Please remember to take your child for their scheduled vaccination."
         )
         
-        # Send reminder notification
-        create_notification_task.delay(parent.id, message)
-        print(f"Reminder notification sent to parent {parent.username} for vaccination on {vaccination.scheduled_date}.")
+        notifications.append((parent.id, message))
+        print(f"Reminder notification queued for parent {parent.username} for vaccination on {vaccination.scheduled_date}.")
+
+    # Send every reminder through a single fan-out task
+    if notifications:
+        create_notifications_task.delay(notifications, dedupe_window=SWEEP_DEDUPE_WINDOW)
 
 
 
@@ -79,17 +87,18 @@ def vaccination_reminder_for_medical_professionals():
     print(f"Found {total_scheduled} scheduled vaccinations for today.")
 
     # Get all doctors and nurses (assuming roles are stored in user model)
-    medical_staff = User.objects.filter(role__in=["doctor", "nurse"])  # Adjust field name if different
+    medical_staff_ids = User.objects.filter(role__in=["doctor", "nurse"]).values_list('id', flat=True)  # Adjust field name if different
 
-    for staff in medical_staff:
-        message = (
-            f"📢 Vaccination Reminder!\n\n"
-            f"🔹 You have {total_scheduled} scheduled vaccinations today.\n"
-            f"📅 Date: {current_time.strftime('%d %B %Y')}\n\n"
-            f"Please ensure all vaccinations are administered on time."
-        )
+    message = (
+        f"📢 Vaccination Reminder!\n\n"
+        f"🔹 You have {total_scheduled} scheduled vaccinations today.\n"
+        f"📅 Date: {current_time.strftime('%d %B %Y')}\n\n"
+        f"Please ensure all vaccinations are administered on time."
+    )
 
-        # Send notification
-        create_notification_task.delay(staff.id, message)
+    # Send the same reminder to all staff in one fan-out task
+    notifications = [(staff_id, message) for staff_id in medical_staff_ids]
+    if notifications:
+        create_notifications_task.delay(notifications, dedupe_window=SWEEP_DEDUPE_WINDOW)
 
-        print(f"Reminder sent to {staff.username} about {total_scheduled} scheduled vaccinations.")
\ No newline at end of file
+    print(f"Reminder sent to {len(notifications)} staff about {total_scheduled} scheduled vaccinations.")
\ No newline at end of file
@@ -20,6 +20,7 @@ from .prescription_serializers import PrescriptionSerializer, PrescriptionItemSe
 from .scheduler_serializers import AdmissionReportScheduleSerializer, VaccinationReportScheduleSerializer, DrugDispenseReportScheduleSerializer
 from .lab_serializers import LabTestSerializer, ReferenceRangeSerializer
 from .lab_request_serializers import LabRequestSerializer, LabRequestItemSerializer
-from .lab_result_serializers import LabResultSerializer, LabResultParameterSerializer
+from .lab_result_serializers import LabResultSerializer, LabResultParameterSerializer, LabPanelSerializer
 from .billing_serializers import BillItemSerializer, BillSerializer
-from .payment_serializers import *
\ No newline at end of file
+from .payment_serializers import *
+from .import_serializers import ImportJobSerializer, ImportUploadSerializer
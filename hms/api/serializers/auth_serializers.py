@@ -3,7 +3,7 @@ from ..models import (User, OTP, DoctorProfile, NurseProfile, PharmacistProfile,
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth.password_validation import validate_password
 from .profile_serializers import (DoctorProfileSerializer, NurseProfileSerializer, PharmacistProfileSerializer, LabTechProfileSerializer, ParentProfileSerializer)
-from ..tasks import create_system_log_task
+from ..tasks import log_system_event
 class UserSerializer(serializers.ModelSerializer):
     profile = serializers.SerializerMethodField()
 
@@ -145,7 +145,7 @@ class LoginSerializer(TokenObtainPairSerializer):
 
         # Prevent login if the user's status is banned
         if user.status == User.BANNED:
-            create_system_log_task.delay(
+            log_system_event(
                 level='WARNING',
                 message=f"Login attempt blocked for banned user: {user.email}",
                 user_id=user.id
@@ -158,14 +158,14 @@ class LoginSerializer(TokenObtainPairSerializer):
             try:
                 otp = OTP.objects.get(user=user)
                 if not otp.is_verified:
-                    create_system_log_task.delay(
+                    log_system_event(
                         level='WARNING',
                         message=f"Login attempt failed: Email not verified for {user.email}",
                         user_id=user.id
                     )
                     raise serializers.ValidationError("Email not verified. Please verify your email with the OTP sent to you.")
             except OTP.DoesNotExist:
-                create_system_log_task.delay(
+                log_system_event(
                     level='ERROR',
                     message=f"Login attempt failed: OTP record missing for {user.email}",
                     user_id=user.id
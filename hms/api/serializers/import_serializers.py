@@ -0,0 +1,29 @@
+from rest_framework import serializers
+from django.core.validators import FileExtensionValidator
+from ..models import ImportJob
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'kind', 'status',
+            'processed_rows', 'created_count', 'error_count', 'errors', 'detail',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+
+class ImportUploadSerializer(serializers.Serializer):
+    file = serializers.FileField(
+        validators=[
+            FileExtensionValidator(allowed_extensions=['xlsx', 'xls', 'csv'])
+        ]
+    )
+
+    def validate_file(self, value):
+        # Background imports aren't bound by the request timeout, so allow
+        # far larger sheets than the inline bulk-upload endpoints
+        if value.size > 100 * 1024 * 1024:  # 100MB limit
+            raise serializers.ValidationError("File size cannot exceed 100MB")
+        return value
@@ -1,4 +1,4 @@
-from rest_framework.serializers import ModelSerializer, SerializerMethodField
+from rest_framework.serializers import ModelSerializer, Serializer, SerializerMethodField, ValidationError
 from ..models import LabResult, LabResultParameter
 from rest_framework.exceptions import PermissionDenied
 
@@ -96,5 +96,35 @@ class LabResultParameterSerializer(ModelSerializer):
                 "normal_range": f"{reference.min_value} - {reference.max_value} {obj.value} {obj.unit}"
             }
         return None
-    
-    
\ No newline at end of file
+
+
+class LabPanelParameterSerializer(ModelSerializer):
+    class Meta:
+        model = LabResultParameter
+        fields = ['parameter_name', 'value', 'notes']
+
+
+class LabPanelSerializer(Serializer):
+    """
+    Every parameter of one lab result, submitted together. Pass the
+    lab_result in the context to reject parameters it already has.
+    """
+    parameters = LabPanelParameterSerializer(many=True, allow_empty=False)
+
+    def validate_parameters(self, parameters):
+        names = [p['parameter_name'] for p in parameters]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValidationError(f"Duplicate parameters in panel: {', '.join(duplicates)}")
+
+        lab_result = self.context.get('lab_result')
+        if lab_result is not None:
+            existing = sorted(set(
+                LabResultParameter.objects
+                .filter(lab_result=lab_result, parameter_name__in=names)
+                .values_list('parameter_name', flat=True)
+            ))
+            if existing:
+                raise ValidationError(f"Parameters already entered for this lab result: {', '.join(existing)}")
+        return parameters
+
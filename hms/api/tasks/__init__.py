@@ -1,3 +1,8 @@
 from .create_system_log_task import *
 from .send_email_task import *
-from .send_notification_task import *
\ No newline at end of file
+from .send_notification_task import *
+from .system_log_sink import *
+from .bulk_import_task import *
+from .search_index_task import *
+# Lives with the chatbot client; imported here so the worker registers it
+from ..chatbot.tasks import summarize_conversation
@@ -0,0 +1,17 @@
+from celery import shared_task
+
+
+@shared_task
+def run_import_job_task(job_id):
+    """
+    Process a queued ImportJob outside the request, so large sheets don't
+    run into the gunicorn timeout.
+    """
+    # The engine lives with the field processors in views.utils, which
+    # imports this package; load it when the task runs
+    from ..views.utils.bulk_import import run_import_job
+
+    summary = run_import_job(job_id)
+    if summary is not None:
+        print(f"Import job {job_id}: {summary['created']} created, {summary['error_count']} errors")
+    return job_id
@@ -0,0 +1,18 @@
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def apply_search_index_changes_task(changes):
+    """
+    Write a batch of queued [model_label, pk, op] search index changes with
+    the bulk helper. Queued by api.documents.signals.SearchIndexQueue.
+    """
+    from ..documents.indexing import apply_index_changes
+
+    indexed, failed = apply_index_changes(changes)
+    logger.info(f"Search index: {indexed} actions applied, {failed} failed")
+    return indexed
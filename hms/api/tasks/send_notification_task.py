@@ -1,11 +1,19 @@
+import logging
+from datetime import timedelta
+
 from celery import shared_task
+from django.utils import timezone
 
 from ..models import Notification, User
 
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_BATCH_SIZE = 500
+
 
 @shared_task
 def create_notification_task(user_id, message):
-    
+
     try:
         user = User.objects.get(id=user_id)
         Notification.objects.create(recipient=user, message=message)
@@ -13,3 +21,55 @@ def create_notification_task(user_id, message):
     except User.DoesNotExist:
         print(f"User with ID {user_id} does not exist")
 
+
+def fan_out_notifications(pairs, dedupe_window=0, batch_size=NOTIFICATION_BATCH_SIZE):
+    """
+    Write many notifications at once from (user_id, message) pairs.
+
+    Per batch this costs one query to drop unknown users, one bulk INSERT and,
+    when `dedupe_window` (seconds) is set, one query to skip identical
+    notifications already sent inside it. Only scheduled sweeps pass a window
+    (settings.NOTIFICATION_SWEEP_DEDUPE_WINDOW); a status that genuinely
+    changes twice must notify twice. Repeated pairs within the call are
+    collapsed. Returns the number of notifications created.
+    """
+
+    unique_pairs = list(dict.fromkeys(
+        (int(user_id), message) for user_id, message in pairs if user_id is not None
+    ))
+    created = 0
+    for start in range(0, len(unique_pairs), batch_size):
+        batch = unique_pairs[start:start + batch_size]
+        user_ids = {user_id for user_id, _ in batch}
+        existing_users = set(User.objects.filter(id__in=user_ids).values_list('id', flat=True))
+        batch = [(user_id, message) for user_id, message in batch if user_id in existing_users]
+        if not batch:
+            continue
+
+        if dedupe_window:
+            since = timezone.now() - timedelta(seconds=dedupe_window)
+            already_sent = set(
+                Notification.objects.filter(
+                    recipient_id__in={user_id for user_id, _ in batch},
+                    message__in={message for _, message in batch},
+                    timestamp__gte=since,
+                ).values_list('recipient_id', 'message')
+            )
+            batch = [pair for pair in batch if pair not in already_sent]
+
+        Notification.objects.bulk_create(
+            [Notification(recipient_id=user_id, message=message) for user_id, message in batch]
+        )
+        created += len(batch)
+    return created
+
+
+@shared_task
+def create_notifications_task(pairs, dedupe_window=0):
+    """
+    Celery entry point for fan_out_notifications: one task per fan-out
+    instead of one per recipient.
+    """
+    created = fan_out_notifications(pairs, dedupe_window=dedupe_window)
+    logger.info(f"{created} notifications created")
+    return created
@@ -0,0 +1,261 @@
+import atexit
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from celery import shared_task
+
+from ..models import User, SystemLog
+from .create_system_log_task import create_system_log_task
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SINK_SETTINGS = {
+    # 'memory' buffers per process; 'redis' shares one list across processes
+    'BACKEND': 'memory',
+    'REDIS_URL': None,
+    'REDIS_KEY': 'hms:system_log_buffer',
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_BUFFER': 10000,
+}
+
+
+class MemoryLogBuffer:
+    """
+    Per-process buffer. Entries past MAX_BUFFER are dropped (counted and sent
+    to the error log) rather than letting a stalled database grow the worker
+    without bound.
+    """
+
+    def __init__(self, max_buffer):
+        self.max_buffer = max_buffer
+        self._entries = []
+        self._lock = threading.Lock()
+
+    def push(self, entry):
+        with self._lock:
+            if len(self._entries) >= self.max_buffer:
+                return False
+            self._entries.append(entry)
+            return True
+
+    def pop_batch(self, size):
+        with self._lock:
+            batch, self._entries = self._entries[:size], self._entries[size:]
+            return batch
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisLogBuffer:
+    """
+    Redis list shared by every gunicorn and Celery process, so any of them
+    can flush entries written by the others. LPOP with a count is atomic,
+    which keeps two flushers from writing the same entry twice.
+    """
+
+    def __init__(self, url, key, max_buffer):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.key = key
+        self.max_buffer = max_buffer
+
+    def push(self, entry):
+        if self.client.llen(self.key) >= self.max_buffer:
+            return False
+        self.client.rpush(self.key, json.dumps(entry))
+        return True
+
+    def pop_batch(self, size):
+        raw = self.client.lpop(self.key, size) or []
+        return [json.loads(item) for item in raw]
+
+    def __len__(self):
+        return self.client.llen(self.key)
+
+
+class SystemLogSink:
+    """
+    Collects SystemLog entries and writes them with one bulk_create per batch,
+    on whichever comes first: BATCH_SIZE pending entries or FLUSH_INTERVAL
+    seconds since the last flush.
+    """
+
+    def __init__(self, options=None):
+        self.options = {**DEFAULT_SINK_SETTINGS, **(options or {})}
+        self._buffer = None
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        self._timer_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.metrics = {
+            'emitted': 0,
+            'written': 0,
+            'dropped': 0,
+            'flushes': 0,
+            'failed_flushes': 0,
+            'max_depth': 0,
+            'last_flush_seconds': 0.0,
+        }
+
+    @property
+    def buffer(self):
+        if self._buffer is None:
+            opts = self.options
+            if opts['BACKEND'] == 'redis':
+                url = opts['REDIS_URL'] or getattr(settings, 'CELERY_BROKER_URL', None)
+                self._buffer = RedisLogBuffer(url, opts['REDIS_KEY'], opts['MAX_BUFFER'])
+            else:
+                self._buffer = MemoryLogBuffer(opts['MAX_BUFFER'])
+        return self._buffer
+
+    def emit(self, level, message, user_id=None):
+        entry = {'level': level, 'message': message, 'user_id': user_id}
+        try:
+            accepted = self.buffer.push(entry)
+        except Exception as e:
+            logger.error(f"System log buffer unavailable, writing directly: {e}")
+            self._write([entry])
+            return
+
+        self.metrics['emitted'] += 1
+        if not accepted:
+            self._drop(entry, 'buffer full')
+            return
+
+        depth = len(self.buffer)
+        self.metrics['max_depth'] = max(self.metrics['max_depth'], depth)
+        if depth >= self.options['BATCH_SIZE']:
+            self.flush()
+        else:
+            self._ensure_timer()
+
+    def flush(self):
+        """
+        Drain the buffer in BATCH_SIZE chunks. Returns the number of rows written.
+        """
+        written = 0
+        with self._flush_lock:
+            started = time.monotonic()
+            while True:
+                batch = self.buffer.pop_batch(self.options['BATCH_SIZE'])
+                if not batch:
+                    break
+                written += self._write(batch)
+            self._last_flush = time.monotonic()
+            if written:
+                self.metrics['flushes'] += 1
+                self.metrics['last_flush_seconds'] = round(self._last_flush - started, 4)
+        return written
+
+    def _drop(self, entry, reason):
+        # Audit entries must leave a trace even when they can't be stored
+        self.metrics['dropped'] += 1
+        logger.error(
+            f"Dropped system log entry ({reason}): "
+            f"level={entry['level']} user_id={entry['user_id']} message={entry['message']!r}"
+        )
+
+    def _write(self, batch):
+        # One query resolves every referenced user; ids of deleted users are
+        # stored as NULL, matching what the per-entry task used to do.
+        try:
+            user_ids = {entry['user_id'] for entry in batch if entry['user_id'] is not None}
+            existing = set(User.objects.filter(id__in=user_ids).values_list('id', flat=True)) if user_ids else set()
+            rows = [
+                SystemLog(
+                    level=entry['level'],
+                    message=entry['message'],
+                    user_id=entry['user_id'] if entry['user_id'] in existing else None,
+                )
+                for entry in batch
+            ]
+            SystemLog.objects.bulk_create(rows, batch_size=self.options['BATCH_SIZE'])
+        except Exception as e:
+            self.metrics['failed_flushes'] += 1
+            logger.error(f"Failed to bulk write {len(batch)} system log entries, writing one by one: {e}")
+            return self._write_each(batch)
+        self.metrics['written'] += len(rows)
+        return len(rows)
+
+    def _write_each(self, batch):
+        """
+        Write entries through the old per-row path, so one bad entry (or a
+        transient error) doesn't cost the whole batch. Returns rows written.
+        """
+        written = 0
+        for entry in batch:
+            try:
+                create_system_log_task(entry['level'], entry['message'], user_id=entry['user_id'])
+            except Exception as e:
+                self._drop(entry, f"write failed: {e}")
+            else:
+                written += 1
+        self.metrics['written'] += written
+        return written
+
+    def _ensure_timer(self):
+        with self._timer_lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Thread(target=self._run_timer, name='system-log-sink', daemon=True)
+            self._timer.start()
+
+    def _run_timer(self):
+        interval = self.options['FLUSH_INTERVAL']
+        try:
+            while True:
+                time.sleep(interval)
+                if time.monotonic() - self._last_flush >= interval:
+                    self.flush()
+                with self._timer_lock:
+                    # Decided under the lock so a concurrent emit either sees
+                    # this thread still running or starts a fresh one
+                    if not len(self.buffer):
+                        self._timer = None
+                        break
+        except Exception as e:
+            with self._timer_lock:
+                self._timer = None
+            logger.error(f"System log flush thread stopped: {e}")
+        finally:
+            # The thread has its own DB connection; don't leak it
+            connections.close_all()
+
+    def get_metrics(self):
+        try:
+            depth = len(self.buffer)
+        except Exception:
+            depth = None
+        return {
+            **self.metrics,
+            'backend': self.options['BACKEND'],
+            'depth': depth,
+            'capacity': self.options['MAX_BUFFER'],
+        }
+
+
+system_log_sink = SystemLogSink(getattr(settings, 'SYSTEM_LOG_SINK', None))
+atexit.register(system_log_sink.flush)
+
+
+def log_system_event(level, message, user_id=None):
+    """
+    Queue a SystemLog entry. Drop-in replacement for create_system_log_task.delay().
+    """
+    system_log_sink.emit(level, message, user_id=user_id)
+
+
+@shared_task
+def flush_system_log_buffer_task():
+    """
+    Drain the shared buffer from a worker; useful as a periodic task with the
+    redis backend so entries never wait on a quiet web process.
+    """
+    return system_log_sink.flush()
@@ -1,3 +1,158 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .documents.admission_documents import AdmissionDocument
+from .documents.indexing import apply_index_changes
+from .documents.postgres_search import PostgresIndexBackend, search_entries
+from .documents.signals import search_index_queue
+from .documents.utils import sync_search_index
+from .models import AdmissionRecord, Appointment, Bill, Child, Payment, Prescription, User
+from .tasks import apply_search_index_changes_task
+from .views.utils import terms_filter
+
+
+def make_user(username, role):
+    return User.objects.create_user(
+        username=username, email=f'{username}@example.com', password='pass', role=role,
+    )
+
+
+def flush_search_index_queue():
+    """Apply the changes the signal processor queued, as the Celery task would."""
+    apply_index_changes(search_index_queue.drain(), PostgresIndexBackend())
+
+
+@override_settings(SEARCH_INDEX_BACKEND='postgres')
+class GuardianChangeSearchTests(TestCase):
+    """Records copied into the index follow their child's guardians."""
+
+    def setUp(self):
+        search_index_queue.drain()
+        self.old_guardian = self._parent('old-guardian')
+        self.new_guardian = self._parent('new-guardian')
+        self.child = Child.objects.create(
+            first_name='Amani', last_name='Otieno', date_of_birth=date(2020, 1, 1), gender='F',
+            primary_guardian=self.old_guardian,
+        )
+        AdmissionRecord.objects.create(child=self.child, admission_reason='Persistent fever')
+        flush_search_index_queue()
+
+    def _parent(self, username):
+        return make_user(username, User.PARENT).parentprofile
+
+    def _admission_hits(self, guardian):
+        _, hits = search_entries(
+            AdmissionDocument._index._name, 'fever', ['admission_reason'],
+            filters=[terms_filter('guardian_ids', guardian.id)],
+        )
+        return hits
+
+    def test_removed_guardian_no_longer_finds_admissions(self):
+        self.assertEqual(len(self._admission_hits(self.old_guardian)), 1)
+
+        self.child.primary_guardian = self.new_guardian
+        self.child.save()
+        flush_search_index_queue()
+
+        self.assertEqual(self._admission_hits(self.old_guardian), [])
+        self.assertEqual(len(self._admission_hits(self.new_guardian)), 1)
+
+
+@override_settings(SEARCH_INDEX_BACKEND='postgres')
+class SearchIndexDispatchTests(TransactionTestCase):
+    """
+    Outside a transaction, changes made together still reach Celery as one
+    task per batch, not one per row.
+    """
+
+    def setUp(self):
+        search_index_queue.drain()
+        guardian = make_user('guardian', User.PARENT).parentprofile
+        self.child = Child.objects.create(
+            first_name='Amani', last_name='Otieno', date_of_birth=date(2020, 1, 1), gender='F',
+            primary_guardian=guardian,
+        )
+        self.admissions = [
+            AdmissionRecord.objects.create(child=self.child, admission_reason='Fever') for _ in range(5)
+        ]
+
+    def test_bulk_sync_sends_one_task_per_batch(self):
+        with mock.patch.object(apply_search_index_changes_task, 'delay') as delay, \
+                mock.patch.object(search_index_queue, 'batch_size', 2):
+            sync_search_index(AdmissionRecord, [admission.pk for admission in self.admissions])
+        self.assertEqual(delay.call_count, 3)
+
+    def test_child_save_sends_one_task_with_related_records(self):
+        with mock.patch.object(apply_search_index_changes_task, 'delay') as delay:
+            self.child.first_name = 'Neema'
+            self.child.save()
+        self.assertEqual(delay.call_count, 1)
+        queued = {(label, pk) for label, pk, _ in delay.call_args.args[0]}
+        for admission in self.admissions:
+            self.assertIn(('api.admissionrecord', admission.pk), queued)
+
+
+class ListQueryCountTests(TestCase):
+    """
+    List endpoints must cost the same number of queries however many rows
+    they return; a relation their serializer walks without select_related
+    or prefetch_related shows up here as a growing count.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = make_user('admin', User.ADMIN)
+        self.doctor = make_user('doctor', User.DOCTOR).doctorprofile
+        self.parent = make_user('parent', User.PARENT).parentprofile
+        self.child = Child.objects.create(
+            first_name='Amani', last_name='Otieno', date_of_birth=date(2020, 1, 1), gender='F',
+            primary_guardian=self.parent,
+        )
+
+    def assertConstantQueries(self, url_name, user, make_row, few=2, many=10):
+        self.client.force_authenticate(user)
+        url = reverse(url_name)
+        for _ in range(few):
+            make_row()
+        # Warm per-process caches (content types, permission matrix) first
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as baseline:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), few)
+
+        for _ in range(many - few):
+            make_row()
+        with self.assertNumQueries(len(baseline.captured_queries)):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), many)
+
+    def test_appointment_list(self):
+        self.assertConstantQueries('appointments-list', self.admin, lambda: Appointment.objects.create(
+            parent=self.parent, doctor=self.doctor, child=self.child, reason='Check-up',
+        ))
+
+    def test_admission_list(self):
+        self.assertConstantQueries('admissionrecord-list', self.admin, lambda: AdmissionRecord.objects.create(
+            child=self.child, attending_doctor=self.doctor, admission_reason='Fever',
+        ))
+
+    def test_payment_list(self):
+        def make_payment():
+            bill = Bill.objects.create(child=self.child)
+            # Cash, so no Stripe intent is looked up per row
+            return Payment.objects.create(bill=bill, amount=Decimal('10.00'), method='cash')
+
+        self.assertConstantQueries('payment-list', self.admin, make_payment)
+
+    def test_prescription_list(self):
+        self.assertConstantQueries('prescriptions-list', self.doctor.user, lambda: Prescription.objects.create(
+            doctor=self.doctor, child=self.child,
+        ))
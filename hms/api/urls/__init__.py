@@ -23,6 +23,7 @@ from .lab_urls import urlpatterns as lab_urls
 from .lab_request_urls import urlpatterns as lab_request_urls
 from .lab_result_urls import urlpatterns as lab_result_urls
 from .billing_urls import urlpatterns as billing_urls
+from .import_urls import urlpatterns as import_urls
 
 # Combine all urlpatterns
 urlpatterns = (
@@ -44,6 +45,7 @@ urlpatterns = (
     + prescription_urls + 
     scheduler_urls + report_urls + 
     lab_urls + lab_request_urls + lab_result_urls +
-    billing_urls
+    billing_urls +
+    import_urls
     
 )
@@ -0,0 +1,11 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from ..views import ImportJobViewSet
+
+router = DefaultRouter()
+router.register(r'import-jobs', ImportJobViewSet, basename='import-jobs')
+
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -1,7 +1,8 @@
 from django.urls import path
-from api.views import SystemLogListView, SystemLogDeleteView
+from api.views import SystemLogListView, SystemLogDeleteView, SystemLogSinkMetricsView
 
 urlpatterns = [
     path('system-logs/', SystemLogListView.as_view(), name='system-log-list'),
     path('system-logs/<int:pk>/', SystemLogDeleteView.as_view(), name='system-log-delete'),
+    path('system-logs/sink-metrics/', SystemLogSinkMetricsView.as_view(), name='system-log-sink-metrics'),
 ]
@@ -4,7 +4,9 @@ from ..views import (
     GrowthPercentileView,
     GrowthVelocityView,
     GrowthForecastView,
-    VitalsTrendPlotView  
+    VitalsTrendPlotView,
+    ChildGrowthAnalyticsView,
+    CohortGrowthAnalyticsView,
 )
 
 urlpatterns = [
@@ -13,4 +15,6 @@ urlpatterns = [
     path("children/<int:child_id>/growth-velocity/", GrowthVelocityView.as_view(), name="growth_velocity"),
     path("children/<int:child_id>/growth-forecast/", GrowthForecastView.as_view(), name="growth_forecast"),
     path("children/<int:child_id>/vitals-plot/", VitalsTrendPlotView.as_view(), name="vitals_plot"),
+    path("children/<int:child_id>/growth-analytics/", ChildGrowthAnalyticsView.as_view(), name="growth_analytics"),
+    path("growth-analytics/cohort/", CohortGrowthAnalyticsView.as_view(), name="cohort_growth_analytics"),
 ]
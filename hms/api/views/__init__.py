@@ -1,5 +1,5 @@
 from .auth_views import (RegisterView, LoginView, OTPVerificationView, ResendOTPView)
-from .logging_views import SystemLogListView, SystemLogDeleteView, LoggingViewSet
+from .logging_views import SystemLogListView, SystemLogDeleteView, SystemLogSinkMetricsView, LoggingViewSet
 from .report_views import ReportViewSet
 from .permission_views import RolePermissionViewSet, ContentTypesView
 from .verification_views import (VerifyMedicalProfessionalView)
@@ -22,6 +22,7 @@ from .child_views import (ChildViewSet)
 from .chatbot_views import *
 from .tracking_views import ChildGrowthHistoryView
 from .plot_views import (ChildGrowthChartView, GrowthPercentileView, GrowthVelocityView, GrowthForecastView, VitalsTrendPlotView)
+from .growth_analytics_views import ChildGrowthAnalyticsView, CohortGrowthAnalyticsView
 from .hospital_views import (WardViewSet, BedViewSet)
 from .shift_views import (ShiftViewSet, DoctorShiftAssignmentViewSet, NurseShiftAssignmentViewSet, 
                           PharmacistShiftAssignmentViewSet, LabTechShiftAssignmentViewSet )
@@ -41,4 +42,5 @@ from .bill_generation_views import *
 from .payment_views import PaymentViewSet
 
 from .child_medical_history import *
-from .chatbot_pdf_view import *
\ No newline at end of file
+from .chatbot_pdf_view import *
+from .import_views import ImportJobViewSet
@@ -6,12 +6,13 @@ from ..serializers import AdminUserSerializer, ParentProfileSerializer, DoctorPr
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from ..permissions import IsAdminUser, IsMedicalProfessionalUser, IsParentUser
-from ..tasks import send_email_task, create_system_log_task
-from django_elasticsearch_dsl.search import Search
+from ..tasks import send_email_task, log_system_event
 from rest_framework.views import APIView
 from ..serializers import UserSearchSerializer
+from .utils import elastic_search, FieldProjectionMixin
+from ..documents import UserDocument
 
-class AdminUserViewSet(ModelViewSet):
+class AdminUserViewSet(FieldProjectionMixin, ModelViewSet):
     queryset = User.objects.all()
     serializer_class = AdminUserSerializer
     permission_classes = [IsAdminUser]
@@ -38,13 +39,13 @@ class AdminUserViewSet(ModelViewSet):
             )
             send_email_task.delay(subject, message, [user.email])
 
-            create_system_log_task.delay(
+            log_system_event(
                 level='INFO',
                 message=f"New user created by admin: {user.username}",
                 user_id=user.id
             )
         except Exception as e:
-            create_system_log_task.delay(
+            log_system_event(
                 level='ERROR',
                 message=f"Error creating user: {str(e)}",
                 user_id=self.request.user.id
@@ -66,7 +67,7 @@ class AdminUserViewSet(ModelViewSet):
                 )
                 send_email_task.delay(subject, message, [user.email])
 
-                create_system_log_task.delay(
+                log_system_event(
                     level='INFO',
                     message=f"User {user.username} was banned by admin.",
                     user_id=request.user.id
@@ -75,7 +76,7 @@ class AdminUserViewSet(ModelViewSet):
             else:
                 return Response({"status": "user is already banned"}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            create_system_log_task.delay(
+            log_system_event(
                 level='ERROR',
                 message=f"Error banning user {user.username}: {str(e)}",
                 user_id=request.user.id
@@ -97,7 +98,7 @@ class AdminUserViewSet(ModelViewSet):
                 )
                 send_email_task.delay(subject, message, [user.email])
 
-                create_system_log_task.delay(
+                log_system_event(
                     level='INFO',
                     message=f"User {user.username} was activated by admin.",
                     user_id=request.user.id
@@ -106,7 +107,7 @@ class AdminUserViewSet(ModelViewSet):
             else:
                 return Response({"status": "user is already active"}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            create_system_log_task.delay(
+            log_system_event(
                 level='ERROR',
                 message=f"Error activating user {user.username}: {str(e)}",
                 user_id=request.user.id
@@ -118,7 +119,7 @@ class AdminUserViewSet(ModelViewSet):
         user = self.get_object()
         try:
             if user.role == User.PARENT:
-                create_system_log_task.delay(
+                log_system_event(
                     level='WARNING',
                     message=f"Attempted verification of a non-medical user: {user.username}",
                     user_id=request.user.id
@@ -139,7 +140,7 @@ class AdminUserViewSet(ModelViewSet):
             )
             send_email_task.delay(subject, message, [user.email])
 
-            create_system_log_task.delay(
+            log_system_event(
                 level='INFO',
                 message=f"User {user.username} manually verified by admin.",
                 user_id=request.user.id
@@ -147,7 +148,7 @@ class AdminUserViewSet(ModelViewSet):
             return Response({"status": "user manually verified successfully"}, status=status.HTTP_200_OK)
 
         except Exception as e:
-            create_system_log_task.delay(
+            log_system_event(
                 level='ERROR',
                 message=f"Error during manual verification of user {user.username}: {str(e)}",
                 user_id=request.user.id
@@ -155,31 +156,31 @@ class AdminUserViewSet(ModelViewSet):
             return Response({"error": "An error occurred."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
    
-class AdminDoctorProfileViewSet(ModelViewSet):
+class AdminDoctorProfileViewSet(FieldProjectionMixin, ModelViewSet):
     queryset = DoctorProfile.objects.all()
     serializer_class = DoctorProfileSerializer
     permission_classes = [IsParentUser | IsAdminUser]
 
 
-class AdminNurseProfileViewSet(ModelViewSet):
+class AdminNurseProfileViewSet(FieldProjectionMixin, ModelViewSet):
     queryset = NurseProfile.objects.all()
     serializer_class = NurseProfileSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
 
 
-class AdminPharmacistProfileViewSet(ModelViewSet):
+class AdminPharmacistProfileViewSet(FieldProjectionMixin, ModelViewSet):
     queryset = PharmacistProfile.objects.all()
     serializer_class = PharmacistProfileSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
 
 
-class AdminLabTechProfileViewSet(ModelViewSet):
+class AdminLabTechProfileViewSet(FieldProjectionMixin, ModelViewSet):
     queryset = LabTechProfile.objects.all()
     serializer_class = LabTechProfileSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
 
 
-class AdminParentProfileViewSet(ModelViewSet):
+class AdminParentProfileViewSet(FieldProjectionMixin, ModelViewSet):
     queryset = ParentProfile.objects.all()
     serializer_class = ParentProfileSerializer
     permission_classes = [IsAuthenticated, IsAdminUser | IsMedicalProfessionalUser]
@@ -189,23 +190,9 @@ class UserSearchView(APIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        query = request.GET.get("q", "")
-        if not query:
-            return Response({"error": "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
-
-        try:
-            search = Search(index="users").query(
-                "multi_match",
-                query=query,
-                fields=["username", "email", "role"],
-                type="phrase_prefix"  # <<< ADDED here
-            )
-            results = search.execute()
-            serialized_results = [UserSearchSerializer(hit.to_dict()).data for hit in results]
-
-            
-            return Response(serialized_results)
-
-        except Exception as e:
-            
-            return Response({"error": "An error occurred while searching."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return elastic_search(
+            request=request,
+            document_class=UserDocument,
+            search_fields=["username", "email", "role"],
+            source_fields=UserSearchSerializer.Meta.fields,
+        )
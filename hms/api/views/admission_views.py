@@ -3,7 +3,7 @@ from rest_framework.response import Response
 from rest_framework import exceptions
 from django.utils import timezone
 from rest_framework.decorators import action
-from .utils import elastic_search
+from .utils import elastic_search, terms_filter, RelatedFieldsMixin, FieldProjectionMixin
 from ..models import AdmissionRecord, AdmissionVitalRecord, AdmissionVitalRecordHistory
 from ..serializers import AdmissionRecordSerializer, AdmissionVitalRecordSerializer, AdmissionVitalRecordHistorySerializer
 from ..permissions import AdmissionRecordPermission, AdmissionVitalRecordPermission
@@ -12,11 +12,12 @@ from ..scheduled_tasks import send_vitals_history_report
 from .logging_views import LoggingViewSet
 from ..documents import AdmissionDocument
 from ..scheduled_tasks import generate_admission_report
-class AdmissionRecordViewSet(LoggingViewSet, viewsets.ModelViewSet):
+class AdmissionRecordViewSet(FieldProjectionMixin, RelatedFieldsMixin, LoggingViewSet, viewsets.ModelViewSet):
     """API endpoint that allows admission records to be managed"""
     resource = "AdmissionRecord"
     queryset = AdmissionRecord.objects.all()
     serializer_class = AdmissionRecordSerializer
+    select_related_fields = ['child', 'bed__ward', 'attending_doctor__user', 'diagnosis']
     permission_classes = [AdmissionRecordPermission]
     
     def get_queryset(self):
@@ -35,6 +36,15 @@ class AdmissionRecordViewSet(LoggingViewSet, viewsets.ModelViewSet):
             )
         
         return AdmissionRecord.objects.none()  # Other users get no access
+
+    def get_search_filters(self):
+        """The get_queryset rules as Elasticsearch filters."""
+        user = self.request.user
+        if user.role in ['admin', 'doctor', 'nurse']:
+            return []
+        if user.role == 'parent':
+            return [terms_filter("guardian_ids", user.parentprofile.id)]
+        return None
     
     def perform_create(self, serializer):
         
@@ -59,8 +69,7 @@ class AdmissionRecordViewSet(LoggingViewSet, viewsets.ModelViewSet):
                 "doctor_first_name",
                 "doctor_last_name",
             ],
-            serializer_class=AdmissionRecordSerializer,
-            get_queryset_method=self.get_queryset
+            filters=self.get_search_filters()
         )
     @action(detail=False, methods=['post'], url_path='send-admission-report')
     def send_admission_report(self, request):
@@ -119,7 +128,7 @@ class AdmissionRecordViewSet(LoggingViewSet, viewsets.ModelViewSet):
 
 
 
-class AdmissionVitalRecordViewSet(LoggingViewSet, viewsets.ModelViewSet):
+class AdmissionVitalRecordViewSet(FieldProjectionMixin, LoggingViewSet, viewsets.ModelViewSet):
     """
     API endpoint for managing admission vital records.
     
@@ -158,7 +167,7 @@ class AdmissionVitalRecordViewSet(LoggingViewSet, viewsets.ModelViewSet):
             status=status.HTTP_202_ACCEPTED
         )
 
-class AdmissionVitalRecordHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+class AdmissionVitalRecordHistoryViewSet(FieldProjectionMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = AdmissionVitalRecordHistorySerializer
     permission_classes = [AdmissionVitalRecordPermission]
 
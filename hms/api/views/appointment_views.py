@@ -6,9 +6,10 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from .utils import elastic_search
+from .utils import elastic_search, terms_filter, RelatedFieldsMixin, FieldProjectionMixin
 from ..scheduled_tasks import generate_and_send_appointment_report, auto_complete_appointments
-from ..models import Appointment, DoctorProfile, DoctorShiftAssignment, Shift, Child
+from ..models import Appointment, DoctorProfile, Child
+from ..caches import doctor_has_shift_assignments, is_doctor_available
 from ..serializers import AppointmentSerializer
 from ..documents import AppointmentDocument
 from django.db import IntegrityError
@@ -16,7 +17,7 @@ from .logging_views import LoggingViewSet
 
 logger = logging.getLogger(__name__)
 
-class AppointmentViewSet(LoggingViewSet, viewsets.ModelViewSet):
+class AppointmentViewSet(FieldProjectionMixin, RelatedFieldsMixin, LoggingViewSet, viewsets.ModelViewSet):
     """
     ViewSet to handle CRUD operations for Appointment model.
     Admin can manage all appointments.
@@ -25,6 +26,7 @@ class AppointmentViewSet(LoggingViewSet, viewsets.ModelViewSet):
     """
     queryset = Appointment.objects.all()
     serializer_class = AppointmentSerializer
+    select_related_fields = ['parent', 'doctor', 'child__primary_guardian']
     #filter_backends = [DjangoFilterBackend, OrderingFilter]
     #filterset_fields = ['status']
     permission_classes = [IsAuthenticated]
@@ -48,6 +50,17 @@ class AppointmentViewSet(LoggingViewSet, viewsets.ModelViewSet):
         else:
             return Appointment.objects.none()
 
+    def get_search_filters(self):
+        """The get_queryset rules as Elasticsearch filters."""
+        user = self.request.user
+        if user.role == 'admin':
+            return []
+        if user.role == 'parent':
+            return [terms_filter("parent_id", user.parentprofile.id)]
+        if user.role == 'doctor':
+            return [terms_filter("doctor_id", get_object_or_404(DoctorProfile, user=user).id)]
+        return None
+
     @action(detail=True, methods=['post'])
     def confirm(self, request, pk=None):
         """
@@ -151,9 +164,8 @@ class AppointmentViewSet(LoggingViewSet, viewsets.ModelViewSet):
         return elastic_search(
             request=request,
             document_class=AppointmentDocument,
-            search_fields=["initial_diagnosis","admission_reason", "child_first_name", "child_last_name","doctor_first_name","doctor_last_name"],
-            serializer_class=AppointmentSerializer,
-            get_queryset_method=self.get_queryset
+            search_fields=["reason", "status", "child_first_name", "child_last_name","doctor_first_name","doctor_last_name"],
+            filters=self.get_search_filters()
         )
 
 
@@ -213,55 +225,15 @@ class AppointmentViewSet(LoggingViewSet, viewsets.ModelViewSet):
             f"day_of_week: {day_of_week}, appt_time: {appt_time}"
         )
 
-        # Debug: Log all doctor shift assignments for this doctor
-        all_assignments = DoctorShiftAssignment.objects.filter(doctor_id=doctor_id)
-        logger.warning(f"All assignments count for doctor {doctor_id}: {all_assignments.count()}")
-        
-        if all_assignments.exists():
-            for assignment in all_assignments:
-                shift_count = assignment.shifts.count()
-                logger.warning(f"Assignment ID {assignment.id} has {shift_count} shifts")
-                
-                # Log each shift in the assignment
-                for shift in assignment.shifts.all():
-                    logger.warning(f"  - Shift: {shift.day} {shift.start_time}-{shift.end_time}")
-
-        # Fetch SHIFT ASSIGNMENTS for this doctor - check all assignments, not just first
-        doctor_shift_assignments = DoctorShiftAssignment.objects.filter(doctor_id=doctor_id)
-        
-        if not doctor_shift_assignments.exists():
+        # Slot validation is a single lookup in the cached availability index
+        if not doctor_has_shift_assignments(doctor_id):
             logger.warning("No shift assignments found for this doctor.")
             return Response(
                 {"detail": "This doctor has no shift assignments. Cannot schedule."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Check across all assignments if any shift matches
-        matched_shift = False
-        for assignment in doctor_shift_assignments:
-            shifts_qs = assignment.shifts.all()
-            logger.warning(f"SHIFT COUNT => {shifts_qs.count()} for assignment {assignment.id}")
-            
-            for shift in shifts_qs:
-                logger.warning(
-                    f"DEBUG SHIFT => day: '{shift.day}', "
-                    f"start: {shift.start_time}, end: {shift.end_time}"
-                )
-                logger.warning(
-                    f"DEBUG APPT => day_of_week: '{day_of_week}', appt_time: {appt_time}"
-                )
-                if shift.day == day_of_week:
-                    if shift.start_time <= appt_time <= shift.end_time:
-                        matched_shift = True
-                        logger.warning(
-                            f"Matched SHIFT => {shift.day} {shift.start_time}-{shift.end_time}"
-                        )
-                        break
-            
-            if matched_shift:
-                break
-        
-        if not matched_shift:
+
+        if not is_doctor_available(doctor_id, appt_date, appt_time):
             logger.warning(f"No matching shift found for doctor {doctor_id} at day {day_of_week}, time {appt_time}")
             return Response(
                 {"detail": "No matching shift for this doctor at the chosen date/time."},
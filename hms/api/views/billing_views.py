@@ -15,8 +15,9 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 from .logging_views import LoggingViewSet
+from .utils import FieldProjectionMixin
 
-class BillViewSet(LoggingViewSet, viewsets.ModelViewSet):
+class BillViewSet(FieldProjectionMixin, LoggingViewSet, viewsets.ModelViewSet):
     queryset = Bill.objects.all()
     serializer_class = BillSerializer
     permission_classes = [BillPermission]
@@ -62,7 +63,7 @@ class BillViewSet(LoggingViewSet, viewsets.ModelViewSet):
         )
 
 
-class BillItemViewSet(LoggingViewSet, ModelViewSet):
+class BillItemViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet):
     queryset = BillItem.objects.all()
     serializer_class = BillItemSerializer
     permission_classes = [BillPermission]
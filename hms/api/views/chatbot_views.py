@@ -3,12 +3,96 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from django.shortcuts import get_object_or_404
+from django.conf import settings
 from django.db import transaction
+from django.http import StreamingHttpResponse
 from ..chatbot import chatbot_model_client
+from ..chatbot.tasks import summarize_conversation
 from ..models import Conversation, Message
 from ..serializers import ConversationListSerializer, ConversationDetailSerializer, MessageSerializer
 from rest_framework.generics import ListAPIView, RetrieveAPIView
+import json
+import logging
 import uuid
+from .utils import FieldProjectionMixin
+
+logger = logging.getLogger(__name__)
+
+
+def _truthy(value):
+    return value in (True, 1, '1', 'true', 'True', 'yes')
+
+
+def save_conversation(user, model_resp):
+    """
+    Append the turn in a model-service response to the user's Conversation,
+    creating it on the first turn. Only the new messages are written, so a
+    turn costs the same however long the conversation is.
+    """
+    # ensure we always have a session id
+    session_id = model_resp.get('session_id') or str(uuid.uuid4())
+    new_messages = model_resp.get('new_messages')
+    if new_messages is None:
+        # Older model service: the turn is the tail of the full history
+        new_messages = model_resp.get('conversation_history', [])[-2:]
+
+    with transaction.atomic():
+        # Row lock so concurrent turns of one conversation get distinct sequences
+        convo, created = Conversation.objects.select_for_update().get_or_create(user=user, session_id=session_id)
+
+        # If the conversation was just created (or has no title), set the title from the first user message.
+        # Use the first message whose role is 'user' if available, otherwise use the first message's content.
+        if (created or not convo.title) and new_messages:
+            # find first user message
+            first_user_msg = None
+            for m in new_messages:
+                if (m.get('role') or '').lower() == 'user' and m.get('content'):
+                    first_user_msg = m.get('content')
+                    break
+            if not first_user_msg:
+                # fallback to first message content
+                first_user_msg = new_messages[0].get('content') if new_messages[0].get('content') else None
+
+            if first_user_msg:
+                # Capitalize first letter, strip whitespace
+                convo.title = first_user_msg.strip().capitalize()
+
+        Message.objects.bulk_create([
+            Message(
+                conversation=convo,
+                role=(msg.get('role') or 'assistant'),
+                content=(msg.get('content') or ''),
+                sequence=convo.message_count + offset,
+            )
+            for offset, msg in enumerate(new_messages)
+        ])
+        convo.message_count += len(new_messages)
+        convo.save(update_fields=['title', 'message_count', 'updated_at'])
+
+        every = getattr(settings, 'CHATBOT_SUMMARY_EVERY_MESSAGES', 0)
+        if every and convo.message_count - convo.summary_upto >= every:
+            transaction.on_commit(lambda: _queue_summary(convo.pk))
+    return convo
+
+
+def _queue_summary(conversation_id):
+    # The turn is already saved; a summary that can't be queued (or, with
+    # eager Celery, fails inline) must not turn it into an error
+    try:
+        summarize_conversation.delay(conversation_id)
+    except Exception as e:
+        logger.error(f"Could not summarize conversation {conversation_id}: {e}")
+
+
+def _conversation_summary(user, session_id):
+    if not session_id:
+        return None
+    return Conversation.objects.filter(user=user, session_id=session_id).values_list('summary', flat=True).first()
+
+
+def _sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 
 class ChatProxyView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -16,7 +100,9 @@ class ChatProxyView(APIView):
     def post(self, request):
         """
         Proxy message to model service, persist conversation + messages.
-        Request JSON: { "message": "...", "session_id": "<optional>" }
+        Request JSON: { "message": "...", "session_id": "<optional>", "stream": <optional bool> }
+        With "stream" (or ?stream=1) the reply is a text/event-stream of
+        `token` events followed by `done` (the usual response body) or `error`.
         """
         user = request.user
         message = request.data.get('message')
@@ -25,57 +111,43 @@ class ChatProxyView(APIView):
         if not message:
             return Response({"detail": "Missing 'message' in request body."}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Lets the model service keep a bounded prompt on long conversations
+        summary = _conversation_summary(user, session_id)
+
+        if _truthy(request.data.get('stream')) or _truthy(request.query_params.get('stream')):
+            response = StreamingHttpResponse(
+                self._relay_stream(user, message, session_id, summary),
+                content_type='text/event-stream',
+            )
+            response['Cache-Control'] = 'no-cache'
+            # Tell proxies (nginx) not to buffer the stream
+            response['X-Accel-Buffering'] = 'no'
+            return response
+
         try:
-            model_resp = chatbot_model_client.post_chat(message, session_id)
+            model_resp = chatbot_model_client.post_chat(message, session_id, summary=summary)
         except Exception as e:
             return Response({"detail": f"Model service error: {str(e)}"}, status=status.HTTP_502_BAD_GATEWAY)
 
         # model_resp expected to include: response, session_id, conversation_history (list of {role, content})
-        session_id = model_resp.get('session_id')
-        conversation_history = model_resp.get('conversation_history', [])
-
-        if not session_id:
-            # ensure we always have a session id
-            session_id = str(uuid.uuid4())
-
-        # Persist conversation and messages in DB
-        with transaction.atomic():
-            convo, created = Conversation.objects.get_or_create(user=user, session_id=session_id)
-
-            # If the conversation was just created (or has no title), set the title from the first user message.
-            # Use the first message whose role is 'user' if available, otherwise use the first message's content.
-            if (created or not convo.title) and conversation_history:
-                # find first user message
-                first_user_msg = None
-                for m in conversation_history:
-                    if (m.get('role') or '').lower() == 'user' and m.get('content'):
-                        first_user_msg = m.get('content')
-                        break
-                if not first_user_msg:
-                    # fallback to first message content
-                    first_user_msg = conversation_history[0].get('content') if conversation_history[0].get('content') else None
-
-                if first_user_msg:
-                    # Capitalize first letter, strip whitespace
-                    convo.title = first_user_msg.strip().capitalize()
-
-            # Replace local messages with the returned conversation_history to avoid duplication
-            convo.messages.all().delete()
-            messages_to_create = [
-                Message(
-                    conversation=convo,
-                    role=(msg.get('role') or 'assistant'),
-                    content=(msg.get('content') or '')
-                )
-                for msg in conversation_history
-            ]
-            # Bulk create messages
-            Message.objects.bulk_create(messages_to_create)
-
-            convo.save()
+        save_conversation(user, model_resp)
 
         return Response(model_resp, status=status.HTTP_200_OK)
 
+    def _relay_stream(self, user, message, session_id, summary=None):
+        """
+        Relay the model service's events as they arrive; the conversation is
+        persisted when the final `done` event comes through, before it is
+        passed on.
+        """
+        try:
+            for event, data in chatbot_model_client.stream_chat(message, session_id, summary=summary):
+                if event == 'done':
+                    save_conversation(user, data)
+                yield _sse_event(event, data)
+        except Exception as e:
+            yield _sse_event('error', {"status": 502, "detail": f"Model service error: {str(e)}"})
+
 
 class ChatClearView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -120,7 +192,7 @@ class SessionsView(APIView):
         })
 
 
-class ConversationListView(ListAPIView):
+class ConversationListView(FieldProjectionMixin, ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = ConversationListSerializer
 
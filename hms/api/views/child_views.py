@@ -7,14 +7,14 @@ from rest_framework.response import Response
 
 from ..serializers import ChildSerializer, DrugBulkUploadSerializer as ChildBulkUploadSerializer
 from ..permissions import IsParentOrAdmin
-from ..models import Child
-from .utils import CHILD_FIELD_PROCESSORS, process_excel_file_for_child
-from django_elasticsearch_dsl.search import Search
-from ..tasks import create_system_log_task
+from ..models import Child, ImportJob
+from .utils import elastic_search, terms_filter, run_import, BulkImportMixin, FieldProjectionMixin
+from ..documents import ChildDocument
+from ..tasks import log_system_event
 from rest_framework.parsers import MultiPartParser, FormParser
 from .logging_views import LoggingViewSet
 
-class ChildViewSet(LoggingViewSet, viewsets.ModelViewSet):
+class ChildViewSet(FieldProjectionMixin, BulkImportMixin, LoggingViewSet, viewsets.ModelViewSet):
     """
     ViewSet to handle CRUD operations for Child data.
     Admins and non-parents can manage all children.
@@ -23,6 +23,7 @@ class ChildViewSet(LoggingViewSet, viewsets.ModelViewSet):
     queryset = Child.objects.all()
     serializer_class = ChildSerializer
     permission_classes = [IsParentOrAdmin]  # Only the IsParentOrAdmin permission is needed now
+    import_kind = ImportJob.CHILD
 
     parser_classes = [MultiPartParser, FormParser]
     def get_queryset(self):
@@ -68,30 +69,16 @@ class ChildViewSet(LoggingViewSet, viewsets.ModelViewSet):
     def search(self, request):
         """
         Custom search action to search for children based on the query parameter 'q'.
-        This action uses Elasticsearch to perform the search.
+        Answered from the Elasticsearch index; parents only get their own children.
         """
-        query = request.GET.get("q", None)
-        if not query:
-            return Response({"error": "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # First step: Search with Elasticsearch
-        search = Search(index="childs").query(
-            "multi_match",
-            query=query,
-            fields=["first_name", "last_name", "primary_guardian_name"],
-            type="phrase_prefix"  # This allows prefix matching
+        user = request.user
+        filters = [terms_filter("guardian_ids", user.parentprofile.id)] if user.role == 'parent' else []
+        return elastic_search(
+            request=request,
+            document_class=ChildDocument,
+            search_fields=["first_name", "last_name", "primary_guardian_name"],
+            filters=filters,
         )
-        results = search.execute()
-        
-        # Get the IDs of matching results
-        child_ids = [hit.meta.id for hit in results]
-        
-        # Second step: Fetch complete objects from database
-        children = Child.objects.filter(id__in=child_ids).select_related('primary_guardian')
-        
-        # Use your full serializer to return data
-        serializer = ChildSerializer(children, many=True)
-        return Response(serializer.data)
 
     @action(detail=False, methods=['post'], url_path='bulk-upload')
     def bulk_upload(self, request):
@@ -100,30 +87,27 @@ class ChildViewSet(LoggingViewSet, viewsets.ModelViewSet):
         upload_serializer.is_valid(raise_exception=True)
         excel_file = upload_serializer.validated_data['file']
         
-        # 2. Process file using shared processors
+        # 2. Process file with the chunked importer (large files: use bulk-import)
         try:
-            successes, errors = process_excel_file_for_child(
-                excel_file,
-                field_processors=CHILD_FIELD_PROCESSORS,
-                serializer_class=ChildSerializer
-            )
+            summary = run_import(excel_file, ImportJob.CHILD, context={'request': request})
         except ValueError as e:
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        created, errors = summary['created'], summary['errors']
         
         # 3. Log the bulk upload activity
         user = self.request.user
-        create_system_log_task.delay(
+        log_system_event(
             level="INFO",
-            message=f"Child bulk upload completed. Created: {len(successes)}, Errors: {len(errors)}",
+            message=f"Child bulk upload completed. Created: {created}, Errors: {summary['error_count']}",
             user_id=user.id if user.is_authenticated else None
         )
         
         # 4. Return summary response
         status_code = status.HTTP_201_CREATED if not errors else status.HTTP_207_MULTI_STATUS
         return Response({
-            'created': len(successes), 
+            'created': created, 
             'errors': errors,
-            'message': f'Bulk upload completed. {len(successes)} children created, {len(errors)} errors.'
+            'message': f"Bulk upload completed. {created} children created, {summary['error_count']} errors."
         }, status=status_code)
 
             
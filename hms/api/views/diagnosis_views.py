@@ -1,7 +1,7 @@
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
 from rest_framework import status
-from .utils import elastic_search
+from .utils import elastic_search, terms_filter, FieldProjectionMixin
 from ..documents import DiagnosisDocument
 import requests
 from rest_framework.response import Response
@@ -11,18 +11,14 @@ from rest_framework.decorators import permission_classes, api_view
 from ..models import Diagnosis, DiagnosisAttachment, Treatment
 from ..serializers import DiagnosisSerializer, DiagnosisAttachmentSerializer, TreatmentSerializer
 from ..permissions import IsDoctorOrReadOnly, DiagnosisPermission, IsDoctorOrLabTechOtherwiseReadOnly
-from ..tasks import create_system_log_task
+from ..tasks import log_system_event
 from ..permissions import DynamicRolePermission
 from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
 from .logging_views import LoggingViewSet
+from ..icd.icd_client import search_icd
 
 
 
-# views/icd_api.py
-
-ICD_TOKEN_URL    = "https://icdaccessmanagement.who.int/connect/token"
-ICD_SEARCH_URL   = "https://id.who.int/icd/release/11/2023-01/mms/search"
-
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def search_icd_codes(request):
@@ -31,31 +27,11 @@ def search_icd_codes(request):
         return Response({"error":"Query parameter `q` is required."}, status=400)
 
     try:
-        # 1) get the OAuth2 token from the correct endpoint
-        token_resp = requests.post(ICD_TOKEN_URL, data={
-            'client_id': settings.ICD_CLIENT_ID,
-            'client_secret': settings.ICD_CLIENT_SECRET,
-            'grant_type': 'client_credentials',
-            'scope': 'icdapi_access'
-        })
-        token_resp.raise_for_status()
-        token = token_resp.json()['access_token']
-
-        # 2) call the search endpoint
-        icd_resp = requests.get(ICD_SEARCH_URL, headers={
-            'Authorization': f'Bearer {token}',
-            'Accept': 'application/json',
-            # you may also need API‑Version and Accept-Language headers
-            'API-Version': 'v2',
-            'Accept-Language': 'en'
-        }, params={'q': query})
-
-        icd_resp.raise_for_status()
-        return Response(icd_resp.json())
-
+        # Cached token, pooled connections and a result cache; see api/icd
+        return Response(search_icd(query))
     except requests.exceptions.RequestException as e:
         return Response({"error": str(e)}, status=500)
-class DiagnosisViewSet(LoggingViewSet, ModelViewSet):
+class DiagnosisViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet):
     serializer_class = DiagnosisSerializer
     permission_classes = [IsAuthenticated, DiagnosisPermission]
 
@@ -71,6 +47,17 @@ class DiagnosisViewSet(LoggingViewSet, ModelViewSet):
                 child__primary_guardian=user.parentprofile
             )
         return Diagnosis.objects.none()
+
+    def get_search_filters(self):
+        """The get_queryset rules as Elasticsearch filters."""
+        user = self.request.user
+        if user.role == 'doctor':
+            return [terms_filter("doctor_id", user.doctorprofile.id)]
+        if user.role == 'admin':
+            return []
+        if user.role == 'parent' and hasattr(user, 'parentprofile'):
+            return [terms_filter("primary_guardian_id", user.parentprofile.id)]
+        return None
     
     def perform_create(self, serializer):
         user = self.request.user
@@ -120,9 +107,8 @@ class DiagnosisViewSet(LoggingViewSet, ModelViewSet):
     @action(detail=False, methods=["get"], url_path="search")
     def search(self, request):
         """
-        Full-text search against the DiagnosisDocument index.
-        Passes `request` into the serializer context so that
-        `to_representation` can access `request.user`.
+        Full-text search against the DiagnosisDocument index, limited to
+        the diagnoses the user can see.
         """
         return elastic_search(
             request=request,
@@ -140,24 +126,22 @@ class DiagnosisViewSet(LoggingViewSet, ModelViewSet):
                 "doctor_first_name",
                 "doctor_last_name",
             ],
-            serializer_class=DiagnosisSerializer,
-            serializer_context={'request': request},
-            get_queryset_method=self.get_queryset
+            filters=self.get_search_filters()
         )
 
     def perform_create(self, serializer):
         profile = self.request.user.doctorprofile
         instance = serializer.save(doctor=profile)
         # assuming you have a task to log creations
-        from ..tasks import create_system_log_task
-        create_system_log_task.delay(
+        from ..tasks import log_system_event
+        log_system_event(
             level="INFO",
             message=f"Diagnosis created for patient '{instance.child.first_name}'.",
             user_id=self.request.user.id
         )
     
 
-class DiagnosisAttachmentViewSet(LoggingViewSet, ModelViewSet):
+class DiagnosisAttachmentViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet):
     queryset = DiagnosisAttachment.objects.all()
     serializer_class = DiagnosisAttachmentSerializer
     permission_classes = [IsDoctorOrLabTechOtherwiseReadOnly]
@@ -165,14 +149,14 @@ class DiagnosisAttachmentViewSet(LoggingViewSet, ModelViewSet):
     def perform_create(self, serializer):
         instance = serializer.save()
         user = self.request.user
-        create_system_log_task.delay(
+        log_system_event(
             level="INFO",
             message=f"Attachment added to diagnosis ID '{instance.diagnosis.id}'.",
             user_id=user.id if user.is_authenticated else None
         )
 
 
-class TreatmentViewSet(LoggingViewSet, ModelViewSet):
+class TreatmentViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet):
     queryset = Treatment.objects.all()
     serializer_class = TreatmentSerializer
     permission_classes = [IsDoctorOrReadOnly]
@@ -180,7 +164,7 @@ class TreatmentViewSet(LoggingViewSet, ModelViewSet):
     def perform_create(self, serializer):
         instance = serializer.save()
         user = self.request.user
-        create_system_log_task.delay(
+        log_system_event(
             level="INFO",
             message=f"Treatment plan created for diagnosis ID '{instance.diagnosis.id}'.",
             user_id=user.id if user.is_authenticated else None
@@ -8,26 +8,27 @@ import pandas as pd
 from django.db import transaction
 import datetime
 from decimal import Decimal
-from ..models import Drug, DrugInteraction, DrugDispenseRecord, BillItem
-from .utils import elastic_search, DRUG_FIELD_PROCESSORS, process_excel_file
+from ..models import Drug, DrugInteraction, DrugDispenseRecord, BillItem, ImportJob
+from .utils import elastic_search, run_import, BulkImportMixin, FieldProjectionMixin
 from ..serializers import DrugSerializer, DrugBulkUploadSerializer, DrugInteractionSerializer, DrugDispenseRecordSerializer
 from ..permissions import IsPharmacistOrReadOnly
-from ..tasks import create_system_log_task
+from ..tasks import log_system_event
 from .logging_views import LoggingViewSet
 from ..documents import DrugDocument, DrugInteractionDocument
 from ..scheduled_tasks import generate_drug_dispense_report
 from rest_framework.parsers import MultiPartParser, FormParser
-class DrugViewSet(LoggingViewSet, ModelViewSet):
+class DrugViewSet(FieldProjectionMixin, BulkImportMixin, LoggingViewSet, ModelViewSet):
     queryset = Drug.objects.all()
     serializer_class = DrugSerializer
     permission_classes = [IsPharmacistOrReadOnly]
+    import_kind = ImportJob.DRUG
     
     parser_classes = [MultiPartParser, FormParser]
 
     def perform_create(self, serializer):
         instance = serializer.save()
         user = self.request.user
-        create_system_log_task.delay(
+        log_system_event(
             level="INFO",
             message=f"Drug '{instance.name}' created.",
             user_id=user.id if user.is_authenticated else None
@@ -39,8 +40,6 @@ class DrugViewSet(LoggingViewSet, ModelViewSet):
             request=request,
             document_class=DrugDocument,
             search_fields=["name","generic_name","brand_name","description","category","dosage_form","manufacturer"],
-            serializer_class=DrugSerializer,
-            get_queryset_method=self.get_queryset
         )
     @action(detail=False, methods=['post'], url_path='bulk-upload')
     def bulk_upload(self, request, *args, **kwargs):
@@ -51,18 +50,15 @@ class DrugViewSet(LoggingViewSet, ModelViewSet):
 
         # 2. Process file using shared processors
         try:
-            successes, errors = process_excel_file(
-                excel_file,
-                field_processors=DRUG_FIELD_PROCESSORS,
-                serializer_class=DrugSerializer
-            )
+            summary = run_import(excel_file, ImportJob.DRUG, context={'request': request})
         except ValueError as e:
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         # 3. Return summary response
+        errors = summary['errors']
         status_code = status.HTTP_201_CREATED if not errors else status.HTTP_207_MULTI_STATUS
-        return Response({'created': len(successes), 'errors': errors}, status=status_code)
-class DrugInteractionViewSet(LoggingViewSet, ModelViewSet):
+        return Response({'created': summary['created'], 'errors': errors}, status=status_code)
+class DrugInteractionViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet):
     queryset = DrugInteraction.objects.all()
     serializer_class = DrugInteractionSerializer
     permission_classes = [IsPharmacistOrReadOnly]
@@ -70,7 +66,7 @@ class DrugInteractionViewSet(LoggingViewSet, ModelViewSet):
     def perform_create(self, serializer):
         instance = serializer.save()
         user = self.request.user
-        create_system_log_task.delay(
+        log_system_event(
             level="INFO",
             message=f"Drug interaction '{instance}' created.",
             user_id=user.id if user.is_authenticated else None
@@ -78,29 +74,15 @@ class DrugInteractionViewSet(LoggingViewSet, ModelViewSet):
 
     @action(detail=False, methods=["get"], url_path="search")
     def search(self, request):
-        query = request.query_params.get("q", "")
-        if not query:
-            return Response({"error": "Please provide a search query using the 'q' parameter."}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Elasticsearch query for searching Drug Interaction
-        search = DrugInteractionDocument.search().query(
-            "multi_match", query=query, fields=[
-                "drug_one_name",  # Searching by drug names
-                "drug_two_name",
-                "severity",
-                "description",
-                "alternative_suggestion"
-            ],  type="phrase_prefix" 
+        return elastic_search(
+            request=request,
+            document_class=DrugInteractionDocument,
+            search_fields=["drug_one_name", "drug_two_name", "severity", "description", "alternative_suggestion"],
         )
-
-        results = search.execute()
-        interactions = [hit.to_dict() for hit in results]
-
-        return Response(interactions)
     
     
 
-class DrugDispenseRecordViewSet(LoggingViewSet, ModelViewSet):
+class DrugDispenseRecordViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet):
     queryset = DrugDispenseRecord.objects.all()
     serializer_class = DrugDispenseRecordSerializer
     permission_classes = [IsPharmacistOrReadOnly]
@@ -125,7 +107,7 @@ class DrugDispenseRecordViewSet(LoggingViewSet, ModelViewSet):
         half_total = bill.total_amount / Decimal('2.0')
         if bill.amount_paid < half_total:
             # Log warning
-            create_system_log_task.delay(
+            log_system_event(
                 level="WARNING",
                 message=(
                     f"Attempt to dispense '{prescription_item.drug.name}' "
@@ -145,7 +127,7 @@ class DrugDispenseRecordViewSet(LoggingViewSet, ModelViewSet):
         instance = serializer.save(pharmacist=pharmacist)
 
         # 5) Log success
-        create_system_log_task.delay(
+        log_system_event(
             level="INFO",
             message=(
                 f"Dispensed {instance.quantity_dispensed} of "
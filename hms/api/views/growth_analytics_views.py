@@ -0,0 +1,79 @@
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import Child
+from ..permissions import CanViewVitalsPlot, IsAdminUser, IsMedicalProfessionalUser
+from ..plots import child_growth_series, cohort_growth_summary
+
+
+class ChildGrowthAnalyticsView(APIView):
+    """
+    Growth series, percentiles, velocity and trend for one child as JSON,
+    for clients that draw the charts themselves.
+    """
+    permission_classes = [CanViewVitalsPlot]
+
+    def get(self, request, child_id):
+        child = get_object_or_404(Child, pk=child_id)
+        self.check_object_permissions(request, child)
+        return Response(child_growth_series(child))
+
+
+class CohortGrowthAnalyticsView(APIView):
+    """
+    Growth analytics across a cohort of children, filtered by any of:
+    ?ward=<id> (currently admitted), ?doctor=<id> (appointments or admissions),
+    ?min_age_months=&max_age_months=.
+    """
+    permission_classes = [IsAdminUser | IsMedicalProfessionalUser]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            ward = self._int_param(params, 'ward')
+            doctor = self._int_param(params, 'doctor')
+            min_age = self._int_param(params, 'min_age_months')
+            max_age = self._int_param(params, 'max_age_months')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        children = Child.objects.all()
+        if ward is not None:
+            children = children.filter(admissions__bed__ward_id=ward, admissions__discharge_date__isnull=True)
+        if doctor is not None:
+            children = children.filter(Q(appointments__doctor_id=doctor) | Q(admissions__attending_doctor_id=doctor))
+
+        today = date.today()
+        if min_age is not None:
+            children = children.filter(date_of_birth__lte=today - relativedelta(months=min_age))
+        if max_age is not None:
+            # Still inside the band until the month after max_age is reached
+            children = children.filter(date_of_birth__gt=today - relativedelta(months=max_age + 1))
+
+        summary = cohort_growth_summary(children.values('id'))
+        summary['filters'] = {
+            'ward': ward,
+            'doctor': doctor,
+            'min_age_months': min_age,
+            'max_age_months': max_age,
+        }
+        return Response(summary)
+
+    @staticmethod
+    def _int_param(params, name):
+        value = params.get(name)
+        if value in (None, ''):
+            return None
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValueError(f"'{name}' must be an integer")
+        if value < 0:
+            raise ValueError(f"'{name}' must not be negative")
+        return value
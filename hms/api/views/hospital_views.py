@@ -4,16 +4,17 @@ from rest_framework.permissions import IsAuthenticated
 from ..permissions import IsAdminUser, IsMedicalProfessionalUser
 from rest_framework.viewsets import ModelViewSet
 from .logging_views import LoggingViewSet
+from .utils import FieldProjectionMixin
 
 
     
 # ONLY THE ADMIN CAN MANAGE THE WARDS
-class WardViewSet(LoggingViewSet, ModelViewSet): 
+class WardViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet): 
     queryset = Ward.objects.all()
     serializer_class = WardSerializer
     permission_classes = [IsAdminUser | IsMedicalProfessionalUser]
 
-class BedViewSet(LoggingViewSet, ModelViewSet): 
+class BedViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet): 
     queryset = Bed.objects.all()
     serializer_class = BedSerializer
     permission_classes = [IsAdminUser | IsMedicalProfessionalUser]
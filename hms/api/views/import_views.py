@@ -0,0 +1,20 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from ..models import ImportJob
+from ..serializers import ImportJobSerializer
+from .utils import FieldProjectionMixin
+
+
+class ImportJobViewSet(FieldProjectionMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Progress and per-row errors of background bulk imports started through
+    the `bulk-import` actions.
+    """
+    serializer_class = ImportJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.role == 'admin':
+            return ImportJob.objects.all()
+        return ImportJob.objects.filter(created_by=user)
@@ -1,13 +1,13 @@
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
-from .utils import elastic_search
+from .utils import elastic_search, terms_filter, FieldProjectionMixin
 from ..documents import LabRequestItemDocument
 from rest_framework.exceptions import PermissionDenied
 from ..serializers import LabRequestSerializer, LabRequestItemSerializer
 from ..models import LabRequest, LabRequestItem
 from ..permissions import LabRequestPermission, LabRequestItemPermission
-from ..tasks import create_system_log_task
-class LabRequestViewSet(ModelViewSet):
+from ..tasks import log_system_event
+class LabRequestViewSet(FieldProjectionMixin, ModelViewSet):
     serializer_class = LabRequestSerializer
     permission_classes = [LabRequestPermission]
     
@@ -28,7 +28,7 @@ class LabRequestViewSet(ModelViewSet):
     def perform_create(self, serializer):
         user = self.request.user
         instance = serializer.save()
-        create_system_log_task.delay(
+        log_system_event(
             level="INFO",
             message=f"Lab request made for '{instance.child.first_name} {instance.child.last_name}' created.",
             user_id=user.id if user.is_authenticated else None
@@ -37,7 +37,7 @@ class LabRequestViewSet(ModelViewSet):
 
 
 
-class LabRequestItemViewSet(ModelViewSet):
+class LabRequestItemViewSet(FieldProjectionMixin, ModelViewSet):
     serializer_class = LabRequestItemSerializer
     permission_classes = [LabRequestItemPermission]
 
@@ -55,6 +55,17 @@ class LabRequestItemViewSet(ModelViewSet):
             )
         return LabRequestItem.objects.none()
 
+    def get_search_filters(self):
+        """The get_queryset rules as Elasticsearch filters."""
+        user = self.request.user
+        if user.role in ['admin', 'lab_tech', 'nurse']:
+            return []
+        if user.role == 'doctor':
+            return [terms_filter("doctor_id", user.doctorprofile.id)]
+        if user.role == 'parent':
+            return [terms_filter("guardian_ids", user.parentprofile.id)]
+        return None
+
     def perform_create(self, serializer):
         user = self.request.user
         lab_request = serializer.validated_data.get('lab_request')
@@ -65,7 +76,7 @@ class LabRequestItemViewSet(ModelViewSet):
                 raise PermissionDenied("You are not allowed to add items to lab requests you did not create.")
 
         instance = serializer.save()
-        create_system_log_task.delay(
+        log_system_event(
             level="INFO",
             message=f"{instance.lab_test.name} ({instance.lab_test.code}) lab request made for '{instance.lab_request.child.first_name} {instance.lab_request.child.last_name}'.",
             user_id=user.id if user.is_authenticated else None
@@ -80,8 +91,7 @@ class LabRequestItemViewSet(ModelViewSet):
                 "child_first_name","child_last_name",
                 "doctor_first_name","doctor_last_name",
                 "lab_test_name","lab_test_code"],
-            serializer_class=LabRequestItemDocument,
-            get_queryset_method=self.get_queryset
+            filters=self.get_search_filters()
         )
 
     
@@ -2,17 +2,26 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
+from django.db import IntegrityError, transaction
+from ..caches import find_reference_ranges
 from ..models import LabResult, LabResultParameter
-from ..serializers import LabResultSerializer, LabResultParameterSerializer
+from ..serializers import LabResultSerializer, LabResultParameterSerializer, LabPanelSerializer
 from ..permissions import LabResultPermission, LabResultParameterPermission 
-from .utils import elastic_search
+from .utils import elastic_search, terms_filter, FieldProjectionMixin, RelatedFieldsMixin
 from .logging_views import LoggingViewSet
 from ..scheduled_tasks import generate_lab_report
-from ..documents import LabResultParameterDocument
+from ..documents import LabResultParameterDocument, sync_search_index
+from ..notifications import notify_lab_panel_results
 
-class LabResultViewSet(LoggingViewSet, ModelViewSet):
+class LabResultViewSet(FieldProjectionMixin, RelatedFieldsMixin, LoggingViewSet, ModelViewSet):
     serializer_class = LabResultSerializer
     permission_classes = [LabResultPermission]
+    select_related_fields = [
+        'performed_by__user',
+        'lab_request_item__lab_test',
+        'lab_request_item__lab_request__child__primary_guardian__user',
+        'lab_request_item__lab_request__requested_by__user',
+    ]
     
     def get_queryset(self):
         user = self.request.user
@@ -27,9 +36,57 @@ class LabResultViewSet(LoggingViewSet, ModelViewSet):
                 LabResult.objects.filter(lab_request_item__lab_request__child__secondary_guardian=user.parentprofile)
             )
         return LabResult.objects.none()
+
+    @action(detail=True, methods=['post'], url_path='panel')
+    def panel(self, request, pk=None):
+        """
+        Enter every parameter of a lab result in one request. The reference
+        ranges for the whole panel are resolved once and every status is
+        worked out against them, the rows go in with one bulk_create, and the
+        doctor and guardian get one notification for the whole panel.
+        """
+        lab_result = self.get_object()
+        serializer = LabPanelSerializer(data=request.data, context={'lab_result': lab_result})
+        serializer.is_valid(raise_exception=True)
+
+        parameters = [
+            LabResultParameter(lab_result=lab_result, **item)
+            for item in serializer.validated_data['parameters']
+        ]
+        age_months, gender = lab_result.get_child_demographics()
+        reference_ranges = find_reference_ranges(
+            lab_result.lab_request_item.lab_test_id,
+            [parameter.parameter_name for parameter in parameters],
+            gender,
+            age_months,
+        )
+        for parameter in parameters:
+            parameter.status = parameter.determine_status(reference_ranges)
+
+        # bulk_create skips post_save, so the per-parameter notification and
+        # search index signals are replaced by the calls below
+        try:
+            with transaction.atomic():
+                parameters = LabResultParameter.objects.bulk_create(parameters)
+                # Queued inside the transaction, so it goes out on commit as
+                # one batch with the rest of it
+                sync_search_index(LabResultParameter, [p.pk for p in parameters])
+                transaction.on_commit(lambda: notify_lab_panel_results(lab_result, parameters))
+        except IntegrityError:
+            # Another request entered some of these parameters after validation
+            return Response(
+                {"parameters": ["Some of these parameters were already entered for this lab result."]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        self.log("INFO", f"panel entered ({len(parameters)} parameters)", lab_result)
+        return Response(
+            LabResultParameterSerializer(parameters, many=True, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED
+        )
     
     
-class LabResultParameterViewSet(LoggingViewSet, ModelViewSet):
+class LabResultParameterViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet):
     serializer_class = LabResultParameterSerializer
     permission_classes = [LabResultParameterPermission]
     
@@ -46,6 +103,17 @@ class LabResultParameterViewSet(LoggingViewSet, ModelViewSet):
                 LabResultParameter.objects.filter(lab_result__lab_request_item__lab_request__child__secondary_guardian=user.parentprofile)
             )
         return LabResultParameter.objects.none()
+
+    def get_search_filters(self):
+        """The get_queryset rules as Elasticsearch filters."""
+        user = self.request.user
+        if user.role in ['admin', 'lab_tech', 'nurse']:
+            return []
+        if user.role == 'doctor':
+            return [terms_filter("doctor_id", user.doctorprofile.id)]
+        if user.role == 'parent':
+            return [terms_filter("guardian_ids", user.parentprofile.id)]
+        return None
     
     @action(detail=False, methods=["get"], url_path="search")
     def search(self, request):
@@ -56,8 +124,7 @@ class LabResultParameterViewSet(LoggingViewSet, ModelViewSet):
                 "child_first_name","child_last_name",
                 "doctor_first_name","doctor_last_name",
                 "lab_test_name","lab_test_code"],
-            serializer_class=LabResultParameterDocument,
-            get_queryset_method=self.get_queryset
+            filters=self.get_search_filters()
         )
     @action(detail=False, methods=['post'], url_path='send-lab-report')
     def send_lab_report(self, request):
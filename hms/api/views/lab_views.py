@@ -2,19 +2,20 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
-from .utils import LAB_TEST_FIELD_PROCESSORS, REFERENCE_RANGE_FIELD_PROCESSORS, process_excel_file_for_child as process_excel_file
-from ..models import LabTest, ReferenceRange
+from .utils import run_import, BulkImportMixin, FieldProjectionMixin
+from ..models import LabTest, ReferenceRange, ImportJob
 from ..serializers import LabTestSerializer, ReferenceRangeSerializer, ChildBulkUploadSerializer as LabTestBulkUploadSerializer
 from ..permissions import IsLabTechOrReadOnly
-from ..tasks import create_system_log_task
+from ..tasks import log_system_event
 from .logging_views import LoggingViewSet
 from rest_framework.parsers import MultiPartParser, FormParser
 
 
-class LabTestViewSet(LoggingViewSet, ModelViewSet):
+class LabTestViewSet(FieldProjectionMixin, BulkImportMixin, LoggingViewSet, ModelViewSet):
     queryset = LabTest.objects.all()
     serializer_class = LabTestSerializer
     permission_classes = [IsLabTechOrReadOnly]
+    import_kind = ImportJob.LAB_TEST
 
     def create(self, request):
         # Check if data is a list (bulk create)
@@ -36,31 +37,29 @@ class LabTestViewSet(LoggingViewSet, ModelViewSet):
         excel_file = upload_serializer.validated_data['file']
         
         try:
-            successes, errors = process_excel_file(
-                excel_file,
-                field_processors=LAB_TEST_FIELD_PROCESSORS,
-                serializer_class=LabTestSerializer
-            )
+            summary = run_import(excel_file, ImportJob.LAB_TEST, context={'request': request})
         except ValueError as e:
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        created, errors = summary['created'], summary['errors']
         user = self.request.user
-        create_system_log_task.delay(
+        log_system_event(
             level="INFO",
-            message=f"Lab tests bulk upload completed. Created: {len(successes)}, Errors: {len(errors)}",
+            message=f"Lab tests bulk upload completed. Created: {created}, Errors: {summary['error_count']}",
             user_id=user.id if user.is_authenticated else None
         )
         status_code = status.HTTP_201_CREATED if not errors else status.HTTP_207_MULTI_STATUS
         return Response({
-            'created': len(successes), 
+            'created': created, 
             'errors': errors,
-            'message': f'Bulk upload completed. {len(successes)} lab tests created, {len(errors)} errors.'
+            'message': f'Bulk upload completed. {created} lab tests created, {summary["error_count"]} errors.'
         }, status=status_code)
 
 
-class ReferenceRangeViewSet(LoggingViewSet, ModelViewSet):
+class ReferenceRangeViewSet(FieldProjectionMixin, BulkImportMixin, LoggingViewSet, ModelViewSet):
     queryset = ReferenceRange.objects.all()
     serializer_class = ReferenceRangeSerializer
     permission_classes = [IsLabTechOrReadOnly]
+    import_kind = ImportJob.REFERENCE_RANGE
     parser_classes = [MultiPartParser, FormParser]
     
     def create(self, request):
@@ -83,22 +82,19 @@ class ReferenceRangeViewSet(LoggingViewSet, ModelViewSet):
         excel_file = upload_serializer.validated_data['file']
         
         try:
-            successes, errors = process_excel_file(
-                excel_file,
-                field_processors=REFERENCE_RANGE_FIELD_PROCESSORS,
-                serializer_class=ReferenceRangeSerializer
-            )
+            summary = run_import(excel_file, ImportJob.REFERENCE_RANGE, context={'request': request})
         except ValueError as e:
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        created, errors = summary['created'], summary['errors']
         user = self.request.user
-        create_system_log_task.delay(
+        log_system_event(
             level="INFO",
-            message=f"Reference ranges bulk upload completed. Created: {len(successes)}, Errors: {len(errors)}",
+            message=f"Reference ranges bulk upload completed. Created: {created}, Errors: {summary['error_count']}",
             user_id=user.id if user.is_authenticated else None
         )
         status_code = status.HTTP_201_CREATED if not errors else status.HTTP_207_MULTI_STATUS
         return Response({
-            'created': len(successes), 
+            'created': created, 
             'errors': errors,
-            'message': f'Bulk upload completed. {len(successes)} Reference ranges created, {len(errors)} errors.'
+            'message': f'Bulk upload completed. {created} Reference ranges created, {summary["error_count"]} errors.'
         }, status=status_code)
\ No newline at end of file
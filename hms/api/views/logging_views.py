@@ -1,9 +1,12 @@
 from rest_framework.generics import ListAPIView, DestroyAPIView
+from rest_framework.views import APIView
+from rest_framework.response import Response
 from ..permissions import IsAdminUser
 from ..models import SystemLog
 from ..serializers import SystemLogSerializer
+from .utils import FieldProjectionMixin
 
-class SystemLogListView(ListAPIView):
+class SystemLogListView(FieldProjectionMixin, ListAPIView):
     queryset = SystemLog.objects.all().order_by('-timestamp')
     serializer_class = SystemLogSerializer
     permission_classes = [IsAdminUser]
@@ -18,7 +21,17 @@ class SystemLogDeleteView(DestroyAPIView):
     lookup_field = 'pk'
 
 
-from ..tasks import create_system_log_task
+class SystemLogSinkMetricsView(APIView):
+    """
+    Backpressure metrics for the buffered system log sink in this process.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(system_log_sink.get_metrics())
+
+
+from ..tasks import log_system_event, system_log_sink
 
 class LoggingViewSet:
     resource = None  # You can override this per viewset
@@ -26,7 +39,7 @@ class LoggingViewSet:
     def log(self, level, action, instance):
         resource_name = self.resource or instance.__class__.__name__
         message = f"{resource_name} {action} by user {self.request.user.username} (id={self.request.user.id})"
-        create_system_log_task.delay(
+        log_system_event(
             level=level,
             message=message,
             user_id=self.request.user.id
@@ -5,7 +5,7 @@ from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 from django.contrib.auth import get_user_model
-from ..tasks import send_email_task, create_system_log_task  # Make sure this is imported
+from ..tasks import send_email_task, log_system_event  # Make sure this is imported
 from ..models import User
 from .logging_views import LoggingViewSet
 
@@ -34,7 +34,7 @@ class PasswordResetRequestView(LoggingViewSet, generics.GenericAPIView):
         )
         send_email_task.delay(subject, message, [user.email])
 
-        create_system_log_task.delay(
+        log_system_event(
             level='INFO',
             message=f"Password reset link sent to user {user.username}.",
             user_id=user.id
@@ -60,7 +60,7 @@ class PasswordResetConfirmView(LoggingViewSet, generics.GenericAPIView):
         )
         send_email_task.delay(subject, message, [user.email])
 
-        create_system_log_task.delay(
+        log_system_event(
             level='INFO',
             message=f"Password reset successfully for user {user.username}.",
             user_id=user.id
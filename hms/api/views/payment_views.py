@@ -12,13 +12,15 @@ from ..models import Payment, Bill
 from ..serializers import PaymentSerializer
 from ..permissions import PaymentPermission
 from .logging_views import LoggingViewSet
+from .utils import RelatedFieldsMixin, FieldProjectionMixin
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
 
-class PaymentViewSet(LoggingViewSet, ModelViewSet):
+class PaymentViewSet(FieldProjectionMixin, RelatedFieldsMixin, LoggingViewSet, ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
+    select_related_fields = ['bill__child__primary_guardian', 'processed_by']
     permission_classes = [PaymentPermission]
 
     def get_queryset(self):
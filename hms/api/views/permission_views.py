@@ -5,8 +5,9 @@ from ..models import RolePermissionModel
 from ..serializers import RolePermissionSerializer
 from ..permissions import IsAdminUser
 from django.contrib.contenttypes.models import ContentType
+from .utils import FieldProjectionMixin
 
-class RolePermissionViewSet(viewsets.ModelViewSet):
+class RolePermissionViewSet(FieldProjectionMixin, viewsets.ModelViewSet):
     queryset = RolePermissionModel.objects.all()
     serializer_class = RolePermissionSerializer
     permission_classes = [IsAdminUser]  # Only admin users can access
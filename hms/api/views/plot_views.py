@@ -4,35 +4,44 @@ from django.http import HttpResponse
 from ..models import Child
 from ..plots import (ChildGrowthPlot, generate_growth_forecast_chart, generate_growth_percentile_chart, generate_growth_velocity_chart, child_vitals_plot)
 from ..permissions import AdmissionVitalRecordPermission, CanViewVitalsPlot
+from ..caches import cached_chart_response, GROWTH, VITALS
 class ChildGrowthChartView(View):
     """Class-based view to generate child's growth chart."""
 
     def get(self, request, child_id):
         """Handle GET request and return the growth chart image."""
-        child = get_object_or_404(Child, id=child_id)
-        plot = ChildGrowthPlot(child)
-        return plot.generate_plot()
+        def render():
+            child = get_object_or_404(Child, id=child_id)
+            plot = ChildGrowthPlot(child)
+            return plot.generate_plot()
+        return cached_chart_response(request, child_id, "growth-chart", GROWTH, render)
 
 
 class GrowthPercentileView(View):
     """View for rendering Growth Percentile Chart"""
     def get(self, request, child_id):
-        child = Child.objects.get(pk=child_id)
-        return generate_growth_percentile_chart(child)
+        def render():
+            child = Child.objects.get(pk=child_id)
+            return generate_growth_percentile_chart(child)
+        return cached_chart_response(request, child_id, "growth-percentile", GROWTH, render)
 
 
 class GrowthVelocityView(View):
     """View for rendering Growth Velocity Chart"""
     def get(self, request, child_id):
-        child = Child.objects.get(pk=child_id)
-        return generate_growth_velocity_chart(child)
+        def render():
+            child = Child.objects.get(pk=child_id)
+            return generate_growth_velocity_chart(child)
+        return cached_chart_response(request, child_id, "growth-velocity", GROWTH, render)
 
 
 class GrowthForecastView(View):
     """View for rendering Predictive Growth Forecast Chart"""
     def get(self, request, child_id):
-        child = Child.objects.get(pk=child_id)
-        return generate_growth_forecast_chart(child)
+        def render():
+            child = Child.objects.get(pk=child_id)
+            return generate_growth_forecast_chart(child)
+        return cached_chart_response(request, child_id, "growth-forecast", GROWTH, render)
     
 
 class VitalsTrendPlotView(View):
@@ -40,5 +49,8 @@ class VitalsTrendPlotView(View):
     """View for rendering Vitals Trend Plot for a child across all admissions"""
     
     def get(self, request, child_id):
-        child = get_object_or_404(Child, id=child_id)
-        return child_vitals_plot(request, child_id)
+        # child_vitals_plot looks the child up (and 404s) itself
+        return cached_chart_response(
+            request, child_id, "vitals-plot", VITALS,
+            lambda: child_vitals_plot(request, child_id)
+        )
@@ -2,7 +2,7 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import action
-from .utils import elastic_search
+from .utils import elastic_search, terms_filter, RelatedFieldsMixin, FieldProjectionMixin
 from ..documents import PrescriptionItemDocument
 from rest_framework.exceptions import PermissionDenied
 from ..permissions import PrescriptionItemPermission, PrescriptionPermission
@@ -10,9 +10,10 @@ from ..models import Prescription, PrescriptionItem
 from ..serializers import PrescriptionSerializer, PrescriptionItemSerializer
 from ..scheduled_tasks import auto_expire_prescriptions,auto_complete_prescriptions, generate_prescription_report, generate_prescription_spreadsheet
 from .logging_views import LoggingViewSet
-class PrescriptionViewSet(LoggingViewSet, ModelViewSet):
+class PrescriptionViewSet(FieldProjectionMixin, RelatedFieldsMixin, LoggingViewSet, ModelViewSet):
   
     serializer_class = PrescriptionSerializer
+    select_related_fields = ['doctor', 'child', 'diagnosis']
     permission_classes = [PrescriptionPermission]
     
     def get_queryset(self):
@@ -39,9 +40,10 @@ class PrescriptionViewSet(LoggingViewSet, ModelViewSet):
             status=status.HTTP_202_ACCEPTED
         )
 
-class PrescriptionItemViewSet(LoggingViewSet, ModelViewSet):
+class PrescriptionItemViewSet(FieldProjectionMixin, RelatedFieldsMixin, LoggingViewSet, ModelViewSet):
     queryset = PrescriptionItem.objects.all()
     serializer_class = PrescriptionItemSerializer
+    select_related_fields = ['drug', 'prescription__doctor', 'prescription__child']
     permission_classes = [PrescriptionItemPermission]
     
     def get_queryset(self):
@@ -55,6 +57,17 @@ class PrescriptionItemViewSet(LoggingViewSet, ModelViewSet):
             if hasattr(user, 'parentprofile'):
                 return PrescriptionItem.objects.filter(prescription__child__primary_guardian=user.parentprofile)
             return PrescriptionItem.objects.none()
+
+    def get_search_filters(self):
+        """The get_queryset rules as Elasticsearch filters."""
+        user = self.request.user
+        if user.role == 'doctor':
+            return [terms_filter("doctor_id", user.doctorprofile.id)]
+        if user.role in ['pharmacist', 'admin', 'nurse']:
+            return []
+        if user.role == 'parent' and hasattr(user, 'parentprofile'):
+            return [terms_filter("primary_guardian_id", user.parentprofile.id)]
+        return None
     
     def perform_create(self, serializer):
         user = self.request.user
@@ -96,8 +109,7 @@ class PrescriptionItemViewSet(LoggingViewSet, ModelViewSet):
                 "prescription_status"
 
             ],
-            serializer_class=PrescriptionItemSerializer,
-            get_queryset_method=self.get_queryset
+            filters=self.get_search_filters()
         )
 
     
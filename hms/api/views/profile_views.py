@@ -6,7 +6,8 @@ from rest_framework import status
 from rest_framework.exceptions import PermissionDenied
 from django.shortcuts import get_object_or_404
 
-from django_elasticsearch_dsl.search import Search
+from .utils import elastic_search
+from ..documents import DoctorProfileDocument, NurseProfileDocument, PharmacistProfileDocument, LabTechProfileDocument
 from rest_framework.views import APIView
 
 
@@ -98,49 +99,25 @@ class DoctorProfileSearchView(APIView):
     permission_classes = [IsAuthenticated]  
 
     def get(self, request):
-        query = request.GET.get("q", "")
-        search = Search(index="doctorprofiles").query(
-            "multi_match", query=query, fields=["first_name", "last_name", "specialization"]
-        )
-        results = search.execute()
-        serialized_results = [DoctorProfileSerializer(hit.to_dict()).data for hit in results]
-        return Response(serialized_results)
+        return elastic_search(request=request, document_class=DoctorProfileDocument, search_fields=["first_name", "last_name", "specialization"])
 
 
 class NurseProfileSearchView(APIView):
     permission_classes = [IsAuthenticated]  
 
     def get(self, request):
-        query = request.GET.get("q", "")
-        search = Search(index="nurseprofiles").query(
-            "multi_match", query=query, fields=["first_name", "last_name"]
-        )
-        results = search.execute()
-        serialized_results = [NurseProfileSerializer(hit.to_dict()).data for hit in results]
-        return Response(serialized_results)
+        return elastic_search(request=request, document_class=NurseProfileDocument, search_fields=["first_name", "last_name"])
 
 
 class PharmacistProfileSearchView(APIView):
     permission_classes = [IsAuthenticated]  
 
     def get(self, request):
-        query = request.GET.get("q", "")
-        search = Search(index="pharmacistprofiles").query(
-            "multi_match", query=query, fields=["first_name", "last_name", "license_number"]
-        )
-        results = search.execute()
-        serialized_results = [PharmacistProfileSerializer(hit.to_dict()).data for hit in results]
-        return Response(serialized_results)
+        return elastic_search(request=request, document_class=PharmacistProfileDocument, search_fields=["first_name", "last_name", "pharmacy_license_number"])
 
 
 class LabTechProfileSearchView(APIView):
     permission_classes = [IsAuthenticated]  
 
     def get(self, request):
-        query = request.GET.get("q", "")
-        search = Search(index="labtechprofiles").query(
-            "multi_match", query=query, fields=["first_name", "last_name", "specialization"]
-        )
-        results = search.execute()
-        serialized_results = [LabTechProfileSerializer(hit.to_dict()).data for hit in results]
-        return Response(serialized_results)
+        return elastic_search(request=request, document_class=LabTechProfileDocument, search_fields=["first_name", "last_name"])
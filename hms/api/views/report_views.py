@@ -4,7 +4,8 @@ from ..permissions import IsAdminUser, IsMedicalProfessionalUser
 from ..models import Report
 from ..serializers import ReportSerializer
 from .logging_views import LoggingViewSet
-class ReportViewSet(LoggingViewSet, viewsets.ReadOnlyModelViewSet):
+from .utils import FieldProjectionMixin
+class ReportViewSet(FieldProjectionMixin, LoggingViewSet, viewsets.ReadOnlyModelViewSet):
     queryset = Report.objects.all().order_by('-created_at')
     serializer_class = ReportSerializer
     permission_classes = [IsAdminUser | IsMedicalProfessionalUser]
@@ -5,29 +5,30 @@ from ..serializers import (ShiftSerializer, DoctorShiftAssignmentSerializer, Nur
                            PharmacistShiftAssignmentSerializer, LabTechShiftAssignmentSerializer)
 from ..permissions import IsAdminUser, IsMedicalProfessionalUser, IsParentUser
 from .logging_views import LoggingViewSet
+from .utils import FieldProjectionMixin
 
 # ONLY THE ADMIN CAN MANAGE THE SHIFTS
-class ShiftViewSet(LoggingViewSet, ModelViewSet): 
+class ShiftViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet): 
     queryset = Shift.objects.all()
     serializer_class = ShiftSerializer
     permission_classes = [IsAdminUser]
 
-class DoctorShiftAssignmentViewSet(LoggingViewSet, ModelViewSet):
+class DoctorShiftAssignmentViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet):
     queryset = DoctorShiftAssignment.objects.all()
     serializer_class = DoctorShiftAssignmentSerializer
     permission_classes = [IsAdminUser | IsMedicalProfessionalUser | IsParentUser]
 
-class NurseShiftAssignmentViewSet(LoggingViewSet, ModelViewSet):
+class NurseShiftAssignmentViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet):
     queryset = NurseShiftAssignment.objects.all()
     serializer_class = NurseShiftAssignmentSerializer
     permission_classes = [IsAdminUser | IsMedicalProfessionalUser]
 
-class PharmacistShiftAssignmentViewSet(LoggingViewSet, ModelViewSet):
+class PharmacistShiftAssignmentViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet):
     queryset = PharmacistShiftAssignment.objects.all()
     serializer_class = PharmacistShiftAssignmentSerializer
     permission_classes = [IsAdminUser | IsMedicalProfessionalUser]
 
-class LabTechShiftAssignmentViewSet(LoggingViewSet, ModelViewSet):
+class LabTechShiftAssignmentViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet):
     queryset = LabTechShiftAssignment.objects.all()
     serializer_class = LabTechShiftAssignmentSerializer
     permission_classes = [IsAdminUser | IsMedicalProfessionalUser]
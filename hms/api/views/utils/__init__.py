@@ -1,4 +1,7 @@
 from .elastic_search import *
 from .field_processors import *
 from .processors import *
-from .webhook import *
\ No newline at end of file
+from .webhook import *
+from .query_optimization import *
+from .pagination import *
+from .bulk_import import *
@@ -0,0 +1,420 @@
+# utils/bulk_import.py
+import csv
+import inspect
+import io
+import logging
+from itertools import islice
+from pathlib import Path
+
+import pandas as pd
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator, UniqueTogetherValidator
+
+from ...caches import invalidate_reference_range_index
+from ...documents import sync_search_index
+from ...emails.child_email_notifications import child_added_email
+from ...models import Child, Drug, LabTest, ReferenceRange, ParentProfile, User, ImportJob
+from ...serializers import (ChildSerializer, DrugSerializer, LabTestSerializer, ReferenceRangeSerializer,
+                            ImportJobSerializer, ImportUploadSerializer)
+from ...tasks import create_notifications_task, log_system_event, run_import_job_task, send_email_task
+from .field_processors import (CHILD_FIELD_PROCESSORS, DRUG_FIELD_PROCESSORS,
+                               LAB_TEST_FIELD_PROCESSORS, REFERENCE_RANGE_FIELD_PROCESSORS)
+
+logger = logging.getLogger(__name__)
+
+# Rows validated and inserted per bulk_create
+IMPORT_CHUNK_SIZE = 500
+# Per-row errors kept on a job; the count keeps going past this
+MAX_STORED_ERRORS = 1000
+
+
+def read_spreadsheet_rows(file):
+    """
+    Yield each data row of an uploaded sheet as {header: value}, with blanks
+    as '' like the old fillna('') path. xlsx and csv are streamed; legacy xls
+    still goes through pandas.
+    """
+    suffix = Path(getattr(file, 'name', '') or '').suffix.lower()
+    try:
+        if suffix == '.csv':
+            reader = csv.DictReader(io.TextIOWrapper(file, encoding='utf-8-sig'))
+            for row in reader:
+                yield {k: (v if v is not None else '') for k, v in row.items()}
+        elif suffix == '.xls':
+            df = pd.read_excel(file)
+            yield from df.fillna('').to_dict(orient='records')
+        else:
+            wb = load_workbook(file, read_only=True, data_only=True)
+            try:
+                rows = wb.active.iter_rows(values_only=True)
+                header = [str(h).strip() if h is not None else '' for h in next(rows, ())]
+                for values in rows:
+                    if all(v is None for v in values):
+                        continue
+                    yield {h: ('' if v is None else v) for h, v in zip(header, values) if h}
+            finally:
+                wb.close()
+    except Exception as e:
+        raise ValueError(f"Could not parse Excel file: {e}")
+
+
+def _takes_field_name(processor):
+    return len(inspect.signature(processor).parameters) == 2
+
+
+def apply_field_processors(row, field_processors):
+    """
+    Run a row through its field processors. Handles both styles used in
+    field_processors.py: (row) and (value, field_name); the latter only for
+    columns present in the sheet.
+    """
+    data = {}
+    for field_name, processor in field_processors.items():
+        if _takes_field_name(processor):
+            if field_name not in row:
+                continue
+            try:
+                data[field_name] = processor(row[field_name], field_name)
+            except Exception as e:
+                raise ValueError(f"Field '{field_name}': {str(e)}")
+        else:
+            data[field_name] = processor(row)
+    return data
+
+
+def _clean(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    return str(value).strip()
+
+
+class ResolvedRelatedField(serializers.RelatedField):
+    """
+    Related field for instances the importer already loaded for the whole
+    chunk, so validation doesn't run a lookup per row.
+    """
+    default_error_messages = {
+        'unresolved': 'Related object could not be resolved.',
+    }
+
+    def __init__(self, model, **kwargs):
+        self.model = model
+        super().__init__(queryset=model.objects.all(), **kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, self.model):
+            return data
+        self.fail('unresolved')
+
+    def to_representation(self, value):
+        return value.pk
+
+
+def _resolve_guardians(rows):
+    """
+    One query for every guardian named in the chunk, by email or username,
+    replacing process_guardian_field's two to three queries per row.
+    """
+    fields = ('primary_guardian', 'secondary_guardian')
+    identifiers = {_clean(row.get(field)) for row in rows for field in fields} - {''}
+    emails = {value for value in identifiers if '@' in value and '.' in value}
+    usernames = identifiers - emails
+
+    matches = {}
+    if identifiers:
+        profiles = ParentProfile.objects.select_related('user').filter(
+            Q(user__email__in=emails) | Q(user__username__in=usernames),
+            user__role=User.PARENT,
+        )
+        for profile in profiles:
+            if profile.user.email in emails:
+                matches.setdefault(profile.user.email, []).append(profile)
+            if profile.user.username in usernames:
+                matches.setdefault(profile.user.username, []).append(profile)
+
+    def process(value, field_name):
+        value = _clean(value)
+        if not value:
+            return None
+        found = matches.get(value, [])
+        if not found:
+            raise ValueError(f"Parent user with email/username '{value}' not found for {field_name}")
+        if len(found) > 1:
+            raise ValueError(f"Multiple parent users found with identifier '{value}' for {field_name}")
+        return found[0]
+
+    return {field: process for field in fields}
+
+
+def _resolve_lab_tests(rows):
+    """
+    One query for every lab test code in the chunk.
+    """
+    codes = {_clean(row.get('lab_test')) for row in rows} - {''}
+    lab_tests = {test.code: test for test in LabTest.objects.filter(code__in=codes)} if codes else {}
+
+    def process(value, field_name):
+        code = _clean(value)
+        if not code:
+            return None
+        try:
+            return lab_tests[code]
+        except KeyError:
+            raise ValueError(f"No LabTest found with code='{code}' for {field_name}")
+
+    return {'lab_test': process}
+
+
+def _after_children_created(children):
+    """
+    Stands in for the Child post_save receivers bulk_create skips:
+    update_number_of_children_on_create, send_child_added_email and
+    send_child_added_notification.
+    """
+    with_guardian = [child for child in children if child.primary_guardian]
+    if not with_guardian:
+        return
+
+    # One count per guardian for the whole chunk instead of one per child
+    guardian_ids = {child.primary_guardian_id for child in with_guardian}
+    counts = (Child.objects.filter(primary_guardian_id__in=guardian_ids)
+              .values('primary_guardian_id').annotate(count=Count('id')))
+    ParentProfile.objects.bulk_update(
+        [ParentProfile(pk=row['primary_guardian_id'], number_of_children=row['count']) for row in counts],
+        ['number_of_children'],
+    )
+
+    for child in with_guardian:
+        subject, message = child_added_email(child)
+        try:
+            send_email_task.delay(subject, message, [child.primary_guardian.user.email])
+        except Exception as e:
+            logger.error(f"Could not queue the child added email for child {child.pk}: {e}")
+
+    create_notifications_task.delay([
+        (child.primary_guardian.user_id,
+         f"Your child, {child.first_name} {child.last_name}, has been successfully added to the hospital system.")
+        for child in with_guardian
+    ])
+
+
+class ImportSpec:
+    """
+    How one kind of sheet is turned into rows of `model`.
+
+    `resolve(rows)` returns processors that replace per-row lookups for the
+    chunk; `related_models` names the serializer fields those processors feed.
+    `prepare` and `after_create` stand in for the save() logic and post_save
+    receivers that bulk_create skips.
+    """
+
+    def __init__(self, model, serializer_class, field_processors, resolve=None,
+                 related_models=None, prepare=None, after_create=None, after_import=None):
+        self.model = model
+        self.serializer_class = serializer_class
+        self.field_processors = field_processors
+        self.resolve = resolve
+        self.related_models = related_models or {}
+        self.prepare = prepare
+        self.after_create = after_create
+        self.after_import = after_import
+
+
+IMPORT_SPECS = {
+    ImportJob.CHILD: ImportSpec(
+        Child, ChildSerializer, CHILD_FIELD_PROCESSORS,
+        resolve=_resolve_guardians,
+        related_models={'primary_guardian': ParentProfile, 'secondary_guardian': ParentProfile},
+        prepare=Child.compute_derived_fields,
+        after_create=_after_children_created,
+    ),
+    ImportJob.DRUG: ImportSpec(Drug, DrugSerializer, DRUG_FIELD_PROCESSORS),
+    ImportJob.LAB_TEST: ImportSpec(LabTest, LabTestSerializer, LAB_TEST_FIELD_PROCESSORS),
+    ImportJob.REFERENCE_RANGE: ImportSpec(
+        ReferenceRange, ReferenceRangeSerializer, REFERENCE_RANGE_FIELD_PROCESSORS,
+        resolve=_resolve_lab_tests,
+        related_models={'lab_test': LabTest},
+        after_import=invalidate_reference_range_index,
+    ),
+}
+
+
+def _row_serializer(spec, data, context, strict):
+    serializer = spec.serializer_class(data=data, context=context)
+    for name, model in spec.related_models.items():
+        if name in serializer.fields:
+            original = serializer.fields[name]
+            serializer.fields[name] = ResolvedRelatedField(
+                model, required=original.required, allow_null=original.allow_null
+            )
+    if not strict:
+        # Uniqueness is left to the database on the bulk path; a clash sends
+        # the chunk through the strict row-by-row path instead
+        for field in serializer.fields.values():
+            field.validators = [v for v in field.validators if not isinstance(v, UniqueValidator)]
+        serializer.validators = [v for v in serializer.validators if not isinstance(v, UniqueTogetherValidator)]
+    return serializer
+
+
+def _import_chunk(spec, chunk, context):
+    """
+    Validate and insert one chunk of (row_number, row). Returns (created, errors).
+    """
+    processors = dict(spec.field_processors)
+    if spec.resolve:
+        processors.update(spec.resolve([row for _, row in chunk]))
+
+    pending, errors = [], []
+    for number, row in chunk:
+        try:
+            data = apply_field_processors(row, processors)
+        except Exception as e:
+            errors.append({
+                'row': number,
+                'errors': {'processing': [str(e)]},
+                'raw_data': {k: str(v)[:50] for k, v in row.items() if v}
+            })
+            continue
+        serializer = _row_serializer(spec, data, context, strict=False)
+        if serializer.is_valid():
+            pending.append((number, data, serializer.validated_data))
+        else:
+            errors.append({'row': number, 'errors': serializer.errors})
+
+    instances = []
+    for _, _, validated_data in pending:
+        instance = spec.model(**validated_data)
+        if spec.prepare:
+            spec.prepare(instance)
+        instances.append(instance)
+
+    try:
+        with transaction.atomic():
+            created = spec.model.objects.bulk_create(instances)
+    except IntegrityError:
+        # Some row clashes with existing data or another row in the chunk;
+        # save row by row with the unique checks back on so each clash is
+        # reported against its own row. save() fires the usual signals.
+        created = []
+        for number, data, _ in pending:
+            serializer = _row_serializer(spec, data, context, strict=True)
+            if not serializer.is_valid():
+                errors.append({'row': number, 'errors': serializer.errors})
+                continue
+            try:
+                with transaction.atomic():
+                    created.append(serializer.save())
+            except IntegrityError as e:
+                errors.append({'row': number, 'errors': {'database': [str(e)]}})
+        errors.sort(key=lambda error: error['row'])
+        return created, errors
+
+    if created:
+        if spec.after_create:
+            spec.after_create(created)
+        sync_search_index(spec.model, [obj.pk for obj in created])
+    errors.sort(key=lambda error: error['row'])
+    return created, errors
+
+
+def run_import(file, kind, context=None, chunk_size=IMPORT_CHUNK_SIZE, on_progress=None):
+    """
+    Import a spreadsheet in chunks of `chunk_size` rows: guardians and lab test
+    codes are resolved with one IN query per chunk and rows are inserted with
+    bulk_create. `on_progress(summary)` runs after every chunk.
+
+    Returns {'processed', 'created', 'error_count', 'errors'}; at most
+    MAX_STORED_ERRORS row errors are kept.
+    """
+    spec = IMPORT_SPECS[kind]
+    summary = {'processed': 0, 'created': 0, 'error_count': 0, 'errors': []}
+    rows = enumerate(read_spreadsheet_rows(file), start=1)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        created, errors = _import_chunk(spec, chunk, context)
+        summary['processed'] += len(chunk)
+        summary['created'] += len(created)
+        summary['error_count'] += len(errors)
+        room = MAX_STORED_ERRORS - len(summary['errors'])
+        if room > 0:
+            summary['errors'].extend(errors[:room])
+        if on_progress:
+            on_progress(summary)
+
+    if spec.after_import and summary['created']:
+        spec.after_import()
+    return summary
+
+
+def run_import_job(job_id):
+    """
+    Run a queued ImportJob, recording progress on the job after every chunk.
+    """
+    job = ImportJob.objects.get(pk=job_id)
+    jobs = ImportJob.objects.filter(pk=job.pk)
+    jobs.update(status=ImportJob.RUNNING, started_at=timezone.now())
+
+    def record_progress(summary):
+        jobs.update(
+            processed_rows=summary['processed'],
+            created_count=summary['created'],
+            error_count=summary['error_count'],
+            errors=summary['errors'],
+        )
+
+    try:
+        with job.file.open('rb') as f:
+            summary = run_import(f, job.kind, on_progress=record_progress)
+    except Exception as e:
+        logger.error(f"Import job {job.pk} failed: {e}")
+        jobs.update(status=ImportJob.FAILED, detail=str(e), finished_at=timezone.now())
+        log_system_event(
+            level="ERROR",
+            message=f"{job.get_kind_display()} import #{job.pk} failed: {e}",
+            user_id=job.created_by_id
+        )
+        return None
+
+    record_progress(summary)
+    jobs.update(
+        status=ImportJob.COMPLETED,
+        detail=f"{summary['created']} created, {summary['error_count']} errors",
+        finished_at=timezone.now(),
+    )
+    log_system_event(
+        level="INFO",
+        message=f"{job.get_kind_display()} import #{job.pk} completed. Created: {summary['created']}, Errors: {summary['error_count']}",
+        user_id=job.created_by_id
+    )
+    return summary
+
+
+class BulkImportMixin:
+    """
+    Adds POST <resource>/bulk-import/, which stores the upload as an ImportJob
+    and processes it on Celery. Poll import-jobs/<id>/ for progress and
+    per-row errors. Viewsets set `import_kind` to one of ImportJob.KIND_CHOICES.
+    """
+    import_kind = None
+
+    @action(detail=False, methods=['post'], url_path='bulk-import')
+    def bulk_import(self, request):
+        upload_serializer = ImportUploadSerializer(data=request.data)
+        upload_serializer.is_valid(raise_exception=True)
+
+        job = ImportJob.objects.create(
+            kind=self.import_kind,
+            file=upload_serializer.validated_data['file'],
+            created_by=request.user,
+        )
+        transaction.on_commit(lambda: run_import_job_task.delay(job.pk))
+        return Response(ImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
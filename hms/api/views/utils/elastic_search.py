@@ -1,16 +1,54 @@
 # utils/search_utils.py
 
+from django.conf import settings
+from elasticsearch_dsl import Q as ES_Q
 from rest_framework.response import Response
 from rest_framework import status
 
+from ...documents.indexing import PERMISSION_FIELDS
+
+DEFAULT_SEARCH_SIZE = 10
+MAX_SEARCH_SIZE = 100
+# Elasticsearch refuses from + size beyond index.max_result_window
+MAX_RESULT_WINDOW = 10000
+
+
+def terms_filter(field, *values):
+    """
+    Terms filter on one of the PERMISSION_FIELDS, e.g.
+    terms_filter("guardian_ids", user.parentprofile.id).
+    """
+    return ES_Q("terms", **{field: [value for value in values if value is not None]})
+
+
+def _bounded_int(value, default, minimum, maximum):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(minimum, min(value, maximum))
+
+
 def elastic_search(
     request,
     document_class,
     search_fields,
-    serializer_class,
-    get_queryset_method,
-    serializer_context=None
+    filters=(),
+    source_fields=None,
 ):
+    """
+    Answer a search entirely from the index, in relevance order. The index
+    is Elasticsearch, or SearchEntry rows when SEARCH_INDEX_BACKEND is
+    'postgres'.
+
+    `filters` are extra filter clauses (usually terms_filter on guardian or
+    doctor ids) that restrict the hits to what the caller may see; pass None
+    when the caller may see nothing. `source_fields` limits the projected
+    fields, otherwise the whole document minus PERMISSION_FIELDS is returned.
+    Paginate with ?from=&size= (size defaults to 10, at most 100). The body
+    is the list of hits; the total and the page bounds are in the
+    X-Total-Count, X-Search-From and X-Search-Size headers.
+    """
 
     # 1. Get the search term
     query = request.query_params.get("q", "")
@@ -20,25 +58,59 @@ def elastic_search(
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    # 2. Run the ES query
+    size = _bounded_int(request.query_params.get("size"), DEFAULT_SEARCH_SIZE, 1, MAX_SEARCH_SIZE)
+    offset = _bounded_int(request.query_params.get("from"), 0, 0, MAX_RESULT_WINDOW - size)
+
+    if filters is None:
+        return _search_response([], 0, offset, size)
+
+    # 2. Run the query, permissions included
+    if getattr(settings, "SEARCH_INDEX_BACKEND", "elasticsearch") == "postgres":
+        from ...documents.postgres_search import search_entries
+
+        total, hits = search_entries(
+            document_class._index._name, query, search_fields,
+            filters=filters, source_fields=source_fields, offset=offset, size=size,
+        )
+    else:
+        total, hits = _elasticsearch_hits(document_class, query, search_fields, filters, source_fields, offset, size)
+
+    return _search_response(hits, total, offset, size)
+
+
+def _search_response(hits, total, offset, size):
+    # Clients read the body as a plain list of results, as they always have
+    response = Response(hits)
+    response["X-Total-Count"] = str(total)
+    response["X-Search-From"] = str(offset)
+    response["X-Search-Size"] = str(size)
+    return response
+
+
+def _elasticsearch_hits(document_class, query, search_fields, filters, source_fields, offset, size):
     search = document_class.search().query(
         "multi_match",
         query=query,
         fields=search_fields,
         type="phrase_prefix"
     )
+    for clause in filters:
+        search = search.filter(clause)
+    if source_fields:
+        search = search.source(includes=list(source_fields))
+    else:
+        search = search.source(excludes=PERMISSION_FIELDS)
+    search = search.highlight(*search_fields, fragment_size=150, number_of_fragments=1)
+    search = search.extra(track_total_hits=True)[offset:offset + size]
     results = search.execute()
-    ids = [hit.meta.id for hit in results]
-
-    # 3. Filter your DRF queryset
-    base_qs = get_queryset_method()
-    queryset = base_qs.filter(id__in=ids)
-
-    # 4. Serialize with passed-in context
-    context = serializer_context or {}
-    # Always include request in context if not provided
-    if "request" not in context:
-        context["request"] = request
 
-    serializer = serializer_class(queryset, many=True, context=context)
-    return Response(serializer.data)
+    # Build the page straight from the hits
+    hits = []
+    for hit in results:
+        row = hit.to_dict()
+        row.setdefault("id", int(hit.meta.id) if str(hit.meta.id).isdigit() else hit.meta.id)
+        row["score"] = hit.meta.score
+        highlight = getattr(hit.meta, "highlight", None)
+        row["highlight"] = highlight.to_dict() if highlight else {}
+        hits.append(row)
+    return results.hits.total.value, hits
@@ -0,0 +1,58 @@
+# utils/pagination.py
+from rest_framework.pagination import CursorPagination
+from rest_framework.serializers import ListSerializer
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (created_at, id), falling back to the model's own
+    timestamp or to id alone for models without a created_at column.
+
+    Pagination is opt-in per request: clients that send `cursor` or `page_size`
+    get `{next, previous, results}`; everyone else keeps receiving the plain
+    list the frontend currently expects.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering_field_candidates = ('created_at', 'timestamp')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        field_names = {field.name for field in queryset.model._meta.get_fields()}
+        for candidate in self.ordering_field_candidates:
+            if candidate in field_names:
+                return (f'-{candidate}', '-id')
+        return ('-id',)
+
+
+class FieldProjectionMixin:
+    """
+    Lets read requests ask for slim rows with `?fields=id,status,child_details`.
+    Dropped fields are never evaluated, so method fields that walk relations
+    cost nothing when they are not requested. Unknown names are ignored.
+    """
+    fields_query_param = 'fields'
+
+    def get_requested_fields(self):
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return None
+        raw = request.query_params.get(self.fields_query_param)
+        if not raw:
+            return None
+        return {name.strip() for name in raw.split(',') if name.strip()}
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        requested = self.get_requested_fields()
+        if requested:
+            target = serializer.child if isinstance(serializer, ListSerializer) else serializer
+            for name in set(target.fields) - requested:
+                target.fields.pop(name)
+        return serializer
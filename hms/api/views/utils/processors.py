@@ -2,7 +2,6 @@ import pandas as pd
 import datetime
 from decimal import Decimal
 from ...models import User, ParentProfile
-from django.db import transaction
 
 def parse_bool(val):
     if isinstance(val, bool):
@@ -29,105 +28,6 @@ def format_decimal(val, places=2):
 
 
 
-def process_excel_file(excel_file, field_processors, serializer_class):
-    try:
-        df = pd.read_excel(excel_file)
-    except Exception as e:
-        raise ValueError(f"Could not parse Excel file: {e}")
-
-    successes, errors = [], []
-    with transaction.atomic():
-        for idx, row in enumerate(df.fillna('').to_dict(orient='records'), start=1):
-            data = {field: proc(row) for field, proc in field_processors.items()}
-            serializer = serializer_class(data=data)
-            if serializer.is_valid():
-                successes.append(serializer.save())
-            else:
-                errors.append({'row': idx, 'errors': serializer.errors})
-    return successes, errors
-
-
-
-def process_excel_file_for_child(excel_file, field_processors, serializer_class):
-    """
-    Updated to work with both old and new processor signatures
-    """
-    try:
-        df = pd.read_excel(excel_file)
-        print(f"DEBUG: Successfully read Excel file with {len(df)} rows")
-        print(f"DEBUG: Column names: {list(df.columns)}")
-    except Exception as e:
-        raise ValueError(f"Could not parse Excel file: {e}")
-
-    successes, errors = [], []
-    
-    # Debug: Show first few raw rows
-    print("DEBUG: First 2 raw rows from Excel:")
-    for i, row in enumerate(df.head(2).to_dict(orient='records')):
-        print(f"  Row {i+1}: {row}")
-    
-    with transaction.atomic():
-        for idx, row in enumerate(df.fillna('').to_dict(orient='records'), start=1):
-            print(f"\nDEBUG: Processing row {idx}")
-            try:
-                data = {}
-                for field_name, processor in field_processors.items():
-                    if field_name in row:
-                        try:
-                            # Check if processor expects field_name argument
-                            import inspect
-                            sig = inspect.signature(processor)
-                            if len(sig.parameters) == 2:
-                                # New style processor (value, field_name)
-                                processed_value = processor(row[field_name], field_name)
-                                data[field_name] = processed_value
-                                print(f"DEBUG:   {field_name}: '{row[field_name]}' -> {processed_value}")
-                            else:
-                                # Old style processor (row)
-                                processed_value = processor(row)
-                                data[field_name] = processed_value
-                                print(f"DEBUG:   {field_name}: (old style) -> {processed_value}")
-                        except Exception as field_error:
-                            print(f"DEBUG:   ERROR processing {field_name}: {str(field_error)}")
-                            raise ValueError(f"Field '{field_name}': {str(field_error)}")
-                
-                print(f"DEBUG: Final processed data: {data}")
-                
-                serializer = serializer_class(data=data)
-                if serializer.is_valid():
-                    saved_obj = serializer.save()
-                    successes.append(saved_obj)
-                    print(f"DEBUG: ✓ Row {idx} saved successfully")
-                else:
-                    print(f"DEBUG: ✗ Row {idx} validation failed:")
-                    for field, field_errors in serializer.errors.items():
-                        print(f"DEBUG:     {field}: {field_errors}")
-                    
-                    errors.append({
-                        'row': idx, 
-                        'errors': serializer.errors,
-                        'data_preview': {k: str(v)[:50] for k, v in data.items() if v is not None}
-                    })
-                    
-            except ValueError as row_error:
-                print(f"DEBUG: ✗ Row {idx} processing error: {str(row_error)}")
-                errors.append({
-                    'row': idx,
-                    'errors': {'processing': [str(row_error)]},
-                    'raw_data': {k: str(v)[:50] for k, v in row.items() if v}
-                })
-            except Exception as unexpected_error:
-                print(f"DEBUG: ✗ Row {idx} unexpected error: {str(unexpected_error)}")
-                errors.append({
-                    'row': idx,
-                    'errors': {'unexpected': [f"Unexpected error: {str(unexpected_error)}"]},
-                    'raw_data': {k: str(v)[:50] for k, v in row.items() if v}
-                })
-    
-    print(f"\nDEBUG: Final results - Successes: {len(successes)}, Errors: {len(errors)}")
-    return successes, errors
-
-
 # ---------------------------------------------------------------------
 def process_guardian_field(value, field_name):
     """
@@ -186,16 +86,18 @@ def process_date_field(value, field_name):
     if pd.isna(value) or str(value).strip() == '':
         return None
     
-    # If it's already a datetime object (from pandas)
-    if isinstance(value, (pd.Timestamp, datetime)):
+    # If it's already a datetime object (from pandas or openpyxl)
+    if isinstance(value, datetime.datetime):
         return value.date()
+    if isinstance(value, datetime.date):
+        return value
     
     # Try to parse string dates
     try:
         # Try common date formats
         for fmt in ['%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y']:
             try:
-                return datetime.strptime(str(value), fmt).date()
+                return datetime.datetime.strptime(str(value), fmt).date()
             except ValueError:
                 continue
         raise ValueError(f"Could not parse date format for {field_name}")
@@ -263,7 +165,7 @@ def process_datetime_field(value, field_name):
         return None
     
     # If it's already a datetime object
-    if isinstance(value, (pd.Timestamp, datetime)):
+    if isinstance(value, datetime.datetime):
         return value
     
     # Try to parse string datetimes
@@ -287,7 +189,7 @@ def process_datetime_field(value, field_name):
         
         for fmt in datetime_formats:
             try:
-                return datetime.strptime(str(value), fmt)
+                return datetime.datetime.strptime(str(value), fmt)
             except ValueError:
                 continue
         
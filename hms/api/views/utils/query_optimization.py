@@ -0,0 +1,31 @@
+# utils/query_optimization.py
+
+
+class RelatedFieldsMixin:
+    """
+    Applies the relations a viewset's serializer walks to every queryset the
+    viewset serves, so `*_details` fields don't cost a query per row.
+
+    Viewsets declare them next to `serializer_class`:
+
+        select_related_fields = ['doctor', 'child__primary_guardian']
+        prefetch_related_fields = ['items']
+
+    The relations are applied in `filter_queryset`, which DRF runs for both
+    `list` and `get_object`, so role-based `get_queryset` overrides keep working
+    unchanged.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    def optimize_queryset(self, queryset):
+        if queryset is None:
+            return queryset
+        if self.select_related_fields:
+            queryset = queryset.select_related(*self.select_related_fields)
+        if self.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*self.prefetch_related_fields)
+        return queryset
+
+    def filter_queryset(self, queryset):
+        return super().filter_queryset(self.optimize_queryset(queryset))
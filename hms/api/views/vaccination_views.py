@@ -11,7 +11,8 @@ from ..schedulers import set_vaccination_reminder_schedule, get_vaccination_remi
 from ..permissions import IsAdminUser, DynamicRolePermission, VaccinationRecordPermission
 from ..scheduled_tasks import generate_vaccination_report
 from .logging_views import LoggingViewSet
-class VaccineViewSet(LoggingViewSet, ModelViewSet):
+from .utils import FieldProjectionMixin
+class VaccineViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet):
     """
     API endpoint that allows vaccines to be viewed or edited.
     Only Admins, Doctors, and Nurses have access.
@@ -21,7 +22,7 @@ class VaccineViewSet(LoggingViewSet, ModelViewSet):
     permission_classes = [VaccinationRecordPermission]
 
 
-class VaccinationRecordViewSet(LoggingViewSet, ModelViewSet):
+class VaccinationRecordViewSet(FieldProjectionMixin, LoggingViewSet, ModelViewSet):
     """
     API endpoint for managing vaccination records.
     """
@@ -98,7 +99,7 @@ class VaccinationRecordViewSet(LoggingViewSet, ModelViewSet):
 
 
 # vaccination_views.py
-from ..tasks import create_system_log_task
+from ..tasks import log_system_event
 class SetParentVaccinationReminder(APIView):
     permission_classes = [IsAdminUser]
     
@@ -113,27 +114,27 @@ class SetParentVaccinationReminder(APIView):
                     enabled=data['enabled']
                 )
                 msg = f"Parent vaccination reminder schedule set to every {data['every']} {data['period']} (enabled={data['enabled']})"
-                create_system_log_task.delay('info', msg, user_id=request.user.id)
+                log_system_event('info', msg, user_id=request.user.id)
                 return Response(
                     {'message': 'Vaccination reminder set/updated for parents'},
                     status=status.HTTP_200_OK
                 )
             except ValueError as e:
                 err = str(e)
-                create_system_log_task.delay('error', f"Failed to set parent vaccination reminder: {err}", user_id=request.user.id)
+                log_system_event('error', f"Failed to set parent vaccination reminder: {err}", user_id=request.user.id)
                 return Response({'error': err}, status=status.HTTP_400_BAD_REQUEST)
         # validation error
-        create_system_log_task.delay('warning', f"Invalid data for parent vaccination reminder: {serializer.errors}", user_id=request.user.id)
+        log_system_event('warning', f"Invalid data for parent vaccination reminder: {serializer.errors}", user_id=request.user.id)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def get(self, request):
         try:
             schedule = get_vaccination_reminder_schedule()
-           # create_system_log_task.delay('info', "Fetched parent vaccination reminder schedule", user_id=request.user.id)
+           # log_system_event('info', "Fetched parent vaccination reminder schedule", user_id=request.user.id)
             return Response(schedule, status=status.HTTP_200_OK)
         except ValueError as e:
             err = str(e)
-           # create_system_log_task.delay('warning', f"Failed to fetch parent vaccination reminder: {err}", user_id=request.user.id)
+           # log_system_event('warning', f"Failed to fetch parent vaccination reminder: {err}", user_id=request.user.id)
             return Response({'error': err}, status=status.HTTP_404_NOT_FOUND)
             
  
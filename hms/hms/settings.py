@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'corsheaders',
 
     'api',
@@ -137,6 +138,41 @@ connections.configure(
     }
 )
 
+# Saves and deletes are queued on commit and written in bulk by a Celery task
+# instead of one synchronous request per save.
+ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = 'api.documents.signals.QueuedSignalProcessor'
+# 'postgres' keeps the index in SearchEntry rows (tsvector + pg_trgm) and
+# answers searches from them, for sites without a cluster. 'memory' is an
+# in-process stand-in for tests and dry runs.
+SEARCH_INDEX_BACKEND = os.environ.get("SEARCH_INDEX_BACKEND", "elasticsearch")
+SEARCH_INDEX_QUEUE_BATCH_SIZE = int(os.environ.get("SEARCH_INDEX_QUEUE_BATCH_SIZE", 500))
+
+
+# ----------------------------
+# Cache
+# ----------------------------
+# Cached data is invalidated on save, so every gunicorn worker (and Celery)
+# must see the same cache: use the deployment's Redis, falling back to the
+# Celery broker's. LocMemCache is per-process and only fit for local
+# single-process runs and tests.
+CACHE_URL = os.environ.get("CACHE_URL") or os.environ.get("REDIS_URL") or os.environ.get("CELERY_BROKER")
+CACHE_IS_SHARED = bool(CACHE_URL)
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'hms',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'hms-default',
+        }
+    }
+
 
 # ----------------------------
 # Stripe
@@ -215,7 +251,9 @@ AUTH_USER_MODEL = 'api.User'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+    ),
+    # Keyset pagination, opt-in per request via ?cursor= / ?page_size=
+    'DEFAULT_PAGINATION_CLASS': 'api.views.utils.pagination.KeysetCursorPagination',
 }
 CSRF_TRUSTED_ORIGINS = [
     "http://127.0.0.1:8100",
@@ -265,10 +303,32 @@ if not DEBUG and not os.environ.get("CELERY_BROKER"):
     CELERY_TASK_ALWAYS_EAGER = True
     CELERY_TASK_EAGER_PROPAGATES = True
 
+# ----------------------------
+# System log sink
+# ----------------------------
+# Audit entries are buffered and written with bulk_create instead of one
+# Celery task per action. 'redis' shares the buffer across processes.
+SYSTEM_LOG_SINK = {
+    'BACKEND': os.environ.get("SYSTEM_LOG_SINK_BACKEND", "memory"),
+    'REDIS_URL': os.environ.get("SYSTEM_LOG_SINK_REDIS_URL") or CELERY_BROKER_URL,
+    'BATCH_SIZE': int(os.environ.get("SYSTEM_LOG_SINK_BATCH_SIZE", 200)),
+    'FLUSH_INTERVAL': float(os.environ.get("SYSTEM_LOG_SINK_FLUSH_INTERVAL", 2.0)),
+    'MAX_BUFFER': int(os.environ.get("SYSTEM_LOG_SINK_MAX_BUFFER", 10000)),
+}
+
+# Scheduled reminder sweeps skip a notification identical to one the same
+# user got within this many seconds, so an overlapping or re-run sweep
+# doesn't repeat itself (0 disables the check). Event notifications are
+# never deduplicated.
+NOTIFICATION_SWEEP_DEDUPE_WINDOW = int(os.environ.get("NOTIFICATION_SWEEP_DEDUPE_WINDOW", 600))
+
 # ----------------------------
 # Model service (FastAPI)
 # ----------------------------
 MODEL_SERVICE_URL = os.environ.get("MODEL_SERVICE_URL", "http://fastapi:8005")
+# Refresh a conversation's rolling summary once this many messages are
+# newer than it (0 disables summaries)
+CHATBOT_SUMMARY_EVERY_MESSAGES = int(os.environ.get("CHATBOT_SUMMARY_EVERY_MESSAGES", 8))
 
 # ----------------------------
 # CORS
@@ -281,6 +341,8 @@ CORS_ALLOW_HEADERS = [
     "accept", "accept-encoding", "authorization", "content-type",
     "dnt", "origin", "user-agent", "x-csrftoken", "x-requested-with",
 ]
+# Search pagination metadata (see api.views.utils.elastic_search)
+CORS_EXPOSE_HEADERS = ["X-Total-Count", "X-Search-From", "X-Search-Size"]
 
 # ----------------------------
 # Email
@@ -304,5 +366,8 @@ DEFAULT_FROM_EMAIL = "haarisali9@gmail.com"  # Must match a verified sender/doma
 # ----------------------------
 ICD_CLIENT_ID = os.environ.get("ICD_CLIENT_ID")
 ICD_CLIENT_SECRET = os.environ.get("ICD_CLIENT_SECRET")
+# Optional local ICD-11 code list (JSON, or the WHO SimpleTabulation TSV)
+# that answers prefix searches before, or instead of, the WHO API
+ICD_OFFLINE_INDEX = os.environ.get("ICD_OFFLINE_INDEX")
 
 print("Server is running!")
\ No newline at end of file